@@ -18,132 +18,749 @@ Files bigger than the size_cap_in_mb will not be processed.
 
 2. size_cap_checksum can use MD5, SHA256, SHA3 etc Hashing algorithms by specifying the hash_type parameter.
 Files bigger than the size_cap_in_mb will not be processed.
+
+hash_tree computes the Checksum of a whole Folder Tree in Parallel on a Process Pool, or on a Thread Pool
+with mode = "thread". Results are streamed back as each File finishes.
+
+walk_files lazily Walks a Folder Tree with os.scandir, Filtering with Glob or Regex Include and Exclude Patterns.
+
+hash_tree_entries adds the Size, Modification Time and a sampled fingerprint of every File, for Manifests.
+
+checksum_multi and hash_files with a List of Algorithms Read every File once and feed every Hash Algorithm.
+
+All Hash Functions accept a checksum_cache.hash_cache, so Files whose stat Data did not change are not Read again.
+
+Checksum Data is Saved and Loaded as a Stream with checksum_manifest, as JSON, JSON Lines or a compact Binary Format.
+
+Passing a checksum_stats.hash_stats as stats to hash_files, hash_tree or hash_tree_entries collects per Phase
+Timings (walk, open, read, hash), the slowest Files and Error Counts, exportable as JSON or Prometheus Text.
+Messages go to the logging Module instead of print.
+
+Files are Read in Chunks sized per Device from the File System's preferred I/O Size, or from a short
+calibrate_chunk_size Run, unless chunk_num_blocks is given. chosen_chunk_size reports the Size a File is Read with.
+
+The "sparse" read_mode finds the Data Extents of Sparse Files such as VM Disk Images with SEEK_DATA and SEEK_HOLE
+and feeds Zeros for the Holes without Reading them. The Checksum is the same as a full Read, and hash_stats counts
+the Bytes of Holes that were not Read as bytes_sparse.
+
+Algorithms are looked up by Name in the checksum_algorithms Registry, which adds the fast crc32 and adler32
+Checksums for plain Change Detection and takes plugged in Algorithms.
+
+checksum_benchmark measures Walking and Hashing of synthetic Trees and Writes the Results as JSON.
 """
 
+import errno
+import fnmatch
 import hashlib
-import json
+import logging
+import mmap
+import multiprocessing
 import os
+import re
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
+
+from checksum_algorithms import BLAKE2, create_hash
+from checksum_diff import diff_checksums
+from checksum_manifest import manifest_entry, read_manifest, write_manifest
+from checksum_stats import HASH, OPEN, READ, WALK, active_stats, collect_stats, hash_stats
+
+logger = logging.getLogger(__name__)
+
+# Reason Files bigger than size_cap_in_mb are counted under in checksum_stats.hash_stats.skipped.
+SIZE_CAP = "size_cap"
+
+# Ways of Reading a File into a Hash Function.
+# "read" allocates a new Chunk per Read, "readinto" refills one reused Buffer,
+# "mmap" Memory Maps the File and "auto" uses mmap for Regular Files of at least MMAP_THRESHOLD Bytes.
+# "sparse" only Reads the Data Extents of a Sparse File and Hashes its Holes as Zeros, see data_extents.
+READ_MODES = ("read", "readinto", "mmap", "auto", "sparse")
+
+# The Operating System can find the Holes of Sparse Files, Linux since 3.1.
+SPARSE_SUPPORTED = hasattr(os, "SEEK_DATA") and hasattr(os, "SEEK_HOLE")
+
+# Size in Bytes from which the "auto" Read Mode Memory Maps a File.
+MMAP_THRESHOLD = 64 * 1024 ** 2
+
+# Read Size in Bytes of a Device whose File System does not prefer a bigger one, and no Calibration was run.
+DEFAULT_CHUNK_SIZE = 1024 ** 2
+
+# Upper Bound of a Read Size taken from the File System.
+MAX_CHUNK_SIZE = 8 * 1024 ** 2
+
+# Read Sizes in Bytes a Calibration tries.
+CALIBRATION_CHUNK_SIZES = (64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 8 * 1024 ** 2)
 
-# Program Files Paths in os.environ
-PROGRAMFILES = "PROGRAMFILES"
+# Read Size chosen per Device: {st_dev: (chunk_size, source)}, source is "filesystem", "calibrated" or "override".
+DEVICE_CHUNK_SIZES = {}
 
-PROGRAMFILES_X86 = "PROGRAMFILES(X86)"
+# Number of evenly spaced Blocks a Fingerprint samples between the Head and the Tail of a File.
+FINGERPRINT_SAMPLES = 8
 
-# Processor Architecture Version
-PROCESSOR_ARCHITECTURE = "PROCESSOR_ARCHITECTURE"
+# Number of Bytes a Fingerprint reads at every sampled Offset.
+FINGERPRINT_BLOCK_SIZE = 4096
 
+# Prefix of a Pattern String that is a Regular Expression instead of a Glob.
+REGEX_PREFIX = "re:"
 
-def is_64_bit_os():
+# File Name Patterns that are never Hashed, the Checksum Program itself and Checksum Files.
+# They can not cross "/", so Files inside a Folder such as checksums/ or data.json.d/ are still Hashed.
+DEFAULT_EXCLUDE = (re.compile(r"[^/]*checksum[^/]*\Z"), re.compile(r"[^/]*\.json[^/]*\Z"))
+
+
+def compile_patterns(patterns = ()):
     """
-    Try and Identify if the Operating System is 64bit
-    :return: True or False
+    Compile Include or Exclude Patterns into one Regular Expression.
+    Strings are Glob Patterns, or Regular Expressions if they start with "re:", i.e "re:.*\\.tmp$". Compiled
+    re.Pattern Objects are used as they are.
+    A Pattern Matches a File or Folder Name, or its Path relative to the Root using "/" as Separator, from its Start.
+    :param patterns: Pattern, Iterable of Patterns, an already compiled Pattern or None.
+    :return: Compiled Regular Expression or None if there are no Patterns.
     """
-    try:
-        if PROGRAMFILES_X86 in os.environ[PROGRAMFILES]:
-            return True
-        if os.environ[PROCESSOR_ARCHITECTURE].endswith("64"):
-            return True
-        return False
-    except Exception as exception:
-        print(exception)
+    if patterns is None:
+        return None
+    if isinstance(patterns, (str, re.Pattern)):
+        patterns = [patterns]
+
+    expressions = [pattern.pattern if isinstance(pattern, re.Pattern) else
+                   pattern[len(REGEX_PREFIX):] if pattern.startswith(REGEX_PREFIX) else fnmatch.translate(pattern)
+                   for pattern in patterns]
+    if not expressions:
+        return None
+    return re.compile("|".join(f"(?:{expression})" for expression in expressions))
+
+
+def _matches(pattern, name, relative_path):
+    """
+    Check if a compiled Pattern Matches a Name or a relative Path.
+    """
+    return pattern.match(name) is not None or pattern.match(relative_path) is not None
+
+
+def walk_files(root = None, include = None, exclude = None, exclude_dirs = None, ignore_files = ()):
+    """
+    Lazily Walk the root Folder and all Sub Directories with os.scandir.
+    Entries are yielded as they are found, so Hashing can start at once and Memory stays flat.
+    Excluded Folders are pruned before they are Opened. Symbolic Links to Folders are not followed.
+    :param root: Parent folder. Default is the Current Working Directory.
+    :param include: Glob or Regex Patterns, only Files Matching one of them are yielded.
+    :param exclude: Glob or Regex Patterns of Files to Skip.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip with all their Content.
+    :param ignore_files: File Names to Skip.
+    :return: Generator of os.DirEntry Objects. Their stat() Result is Cached.
+    """
+    include = compile_patterns(include)
+    exclude = compile_patterns(exclude)
+    exclude_dirs = compile_patterns(exclude_dirs)
+    ignore_files = frozenset(ignore_files)
+
+    # Folders still to Scan, with their Path relative to the Root.
+    directories = [(root or os.getcwd(), "")]
+    while directories:
+        directory, relative_directory = directories.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            # Folders that vanished or can not be Read are Skipped, as os.walk does.
+            continue
+
+        with entries:
+            for entry in entries:
+                name = entry.name
+                relative_path = f"{relative_directory}/{name}" if relative_directory else name
+
+                try:
+                    is_directory = entry.is_dir()
+                except OSError:
+                    is_directory = False
+
+                if is_directory:
+                    if entry.is_symlink():
+                        continue
+                    if exclude_dirs is None or not _matches(exclude_dirs, name, relative_path):
+                        directories.append((entry.path, relative_path))
+                    continue
+
+                if name in ignore_files:
+                    continue
+                if include is not None and not _matches(include, name, relative_path):
+                    continue
+                if exclude is not None and _matches(exclude, name, relative_path):
+                    continue
+                yield entry
 
 
 def get_path_to_all_files(absolute_path = os.getcwd(), ignore_files = []):
     """
     Get valid file paths to all files in the parent folder and all sub directories.
     :param absolute_path: Parent folder
+    :param ignore_files: File Names to Ignore.
     :return: List of Files paths.
     """
-    list_of_files = list()
-    for (directory_path, directory_names, filenames) in os.walk(absolute_path):
-        list_of_files += [os.path.join(directory_path, file) for file in filenames if
-                          "checksum" not in file and ".json" not in file and file not in ignore_files]
-    return list_of_files
+    return [entry.path for entry in walk_files(absolute_path, exclude = DEFAULT_EXCLUDE, ignore_files = ignore_files)]
 
 
-def checksum_blake2(file_path, chunk_num_blocks = 128, digest_size = 64):
+def device_chunk_size(file_stat):
     """
-    Compute the Blake2B or Blake2S Checksum of the give File.
-    :param file_path: File to Read
-    :param chunk_num_blocks: Chunk Number of Blocks
-    :param digest_size: Length of Digest Output.
-    :return: Hexadecimal Checksum of the file.
+    Read Size of the Device a File is on. Unless a Calibration or Override set it, it is the File System's
+    preferred I/O Size, at least DEFAULT_CHUNK_SIZE and at most MAX_CHUNK_SIZE.
+    :param file_stat: os.stat_result of the File.
+    :return: Number of Bytes per Read.
+    """
+    chosen = DEVICE_CHUNK_SIZES.get(file_stat.st_dev)
+    if chosen is None:
+        preferred = getattr(file_stat, "st_blksize", 0) or 0
+        chosen = DEVICE_CHUNK_SIZES[file_stat.st_dev] = (min(MAX_CHUNK_SIZE, max(DEFAULT_CHUNK_SIZE, preferred)),
+                                                         "filesystem")
+    return chosen[0]
+
+
+def set_device_chunk_size(path, chunk_size):
+    """
+    Override the Read Size of the Device a Path is on.
+    Set it before hash_files starts its Workers, so they inherit it.
+    :param path: Any Path on the Device.
+    :param chunk_size: Number of Bytes per Read.
+    :return:
+    """
+    DEVICE_CHUNK_SIZES[os.stat(path).st_dev] = (int(chunk_size), "override")
+
+
+def read_chunk_size(file_stat, block_size, chunk_num_blocks = None):
+    """
+    Choose the Number of Bytes per Read of a File.
+    :param file_stat: os.stat_result of the File.
+    :param block_size: Block Size of the Hash Algorithm.
+    :param chunk_num_blocks: Explicit Chunk Number of Blocks of the Hash Algorithm. None chooses the Read Size of
+    the Device, see device_chunk_size.
+    :return: Number of Bytes per Read.
+    """
+    if chunk_num_blocks is not None:
+        return chunk_num_blocks * block_size
+
+    chunk_size = device_chunk_size(file_stat)
+
+    # Small Files get a Buffer of their own Size, rounded up to whole Blocks, instead of a big one.
+    if stat.S_ISREG(file_stat.st_mode) and file_stat.st_size < chunk_size:
+        chunk_size = max(block_size, -(-file_stat.st_size // block_size) * block_size)
+    return chunk_size
+
+
+def chosen_chunk_size(file_path, algorithm = "blake2", chunk_num_blocks = None):
     """
+    Report the Number of Bytes per Read the Hash Functions use for a File.
+    :param file_path: Path of the File.
+    :param algorithm: Algorithm Name or List of Names, see new_hash.
+    :param chunk_num_blocks: Explicit Chunk Number of Blocks, or None.
+    :return: Tuple (chunk_size, source), source is "blocks" for an explicit chunk_num_blocks, otherwise the source
+    of the Device's Read Size in DEVICE_CHUNK_SIZES.
+    """
+    file_stat = os.stat(file_path)
+    chunk_size = read_chunk_size(file_stat, new_hash(algorithm).block_size, chunk_num_blocks)
+    return chunk_size, "blocks" if chunk_num_blocks is not None else DEVICE_CHUNK_SIZES[file_stat.st_dev][1]
+
 
-    # Enforce that Digest Size is within the Given Bounds X is an Element of [16, 64].
+def calibrate_chunk_size(file_path, algorithm = "blake2", chunk_sizes = CALIBRATION_CHUNK_SIZES,
+                         sample_size = 64 * 1024 ** 2, repeat = 2):
+    """
+    Time Hashing the Head of a File with every Read Size and keep the fastest for the File's Device.
+    The Head is Read once before, so the Calibration measures System Call and Hashing Cost, not the Storage.
+    Calibrate before hash_files starts its Workers, so they inherit the Result.
+    :param file_path: Path of a large File on the Device.
+    :param algorithm: Algorithm Name, see new_hash.
+    :param chunk_sizes: Read Sizes in Bytes to try.
+    :param sample_size: Number of Bytes Hashed per Try.
+    :param repeat: Number of Tries per Read Size, the fastest counts.
+    :return: Fastest Number of Bytes per Read.
+    """
+    timings = {}
+    with open(file_path, "rb", buffering = 0) as file:
+        for chunk_size in (max(chunk_sizes),) + tuple(chunk_sizes):
+            buffer = bytearray(chunk_size)
+            with memoryview(buffer) as view:
+                for _ in range(repeat):
+                    hash_type = new_hash(algorithm)
+                    remaining = sample_size
+                    file.seek(0)
+                    start = time.perf_counter()
+                    size = file.readinto(buffer)
+                    while size and remaining > 0:
+                        hash_type.update(view[:min(size, remaining)])
+                        remaining -= size
+                        size = file.readinto(buffer)
+                    elapsed = time.perf_counter() - start
+                    timings[chunk_size] = min(elapsed, timings.get(chunk_size, elapsed))
+
+    # The first Entry only warmed the Page Cache, it is timed again in the Loop.
+    fastest = min(chunk_sizes, key = timings.get)
+    DEVICE_CHUNK_SIZES[os.stat(file_path).st_dev] = (fastest, "calibrated")
+    return fastest
+
+
+def update_hash_from_file(hash_type, file, chunk_size, read_mode = "readinto"):
+    """
+    Feed the whole Content of an open File to a Hash Object a Chunk at a time.
+    :param hash_type: Hash Object to Update.
+    :param file: File opened in Binary Mode.
+    :param chunk_size: Number of Bytes per Chunk.
+    :param read_mode: One of READ_MODES.
+    :return: Hash Object.
+    """
+    if read_mode not in READ_MODES:
+        raise ValueError(f"Unknown read_mode {read_mode!r}, use one of {READ_MODES}.")
+
+    if read_mode == "sparse":
+        file_stat = os.fstat(file.fileno())
+        if _can_seek_data(file, file_stat):
+            _update_hash_sparse(hash_type, file, chunk_size, file_stat.st_size)
+            return hash_type
+        read_mode = "readinto"
+
+    if read_mode in ("mmap", "auto"):
+        file_stat = os.fstat(file.fileno())
+        # Only Regular, non Empty Files can be Memory Mapped.
+        can_map = stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > 0
+        if can_map and (read_mode == "mmap" or file_stat.st_size >= MMAP_THRESHOLD):
+            with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as mapped_file:
+                with memoryview(mapped_file) as view:
+                    for offset in range(0, len(view), chunk_size):
+                        hash_type.update(view[offset:offset + chunk_size])
+            return hash_type
+        read_mode = "readinto"
+
+    if read_mode == "readinto":
+        # Refill the same Buffer and hash a View of it, so no Chunk is Allocated or Copied.
+        buffer = bytearray(chunk_size)
+        with memoryview(buffer) as view:
+            size = file.readinto(buffer)
+            while size:
+                hash_type.update(view[:size])
+                size = file.readinto(buffer)
+        return hash_type
+
+    # Read and Iterate over the Data a step at a time until an Empty Line is received.
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        hash_type.update(chunk)
+    return hash_type
+
+
+def data_extents(file_descriptor, size):
+    """
+    Find the Data Extents of a File with SEEK_DATA and SEEK_HOLE. Everything between them is a Hole that Reads as
+    Zeros. File Systems that do not track Holes report the whole File as one Extent.
+    :param file_descriptor: Descriptor of a Regular File.
+    :param size: Size of the File in Bytes. Extents end there even if the File grows.
+    :return: Generator of Tuples (start, end) of Byte Offsets.
+    """
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(file_descriptor, offset, os.SEEK_DATA)
+        except OSError as exception:
+            if exception.errno == errno.ENXIO:
+                # No Data after offset, the Rest of the File is a Hole.
+                return
+            raise
+        if start >= size:
+            return
+        end = min(os.lseek(file_descriptor, start, os.SEEK_HOLE), size)
+        yield start, end
+        offset = end
+
+
+def _can_seek_data(file, file_stat):
+    """
+    Check if the Data Extents of an open File can be found, see data_extents.
+    """
+    if not SPARSE_SUPPORTED or not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+        return False
+    try:
+        os.lseek(file.fileno(), 0, os.SEEK_DATA)
+    except OSError as exception:
+        # ENXIO: the File is one Hole. Others, i.e EINVAL: the File System does not support SEEK_DATA.
+        return exception.errno == errno.ENXIO
+    return True
+
+
+def _update_hash_sparse(hash_type, file, chunk_size, size):
+    """
+    Feed a Sparse File to a Hash Object, Reading its Data Extents and feeding Zeros for its Holes.
+    The Hash is the same as of a full Read. Zeros go to hash_type.update_hole if it has one, see _timed_hash.
+    :param size: Size of the File in Bytes when it was opened.
+    """
+    update_hole = getattr(hash_type, "update_hole", hash_type.update)
+    zeros = bytes(chunk_size)
+
+    def update_zeros(length):
+        for _ in range(length // chunk_size):
+            update_hole(zeros)
+        if length % chunk_size:
+            update_hole(zeros[:length % chunk_size])
+
+    buffer = bytearray(chunk_size)
+    position = 0
+    with memoryview(buffer) as view:
+        for start, end in data_extents(file.fileno(), size):
+            update_zeros(start - position)
+            file.seek(start)
+            position = start
+            while position < end:
+                read = file.readinto(view[:min(chunk_size, end - position)])
+                if not read:
+                    # Truncated while Reading, a full Read ends here as well.
+                    return
+                hash_type.update(view[:read])
+                position += read
+        update_zeros(size - position)
+
+        # Data appended since the File was opened is Read as a full Read would.
+        file.seek(size)
+        read = file.readinto(buffer)
+        while read:
+            hash_type.update(view[:read])
+            read = file.readinto(buffer)
+
+
+class _timed_hash:
+    """
+    Hash Object Proxy that adds the Time spent in update and the Number of Bytes to a hash_stats.
+    """
+    __slots__ = ("hash_type", "stats", "block_size")
+
+    def __init__(self, hash_type, stats):
+        self.hash_type = hash_type
+        self.stats = stats
+        self.block_size = hash_type.block_size
+
+    def update(self, data):
+        start = time.perf_counter()
+        self.hash_type.update(data)
+        self.stats.add_phase(HASH, time.perf_counter() - start)
+        self.stats.bytes_read += len(data)
+
+    def update_hole(self, data):
+        """
+        Hash Zeros of a Hole, counted as Bytes not Read.
+        """
+        start = time.perf_counter()
+        self.hash_type.update(data)
+        self.stats.add_phase(HASH, time.perf_counter() - start)
+        self.stats.bytes_sparse += len(data)
+
+
+class _timed_file:
+    """
+    Binary File Proxy that adds the Time spent in read and readinto to a hash_stats.
+    """
+    __slots__ = ("file", "stats")
+
+    def __init__(self, file, stats):
+        self.file = file
+        self.stats = stats
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seek(self, offset, whence = os.SEEK_SET):
+        return self.file.seek(offset, whence)
+
+    def read(self, size = -1):
+        start = time.perf_counter()
+        data = self.file.read(size)
+        self.stats.add_phase(READ, time.perf_counter() - start)
+        return data
+
+    def readinto(self, buffer):
+        start = time.perf_counter()
+        size = self.file.readinto(buffer)
+        self.stats.add_phase(READ, time.perf_counter() - start)
+        return size
+
+
+def _hash_path(file_path, hash_type, chunk_num_blocks, read_mode):
+    """
+    Feed a File to a Hash Object. If a hash_stats collects in this Thread, see checksum_stats.collect_stats,
+    the Time spent opening, reading and hashing is added to it. Memory Mapped Files are Read while being Hashed,
+    that Time counts as Hashing.
+    :return: Hexadecimal Checksum.
+    """
+    stats = active_stats()
+    if stats is None:
+        with open(file_path, "rb", buffering = 0) as file:
+            chunk_size = read_chunk_size(os.fstat(file.fileno()), hash_type.block_size, chunk_num_blocks)
+            update_hash_from_file(hash_type, file, chunk_size, read_mode)
+        return hash_type.hexdigest()
+
+    start = time.perf_counter()
+    with open(file_path, "rb", buffering = 0) as file:
+        stats.add_phase(OPEN, time.perf_counter() - start)
+        chunk_size = read_chunk_size(os.fstat(file.fileno()), hash_type.block_size, chunk_num_blocks)
+        update_hash_from_file(_timed_hash(hash_type, stats), _timed_file(file, stats), chunk_size, read_mode)
+    return hash_type.hexdigest()
+
+
+class multi_hash:
+    """
+    Hash Object that feeds the same Data to several Hash Algorithms, so a File is Read once for all of them.
+    Its Hexadecimal Digest joins the Digest of every Algorithm with "+".
+    """
+
+    def __init__(self, algorithms = ("blake2", "sha256")):
+        """
+        :param algorithms: Algorithm Names, see new_hash.
+        """
+        self.hashes = [new_hash(algorithm) for algorithm in algorithms]
+
+    @property
+    def name(self):
+        return "+".join(hash_type.name for hash_type in self.hashes)
+
+    @property
+    def names(self):
+        return [hash_type.name for hash_type in self.hashes]
+
+    @property
+    def digest_size(self):
+        return sum(hash_type.digest_size for hash_type in self.hashes)
+
+    @property
+    def block_size(self):
+        return max(hash_type.block_size for hash_type in self.hashes)
+
+    def update(self, data):
+        for hash_type in self.hashes:
+            hash_type.update(data)
+
+    def digest(self):
+        return b"".join(hash_type.digest() for hash_type in self.hashes)
+
+    def hexdigest(self):
+        return "+".join(hash_type.hexdigest() for hash_type in self.hashes)
+
+    def hexdigests(self):
+        """
+        Hexadecimal Digest of every Algorithm.
+        :return: Dictionary {algorithm: hash_code}.
+        """
+        return {hash_type.name: hash_type.hexdigest() for hash_type in self.hashes}
+
+    def split_hexdigest(self, hexdigest):
+        """
+        Split a Hexadecimal Digest of this multi_hash into the Digest of every Algorithm.
+        :param hexdigest: Digests joined with "+", or None.
+        :return: Dictionary {algorithm: hash_code} or None.
+        """
+        if hexdigest is None:
+            return None
+        return dict(zip(self.names, hexdigest.split("+")))
+
+    def copy(self):
+        duplicate = multi_hash(())
+        duplicate.hashes = [hash_type.copy() for hash_type in self.hashes]
+        return duplicate
+
+
+def new_hash(algorithm = "blake2", digest_size = 64):
+    """
+    Create a Hash Object from an Algorithm Name.
+    :param algorithm: Name in the checksum_algorithms Registry: "blake2" for Blake2B on 64bit and Blake2S on other
+    Operating Systems, "crc32", "adler32", any Algorithm of hashlib, or a registered one.
+    A List of Names creates a multi_hash.
+    :param digest_size: Length of the Blake2 Digest Output.
+    :return: Hash Object.
+    """
+    if isinstance(algorithm, (list, tuple)):
+        return multi_hash(algorithm)
+    if algorithm != "blake2":
+        return create_hash(algorithm)
+
+    # Enforce that Digest Size is within the Given Bounds X is an Element of [16, 64], or 32 for Blake2S.
     if digest_size < 16:
         digest_size = 16
-    elif digest_size > 64:
-        digest_size = 64
+    elif digest_size > BLAKE2.MAX_DIGEST_SIZE:
+        digest_size = BLAKE2.MAX_DIGEST_SIZE
 
-    # Use Blake2B Hash Method
-    hash_type = hashlib.blake2b(digest_size = digest_size) if is_64_bit_os() else hashlib.blake2s(
-        digest_size = digest_size)
-    with open(file_path, "rb") as file:
-        # Read and Iterate over the Data a step at a time until an Empty Line is received.
-        for chunk in iter(lambda: file.read(chunk_num_blocks * hash_type.block_size), b""):
-            hash_type.update(chunk)
+    return create_hash("blake2", digest_size = digest_size)
 
-    return hash_type.hexdigest()
 
+def _cached_checksum(file_path, hash_type, cache, compute):
+    """
+    Look a File up in a Hash Cache and only compute its Checksum if its stat Data changed.
+    :param file_path: Path of the File.
+    :param hash_type: Hash Object the Checksum is computed with.
+    :param cache: checksum_cache.hash_cache or None.
+    :param compute: Function without Arguments that Hashes the File.
+    :return: Hexadecimal Checksum of the File.
+    """
+    if cache is None:
+        return compute()
+
+    algorithm = cache.algorithm_key(hash_type)
+    file_stat = os.stat(file_path)
+    digest = cache.lookup(file_path, file_stat, algorithm)
+    if digest is None:
+        digest = compute()
+        cache.store(file_path, file_stat, algorithm, digest)
+    return digest
 
-def size_cap_checksum_blake2(file_path, chunk_num_blocks = 128, digest_size = 64, size_cap_in_mb = 250.0):
+
+def checksum_blake2(file_path, chunk_num_blocks = None, digest_size = 64, read_mode = "readinto", cache = None):
+    """
+    Compute the Blake2B or Blake2S Checksum of the give File.
+    :param file_path: File to Read
+    :param chunk_num_blocks: Chunk Number of Blocks. Default None chooses the Read Size, see read_chunk_size.
+    :param digest_size: Length of Digest Output.
+    :param read_mode: How the File is Read, one of READ_MODES.
+    :param cache: Optional checksum_cache.hash_cache. Unchanged Files get their Cached Checksum without being Read.
+    :return: Hexadecimal Checksum of the file.
+    """
+    hash_type = new_hash("blake2", digest_size)
+    return _cached_checksum(file_path, hash_type, cache,
+                            lambda: _hash_path(file_path, hash_type, chunk_num_blocks, read_mode))
+
+
+def size_cap_checksum_blake2(file_path, chunk_num_blocks = None, digest_size = 64, size_cap_in_mb = 250.0,
+                             read_mode = "readinto"):
     """
     Compute the Blake2B Checksum of the give File.
     :param file_path: File to Read
-    :param chunk_num_blocks: Chunk Number of Blocks
+    :param chunk_num_blocks: Chunk Number of Blocks. Default None chooses the Read Size, see read_chunk_size.
     :param digest_size: Length of Digest Output.
     :param size_cap_in_mb: Size Cap of a file in Megabytes that should not be exceeded.
+    :param read_mode: How the File is Read, one of READ_MODES.
     :return: Hexadecimal Checksum of the file.
     """
     size_in_bytes = os.stat(file_path).st_size
     size_in_megabytes = size_in_bytes / 1024.0 ** 2
 
-    print(f"{os.path.basename(file_path)} = Size in MB {size_in_megabytes}")
+    logger.debug("%s = Size in MB %s", os.path.basename(file_path), size_in_megabytes)
 
     if size_in_megabytes > size_cap_in_mb:
-        print(f"The File {os.path.basename(file_path)} is to big to process." \
-              f"\nOnly files smaller than {size_cap_in_mb} will be processed!")
+        _skip_size_cap(file_path, size_cap_in_mb)
     else:
-        return checksum_blake2(file_path, chunk_num_blocks, digest_size)
+        return checksum_blake2(file_path, chunk_num_blocks, digest_size, read_mode)
 
 
-def checksum(file_path, hash_type = hashlib.sha256, chunk_num_blocks = 128):
+def _skip_size_cap(file_path, size_cap_in_mb, stats = None):
+    """
+    Count a File bigger than the Size Cap as skipped, in stats or the active Collector, instead of Logging it.
     """
-    Compute a hash Checksum of the given File. Default Hash Method is MD5
+    logger.debug("The File %s is to big to process. Only files smaller than %s MB will be processed!",
+                 os.path.basename(file_path), size_cap_in_mb)
+    stats = stats or active_stats()
+    if stats is not None:
+        stats.add_skip(SIZE_CAP)
+
+
+def _as_hash(hash_type):
+    """
+    Get a Hash Object from a Hash Object, a Constructor or an Algorithm Name.
+    """
+    if isinstance(hash_type, (str, list, tuple)):
+        return new_hash(hash_type)
+    if not hasattr(hash_type, "update"):
+        return hash_type()
+    return hash_type
+
+
+def checksum(file_path, hash_type = hashlib.sha256, chunk_num_blocks = None, read_mode = "readinto", cache = None):
+    """
+    Compute a hash Checksum of the given File. Default Hash Method is SHA256
     :param file_path: Path of the File.
-    :param hash_type: Specify which Hash Algorithm to use (mdf5, sha256, sha3, etc).
-    :param chunk_num_blocks:
+    :param hash_type: Specify which Hash Algorithm to use (md5, sha256, sha3, etc): a Hash Object, a Constructor
+    such as hashlib.sha256, or an Algorithm Name, see new_hash.
+    :param chunk_num_blocks: Chunk Number of Blocks. Default None chooses the Read Size, see read_chunk_size.
+    :param read_mode: How the File is Read, one of READ_MODES.
+    :param cache: Optional checksum_cache.hash_cache. Unchanged Files get their Cached Checksum without being Read.
     :return: Hexadecimal Checksum of the File.
     """
-    hash_to_use = None
-    hash_to_use = hash_type
-    with open(file_path, "rb") as file:
-        # Read and Iterate over the Data a step at a time until an Empty Line is received.
-        for chunk in iter(lambda: file.read(chunk_num_blocks * hash_to_use.block_size), b""):
-            hash_to_use.update(chunk)
-    return hash_to_use.hexdigest()
+    hash_to_use = _as_hash(hash_type)
 
+    return _cached_checksum(file_path, hash_to_use, cache,
+                            lambda: _hash_path(file_path, hash_to_use, chunk_num_blocks, read_mode))
 
-def size_cap_checksum(file_path, hash_type = hashlib.sha256, chunk_num_blocks = 128, size_cap_in_mb = 250):
+
+def size_cap_checksum(file_path, hash_type = hashlib.sha256, chunk_num_blocks = None, size_cap_in_mb = 250,
+                      read_mode = "readinto"):
     """
-    Compute the Checksum of the given file smaller than the given size cap in Megabytes. Default Hash Method is MD5
+    Compute the Checksum of the given file smaller than the given size cap in Megabytes. Default Hash Method is SHA256
     :param file_path: Path of the File.
-    :param hash_type: Specify which Hash Algorithm to use (mdf5, sha256, sha3, etc).
-    :param chunk_num_blocks:
+    :param hash_type: Specify which Hash Algorithm to use (md5, sha256, sha3, etc), see checksum.
+    :param chunk_num_blocks: Chunk Number of Blocks. Default None chooses the Read Size, see read_chunk_size.
     :param size_cap_in_mb: Size Cap of a file in Megabytes that should not be exceeded.
+    :param read_mode: How the File is Read, one of READ_MODES.
     :return: Hexadecimal Checksum of the File.
     """
     size_in_bytes = os.stat(file_path).st_size
     size_in_megabytes = size_in_bytes / 1024.0 ** 2
 
-    print(f"{os.path.basename(file_path)} = Size in MB {size_in_megabytes}")
+    logger.debug("%s = Size in MB %s", os.path.basename(file_path), size_in_megabytes)
 
     if size_in_megabytes > size_cap_in_mb:
-        print(f"The File {os.path.basename(file_path)} is to big to process." \
-              f"\nOnly files smaller than {size_cap_in_mb} will be processed!")
+        _skip_size_cap(file_path, size_cap_in_mb)
     else:
-        return checksum(file_path, hash_type, chunk_num_blocks)
+        return checksum(file_path, hash_type, chunk_num_blocks, read_mode)
+
+
+def read_at(file, size, offset):
+    """
+    Read up to size Bytes at offset of an open File, with os.pread where the Operating System has it.
+    :param file: File opened in Binary Mode.
+    :param size: Number of Bytes to Read.
+    :param offset: Position to Read from.
+    :return: Bytes.
+    """
+    if hasattr(os, "pread"):
+        return os.pread(file.fileno(), size, offset)
+    file.seek(offset)
+    return file.read(size)
+
+
+def fingerprint(file_path, samples = FINGERPRINT_SAMPLES, block_size = FINGERPRINT_BLOCK_SIZE):
+    """
+    Compute a sampled Fingerprint of a File at nearly constant Cost, whatever its Size.
+    The Size of the File, its Head, its Tail and samples evenly spaced Blocks are Hashed with Blake2B.
+    Files of at most (samples + 2) * block_size Bytes are Hashed whole.
+    A Fingerprint is no Checksum: it only tells that a File changed, not that it did not.
+    :param file_path: Path of the File.
+    :param samples: Number of evenly spaced Blocks between the Head and the Tail.
+    :param block_size: Number of Bytes Read at every Offset.
+    :return: Hexadecimal Fingerprint.
+    """
+    hash_type = hashlib.blake2b(digest_size = 16)
+    with open(file_path, "rb", buffering = 0) as file:
+        size = os.fstat(file.fileno()).st_size
+        hash_type.update(size.to_bytes(8, "little"))
+
+        if size <= (samples + 2) * block_size:
+            update_hash_from_file(hash_type, file, (samples + 2) * block_size)
+        else:
+            last_offset = size - block_size
+            offsets = [0] + [last_offset * (index + 1) // (samples + 1) for index in range(samples)] + [last_offset]
+            for offset in offsets:
+                hash_type.update(read_at(file, block_size, offset))
+    return hash_type.hexdigest()
+
+
+def checksum_multi(file_path, algorithms = ("blake2", "sha256"), chunk_num_blocks = None, read_mode = "readinto",
+                   cache = None):
+    """
+    Compute the Checksum of the given File with several Hash Algorithms while Reading it only once.
+    :param file_path: Path of the File.
+    :param algorithms: Algorithm Names, i.e ["blake2b", "sha256", "sha3_512", "md5"].
+    :param chunk_num_blocks: Chunk Number of Blocks of the Algorithm with the biggest Block Size.
+    Default None chooses the Read Size, see read_chunk_size.
+    :param read_mode: How the File is Read, one of READ_MODES.
+    :param cache: Optional checksum_cache.hash_cache. Unchanged Files get their Cached Checksums without being Read.
+    :return: Dictionary {algorithm: hash_code}.
+    """
+    hash_type = multi_hash(algorithms)
+    return hash_type.split_hexdigest(checksum(file_path, hash_type, chunk_num_blocks, read_mode, cache))
 
 
 def write_checksum_to_json(checksum_data = [], path = os.path.join(os.getcwd())):
@@ -153,69 +770,34 @@ def write_checksum_to_json(checksum_data = [], path = os.path.join(os.getcwd()))
     :param path: Path of the File.
     :return:
     """
-    print(path)
     file_name = os.path.basename(path)
-    print(file_name)
     if "checksum" not in file_name.lower():
         if ".json" in file_name.lower():
             path = path.replace(".json", "-checksum.json")
-            print(path)
         else:
             path += "-checksum.json"
-            print(path)
-
-    checksum_dictionary = {}
-    for file_path, hash_value in checksum_data:
-        checksum_dictionary[file_path] = hash_value
+    logger.debug("Write Checksum Data to %s", path)
 
-    json.dump(checksum_dictionary, open(path, mode = "w"), indent = 4, ensure_ascii = False)
+    # Stream the Checksum Data to the File instead of building one Dictionary of every Path.
+    write_manifest(checksum_data, path, format = "json")
 
 
-def compare(checksum_data = [], checksum_file_path = os.path.join(os.getcwd()), extension = ".json"):
-    """
-    Compare the new Computed Hash Values with the Existing Backup to check if any files were altered or newly found.
-    :param checksum_data: List of Checksum data. Each element is a Tuple (file_path, hash_code)
-    :param checksum_file_path: Path of the Backup Checksum File
-    :param extension: The Extension of the Backup File. Default is .json, however, any type can be specified.
-    :return:
+def compare(new_checksum_data = [], checksum_data_dict = None):
     """
-    path = os.path.join(checksum_file_path, f"checksum{extension}")
-    checksum_dictionary = json.load(open(path, mode = "r"))
-
-    for file_path, hash in checksum_data:
-        if file_path in checksum_dictionary.keys():
-            file_name = os.path.basename(file_path)
-            if hash.lower() == checksum_dictionary[file_path].lower():
-                print(f"[Match]\n{file_path}\n{file_name} : {hash} \n")
-            else:
-                print(f"[This is an altered File!]\n{file_path}\n{file_name} : {hash} \n")
-        else:
-            print(f"[This is a new File!]\n{file_path}\n{file_name} : {hash} \n")
-
-
-def compare(new_checksum_data = [], checksum_data_dict = {}):
-    """
-    Compare the new Computed Hash Values with the Existing Backup to check if any files were altered or newly found.
+    Compare the new Computed Hash Values with the Existing Backup to check if any files were altered, newly found
+    or removed. str() of the Result renders it as Text, or use its render() Generator to Render it lazily.
     :param new_checksum_data: List of Checksum data. Each element is a Tuple (file_path, hash_code)
-    :param checksum_data_dict:
-    :return:
+    :param checksum_data_dict: Backup Checksum Data. A Dictionary {file_path: hash_code}, a List of Tuples
+    (file_path, hash_code) or the Path of a Checksum File of any Manifest Format. Default is checksum.json in the
+    Current Working Directory.
+    :return: checksum_diff.checksum_diff with the matched, altered, added and removed Files.
     """
-    checksum_string = ""
+    if checksum_data_dict is None:
+        checksum_data_dict = os.path.join(os.getcwd(), "checksum.json")
+    if isinstance(checksum_data_dict, (str, os.PathLike)):
+        checksum_data_dict = read_manifest(checksum_data_dict)
 
-    for file_path, hash_value in new_checksum_data:
-        if file_path in checksum_data_dict.keys():
-            file_name = os.path.basename(file_path)
-            if hash_value.lower() == checksum_data_dict[file_path].lower():
-                checksum_string += f"[Match]\n{file_path}\n{file_name} : {hash_value} \n\n"
-                print(checksum_string)
-            else:
-                checksum_string += f"[This is an altered File!]\n{file_path}\n{file_name} : {hash_value} \n\n"
-                print(checksum_string)
-        else:
-            checksum_string += f"[This is a new File!]\n{file_path}\n{file_name} : {hash_value} \n\n"
-            print(checksum_string)
-
-    return checksum_string
+    return diff_checksums(new_checksum_data, checksum_data_dict)
 
 
 def stringify_checksum_data_array(checksum_data = []):
@@ -226,7 +808,7 @@ def stringify_checksum_data_array(checksum_data = []):
             string_checksum_data += f"{os.path.basename(file_path)} : {hash_value}\n"
         else:
             continue
-    print(f"String Checksum :\n{string_checksum_data}")
+    logger.debug("String Checksum :\n%s", string_checksum_data)
     return string_checksum_data
 
 
@@ -237,7 +819,7 @@ def stringify_checksum_data_dictionary(checksum_data = {}):
             string_checksum_data += f"{os.path.basename(key)} : {value}\n"
         else:
             continue
-    print(f"String Checksum :\n{string_checksum_data}")
+    logger.debug("String Checksum :\n%s", string_checksum_data)
     return string_checksum_data
 
 
@@ -251,31 +833,546 @@ def checksum_data_dict_to_array(checksum_data = {}):
     return checksum_data_array
 
 
-if __name__ == "__main__":
-    # Pretty Print Lambda
-    pretty_print = lambda array: print(*array, sep = "\n")
+def hash_file(file_path, algorithm = "blake2", chunk_num_blocks = None, size_cap_in_mb = None,
+              read_mode = "readinto", leaf_size = None, leaf_workers = None):
+    """
+    Compute the Checksum of the given File using a Hash Algorithm given by Name.
+    :param file_path: Path of the File.
+    :param algorithm: "blake2" to use checksum_blake2, otherwise any Name in the checksum_algorithms Registry.
+    A List of Names Hashes the File once with every Algorithm.
+    :param chunk_num_blocks: Chunk Number of Blocks. Default None chooses the Read Size, see read_chunk_size.
+    :param size_cap_in_mb: Optional Size Cap of a file in Megabytes. Bigger Files are not processed.
+    :param read_mode: How the File is Read, one of READ_MODES.
+    :param leaf_size: Optional Size of a Leaf in Bytes, to compute a Merkle Tree Checksum of a single Algorithm,
+    see checksum_tree. chunk_num_blocks and read_mode do not apply to it.
+    :param leaf_workers: Number of Threads Hashing the Leaves of the File. Default is min(32, CPUs + 4).
+    :return: Hexadecimal Checksum of the File, or a Dictionary {algorithm: hash_code} for a List of Names,
+    or a Tuple (root_hash_code, [leaf_hash_code, ...]) with a leaf_size.
+    """
+    if leaf_size is not None:
+        # checksum_tree builds on this Module, it is only Imported once a Tree is Hashed.
+        from checksum_tree import tree_checksum
+
+        if isinstance(algorithm, (list, tuple)):
+            raise ValueError("Merkle Tree Checksums are computed with a single Algorithm.")
+        if size_cap_in_mb is not None and os.stat(file_path).st_size > size_cap_in_mb * 1024.0 ** 2:
+            _skip_size_cap(file_path, size_cap_in_mb)
+            return None
+        return tree_checksum(file_path, algorithm, leaf_size, leaf_workers)
+
+    if isinstance(algorithm, (list, tuple)):
+        hash_type = multi_hash(algorithm)
+        if size_cap_in_mb is not None:
+            hexdigest = size_cap_checksum(file_path, hash_type, chunk_num_blocks, size_cap_in_mb, read_mode)
+        else:
+            hexdigest = checksum(file_path, hash_type, chunk_num_blocks, read_mode)
+        return hash_type.split_hexdigest(hexdigest)
+
+    if algorithm == "blake2":
+        if size_cap_in_mb is not None:
+            return size_cap_checksum_blake2(file_path, chunk_num_blocks, size_cap_in_mb = size_cap_in_mb,
+                                            read_mode = read_mode)
+        return checksum_blake2(file_path, chunk_num_blocks, read_mode = read_mode)
+
+    if size_cap_in_mb is not None:
+        return size_cap_checksum(file_path, new_hash(algorithm), chunk_num_blocks, size_cap_in_mb, read_mode)
+    return checksum(file_path, new_hash(algorithm), chunk_num_blocks, read_mode)
+
+
+class _tree_counter:
+    """
+    Number of Merkle Tree Files the Threads of this Process are Hashing at once, with the Interface of a
+    multiprocessing.Value, which Worker Processes share instead, see _share_trees_in_flight.
+    """
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def get_lock(self):
+        return self.lock
+
+
+# Merkle Tree Files being Hashed at once, by this Process or by every Process of the Pool it Works in.
+_trees_in_flight = _tree_counter()
+
+
+def _share_trees_in_flight(counter):
+    """
+    Initializer of the Worker Processes of hash_files, so they Count their Merkle Tree Files together.
+    """
+    global _trees_in_flight
+    _trees_in_flight = counter
+
+
+def _pooled_hash_file(path, algorithm, options):
+    """
+    hash_file inside a Worker. A Merkle Tree File gets an equal Share of the leaf_workers Threads among the Tree
+    Files being Hashed at once, so a single big File Hashes its Leaves in Parallel, and a saturated Pool Hashes the
+    Leaves of every File in turn.
+    """
+    if options.get("leaf_size") is None:
+        return hash_file(path, algorithm, **options)
+
+    leaf_workers = options.get("leaf_workers") or min(32, (os.cpu_count() or 1) + 4)
+    counter = _trees_in_flight
+    with counter.get_lock():
+        counter.value += 1
+        in_flight = counter.value
+    try:
+        return hash_file(path, algorithm, **dict(options, leaf_workers = max(1, leaf_workers // in_flight)))
+    finally:
+        with counter.get_lock():
+            counter.value -= 1
+
+
+class _stats_batch(list):
+    """
+    Batch of Results together with the hash_stats the Worker collected while Hashing it.
+    """
+
+
+def _hash_batch(paths, algorithm, options, slowest_count = None, fingerprints = False):
+    """
+    Hash a Batch of Files inside a Worker. Files that can not be read get a None Hash Value.
+    :param paths: List of File Paths. With fingerprints, Tuples (file_path, hash_code) of Cache Hits are only
+    Fingerprinted.
+    :param algorithm: Algorithm Name for hash_file.
+    :param options: Dictionary of Keyword Arguments for hash_file.
+    :param slowest_count: If not None, collect a hash_stats keeping this many slowest Files, see checksum_stats.
+    :param fingerprints: Compute the Fingerprint of every Hashed File as well, while its Pages are still cached.
+    :return: List of Tuples (file_path, hash_code), or (file_path, hash_code, fingerprint) with fingerprints,
+    a _stats_batch with its stats if slowest_count is not None.
+    """
+    if slowest_count is not None:
+        return _hash_batch_with_stats(paths, algorithm, options, slowest_count, fingerprints)
+
+    checksum_data = []
+    for path in paths:
+        if isinstance(path, tuple):
+            path, hash_value = path
+        else:
+            try:
+                hash_value = _pooled_hash_file(path, algorithm, options)
+            except OSError as exception:
+                logger.warning("%s", exception)
+                hash_value = None
+        checksum_data.append(_with_fingerprint(path, hash_value) if fingerprints else (path, hash_value))
+    return checksum_data
+
+
+def _hash_batch_with_stats(paths, algorithm, options, slowest_count, fingerprints = False):
+    """
+    _hash_batch that collects a hash_stats of the Batch.
+    """
+    checksum_data = _stats_batch()
+    checksum_data.stats = stats = hash_stats(slowest_count)
+    with collect_stats(stats):
+        for path in paths:
+            if isinstance(path, tuple):
+                path, hash_value = path
+            else:
+                start, bytes_read = time.perf_counter(), stats.bytes_read
+                try:
+                    hash_value = _pooled_hash_file(path, algorithm, options)
+                except OSError as exception:
+                    logger.warning("%s", exception)
+                    stats.add_error(exception)
+                    hash_value = None
+                else:
+                    stats.add_file(path, time.perf_counter() - start, stats.bytes_read - bytes_read)
+            checksum_data.append(_with_fingerprint(path, hash_value, stats) if fingerprints else (path, hash_value))
+    return checksum_data
+
+
+def _with_fingerprint(path, hash_value, stats = None):
+    """
+    Result Tuple (file_path, hash_code, fingerprint) of a File, without a Fingerprint if it has no Hash Value.
+    """
+    if hash_value is None:
+        return path, None, None
+    try:
+        return path, hash_value, fingerprint(path)
+    except OSError as exception:
+        logger.warning("%s", exception)
+        if stats is not None:
+            stats.add_error(exception)
+        return path, hash_value, None
+
+
+def _fingerprint_batch(paths):
+    """
+    Fingerprint a Batch of Files inside a Worker. Files that can not be read get a None Fingerprint.
+    """
+    fingerprints = []
+    for path in paths:
+        try:
+            fingerprints.append((path, fingerprint(path)))
+        except OSError:
+            # The Caller Hashes such Files in full, which Reports the Error.
+            fingerprints.append((path, None))
+    return fingerprints
+
+
+def _batched(iterable, batch_size):
+    """
+    Split an Iterable into Lists of at most batch_size Elements without consuming it all at once.
+    """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, batch_size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, batch_size))
+
+
+class _resolved(list):
+    """
+    Batch of Results that are already known, i.e Cache Hits, and are passed through without being Hashed.
+    """
+
+
+def _as_completed(executor, function, batches, max_in_flight):
+    """
+    Submit Batches to the Executor and yield their Results, a List per Batch, as soon as each Batch finishes.
+    At most max_in_flight Batches are queued at once, so the Input is consumed lazily.
+    """
+    in_flight = set()
+    try:
+        for batch in batches:
+            if isinstance(batch, _resolved):
+                yield batch
+                continue
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when = FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            in_flight.add(executor.submit(function, batch))
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when = FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def _size_capped(paths, size_cap_in_mb, capped, stats):
+    """
+    Set aside the Files bigger than the Size Cap, judged by the stat Data os.DirEntry Objects already hold.
+    :param capped: List the Paths of the Files set aside are added to.
+    :return: Generator of the other Paths or Entries.
+    """
+    size_cap = size_cap_in_mb * 1024.0 ** 2
+    for item in paths:
+        try:
+            size = item.stat().st_size if isinstance(item, os.DirEntry) else os.stat(item).st_size
+        except OSError:
+            # Hashing Reports the Error.
+            yield item
+            continue
+        if size > size_cap:
+            _skip_size_cap(os.fspath(item), size_cap_in_mb, stats)
+            capped.append(os.fspath(item))
+        else:
+            yield item
+
+
+def _with_capped(batches, capped, fingerprints = False):
+    """
+    Pass Batches on, with a _resolved Batch of None Hash Values for the Files set aside by _size_capped.
+    """
+    empty = (None, None) if fingerprints else (None,)
+    for batch in batches:
+        if capped:
+            yield _resolved((path,) + empty for path in capped)
+            capped.clear()
+        yield batch
+    if capped:
+        yield _resolved((path,) + empty for path in capped)
+
+
+def _cache_batches(paths, cache, hash_type, batch_size, pending, fingerprints = False):
+    """
+    Split Paths into Batches of Cache Misses to Hash and _resolved Batches of Cache Hits.
+    :param paths: Iterable of File Paths or os.DirEntry Objects.
+    :param cache: checksum_cache.hash_cache.
+    :param hash_type: Hash Object of the Algorithm, see new_hash.
+    :param batch_size: Number of Files per Batch.
+    :param pending: Dictionary the stat Data of each Cache Miss is Stored in by Path, until its Hash is known.
+    :param fingerprints: Send the Cache Hits to the Workers as well, as Tuples (file_path, hash_code), to be
+    Fingerprinted there.
+    :return: Generator of Batches.
+    """
+    algorithm = cache.algorithm_key(hash_type)
+    hits = [] if fingerprints else _resolved()
+    misses = []
+    for item in paths:
+        path = os.fspath(item)
+        try:
+            # os.DirEntry Objects from walk_files already hold their stat Data.
+            file_stat = item.stat() if isinstance(item, os.DirEntry) else os.stat(path)
+        except OSError:
+            misses.append(path)
+        else:
+            digest = cache.lookup(path, file_stat, algorithm)
+            if digest is None:
+                pending[path] = file_stat
+                misses.append(path)
+            else:
+                if isinstance(hash_type, multi_hash):
+                    digest = hash_type.split_hexdigest(digest)
+                hits.append((path, digest))
+
+        if len(hits) >= batch_size:
+            yield hits
+            hits = [] if fingerprints else _resolved()
+        if len(misses) >= batch_size:
+            yield misses
+            misses = []
+
+    if hits:
+        yield hits
+    if misses:
+        yield misses
+
+
+def _pool_size(mode, workers = None, batch_size = None):
+    """
+    Number of Workers and Batch Size of a Pool, with the Defaults of hash_files.
+    :return: Tuple (workers, batch_size).
+    """
+    if mode not in ("process", "thread"):
+        raise ValueError(f"Unknown mode {mode!r}, use \"process\" or \"thread\".")
+
+    cpu_count = os.cpu_count() or 1
+    if mode == "thread":
+        return workers or min(32, cpu_count + 4), batch_size or 1
+    return workers or cpu_count, batch_size or 64
+
 
-    from timeit import default_timer as timer
+def fingerprint_files(paths, workers = None, batch_size = None, mode = "thread"):
+    """
+    Compute the sampled Fingerprint of many Files in Parallel, see fingerprint.
+    Results are streamed back as they finish, so their Order is not the Order of paths.
+    :param paths: Iterable of File Paths or os.DirEntry Objects, consumed lazily.
+    :param workers: Number of Workers, see hash_files. 1 Fingerprints in this Process.
+    :param batch_size: Number of Files sent to a Worker at once, see hash_files.
+    :param mode: "process" or "thread".
+    :return: Generator of Tuples (file_path, fingerprint), with a None Fingerprint for Files that can not be read.
+    """
+    workers, batch_size = _pool_size(mode, workers, batch_size)
+    batches = _batched(map(os.fspath, paths), batch_size)
+    if workers == 1:
+        for batch in batches:
+            yield from _fingerprint_batch(batch)
+        return
+
+    executor_type = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+    with executor_type(max_workers = workers) as executor:
+        for batch in _as_completed(executor, _fingerprint_batch, batches, workers * 2):
+            yield from batch
+
+
+def hash_files(paths, algorithm = "blake2", workers = None, batch_size = None, mode = "process", cache = None,
+               stats = None, file_filter = None, fingerprints = False, **options):
+    """
+    Compute the Checksum of many Files in Parallel using a Process Pool or a Thread Pool.
+    Results are streamed back as they finish, so their Order is not the Order of paths.
+
+    The "thread" mode keeps one File per Thread in flight. hashlib releases the GIL while hashing big Chunks,
+    so many Reads overlap without the Pickling and Startup Cost of Processes, which suits many small Files
+    or Storage where Latency rather than the CPU is the Limit.
+    :param paths: Iterable of File Paths or os.DirEntry Objects.
+    :param algorithm: "blake2" or any Name in the checksum_algorithms Registry. A List of Names Reads every File once
+    and yields a Dictionary {algorithm: hash_code} per File.
+    :param workers: Number of Worker Processes, or Number of Files in flight in "thread" mode.
+    Default is the Number of CPUs for Processes and min(32, CPUs + 4) for Threads. 1 Hashes in this Process.
+    :param batch_size: Number of Files sent to a Worker at once. Default is 64 for Processes and 1 for Threads.
+    :param mode: "process" or "thread".
+    :param cache: Optional checksum_cache.hash_cache. It is used in this Process only, Unchanged Files are not sent
+    to the Workers at all.
+    :param stats: Optional checksum_stats.hash_stats that collects Timings of the Walk and of every Phase of Hashing,
+    the slowest Files, the Errors and the skipped Files. Cache Hits are not counted as Hashed Files.
+    :param file_filter: Optional checksum_filters.file_filter that drops Files before they are Hashed. Dropped Files
+    are not yielded, only counted.
+    :param fingerprints: Compute the Fingerprint of every File in the Worker that Hashes it, see fingerprint.
+    Cache Hits are sent to the Workers for their Fingerprint only.
+    :param options: Keyword Arguments for hash_file, i.e chunk_num_blocks, size_cap_in_mb, read_mode, leaf_size and
+    leaf_workers. With a leaf_size, the leaf_workers Threads are shared by the Files Hashed at once, so few Files in
+    flight Hash their Leaves in Parallel.
+    Files bigger than size_cap_in_mb get a None Hash Value without being sent to a Worker.
+    :return: Generator of Tuples (file_path, hash_code), or (file_path, hash_code, fingerprint) with fingerprints.
+    Files without a Hash Value or that can not be read get a None Fingerprint.
+    """
+    workers, batch_size = _pool_size(mode, workers, batch_size)
+    if cache is not None and options.get("leaf_size") is not None:
+        raise ValueError("Merkle Tree Checksums are not Cached, Hash them without a cache.")
+
+    if file_filter is not None:
+        paths = file_filter(paths, stats)
+    if stats is not None:
+        # The Walker runs lazily while Paths are taken, time each Step of it.
+        paths = stats.timed(paths, WALK)
+
+    # Paths of the Files bigger than the Size Cap, decided here from the Walker's stat Data.
+    capped = []
+    size_cap_in_mb = options.pop("size_cap_in_mb", None)
+    if size_cap_in_mb is not None:
+        paths = _size_capped(paths, size_cap_in_mb, capped, stats)
 
-    start = timer()
+    try:
+        if cache is None:
+            # Accept os.DirEntry Objects from walk_files, but only send plain Paths to the Workers.
+            batches = _with_capped(_batched(map(os.fspath, paths), batch_size), capped, fingerprints)
+            yield from _hash_batches(batches, algorithm, workers, mode, options, stats, fingerprints)
+            return
+
+        hash_type = new_hash(algorithm)
+        cache_algorithm = cache.algorithm_key(hash_type)
+        pending = {}
+        batches = _with_capped(_cache_batches(paths, cache, hash_type, batch_size, pending, fingerprints), capped,
+                               fingerprints)
+        for result in _hash_batches(batches, algorithm, workers, mode, options, stats, fingerprints):
+            path, digest = result[:2]
+            file_stat = pending.pop(path, None)
+            if file_stat is not None:
+                # Digests of several Algorithms are Cached joined with "+", as multi_hash.hexdigest does.
+                cache.store(path, file_stat, cache_algorithm, "+".join(digest.values()) if isinstance(digest, dict)
+                            else digest)
+            yield result
+        cache.commit()
+    finally:
+        if stats is not None:
+            stats.finish()
+
+
+def _hash_batches(batches, algorithm, workers, mode, options, stats = None, fingerprints = False):
+    """
+    Hash Batches of Paths in this Process if workers is 1, otherwise on a Process or Thread Pool.
+    Every Batch collects its own hash_stats, which is merged into stats once the Batch is back.
+    """
+    slowest_count = None if stats is None else stats.slowest_count
+
+    # Module Level Function with bound Arguments so it can be Pickled to the Worker Processes.
+    hash_batch = partial(_hash_batch, algorithm = algorithm, options = options, slowest_count = slowest_count,
+                         fingerprints = fingerprints)
 
-    # Get Paths to all the Files in the Folder and Sub Folders.
-    paths = get_path_to_all_files()
+    if workers == 1:
+        results = (batch if isinstance(batch, _resolved) else hash_batch(batch) for batch in batches)
+        yield from _merge_batches(results, stats)
+        return
 
-    # Print the file Paths.
-    # print("File Paths:")
-    # pretty_print(paths)
-    print()
+    if mode == "thread":
+        executor = ThreadPoolExecutor(max_workers = workers)
+    elif options.get("leaf_size") is not None:
+        # Worker Processes share the Leaf Threads through one Counter of the Tree Files in flight.
+        executor = ProcessPoolExecutor(max_workers = workers, initializer = _share_trees_in_flight,
+                                       initargs = (multiprocessing.Value("i", 0),))
+    else:
+        executor = ProcessPoolExecutor(max_workers = workers)
+    with executor:
+        yield from _merge_batches(_as_completed(executor, hash_batch, batches, workers * 2), stats)
 
-    # Calculate the Checksum
-    hashed_data = [(path, checksum_blake2(path)) for path in paths]
 
-    # Pretty Print the Checksum
-    print("Blake2b Checksum:")
-    pretty_print(hashed_data)
-    print()
+def _merge_batches(results, stats):
+    """
+    Merge the hash_stats of every finished Batch into stats and yield the Results of the Batch.
+    """
+    for batch in results:
+        if stats is not None and isinstance(batch, _stats_batch):
+            stats.merge(batch.stats)
+        yield from batch
 
-    end = timer()
-    print(end - start)  # Time in seconds, e.g. 5.38091952400282
 
-    os.system("pause")
+def hash_tree(root = None, algorithm = "blake2", workers = None, ignore_files = [], include = None,
+              exclude = DEFAULT_EXCLUDE, exclude_dirs = None, **kwargs):
+    """
+    Compute the Checksum of all the Files in the root Folder and all Sub Directories in Parallel.
+    Files are Walked lazily, so Hashing starts as soon as the first File is found.
+    :param root: Parent folder. Default is the Current Working Directory.
+    :param algorithm: "blake2" or any Name in the checksum_algorithms Registry.
+    :param workers: Number of Worker Processes, or Number of Files in flight in "thread" mode.
+    :param ignore_files: File Names to Ignore.
+    :param include: Glob or Regex Patterns, only Matching Files are Hashed.
+    :param exclude: Glob or Regex Patterns of Files to Skip. Default Skips Checksum and JSON Files.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+    :param kwargs: Additional Arguments for hash_files.
+    :return: Generator of Tuples (file_path, hash_code), streamed as each File finishes.
+    """
+    entries = walk_files(root, include, exclude, exclude_dirs, ignore_files)
+    yield from hash_files(entries, algorithm, workers, **kwargs)
+
+
+def hash_tree_entries(root = None, algorithm = "blake2", workers = None, fingerprints = True, ignore_files = [],
+                      include = None, exclude = DEFAULT_EXCLUDE, exclude_dirs = None, **kwargs):
+    """
+    Compute the Checksum of all the Files in the root Folder and all Sub Directories, like hash_tree,
+    together with the Size and Modification Time the Walker saw, and a sampled Fingerprint.
+    :param root: Parent folder. Default is the Current Working Directory.
+    :param algorithm: "blake2" or any Name in the checksum_algorithms Registry, or a List of Names.
+    :param workers: Number of Worker Processes, or Number of Files in flight in "thread" mode.
+    :param fingerprints: Compute a Fingerprint of every File as well, see fingerprint.
+    :param ignore_files: File Names to Ignore.
+    :param include: Glob or Regex Patterns, only Matching Files are Hashed.
+    :param exclude: Glob or Regex Patterns of Files to Skip. Default Skips Checksum and JSON Files.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+    :param kwargs: Additional Arguments for hash_files, i.e stats or file_filter.
+    :return: Generator of checksum_manifest.manifest_entry, streamed as each File finishes.
+    """
+    entries = walk_files(root, include, exclude, exclude_dirs, ignore_files)
+    yield from hash_entries(entries, algorithm, workers, fingerprints, **kwargs)
+
+
+def hash_entries(entries, algorithm = "blake2", workers = None, fingerprints = True, leaf_size = None, **kwargs):
+    """
+    Compute the Checksum of Files given as os.DirEntry Objects, i.e of several walk_files Walkers chained, together
+    with the Size and Modification Time of their stat Data, and a sampled Fingerprint.
+    :param entries: Iterable of os.DirEntry Objects.
+    :param algorithm: "blake2" or any Name in the checksum_algorithms Registry, or a List of Names.
+    :param workers: Number of Worker Processes, or Number of Files in flight in "thread" mode.
+    :param fingerprints: Compute a Fingerprint of every File as well, see fingerprint.
+    :param leaf_size: Optional Size of a Leaf in Bytes. Every File then gets a Merkle Tree Checksum of a single
+    Algorithm, with its Root Digest as digest and its Leaves stored, so verify can tell the changed Byte Ranges.
+    :param kwargs: Additional Arguments for hash_files, i.e stats or file_filter.
+    :return: Generator of checksum_manifest.manifest_entry, streamed as each File finishes.
+    """
+    stats = kwargs.get("stats")
+
+    # Filter before the stat Data of the Files is remembered, so dropped Files are not held.
+    file_filter = kwargs.pop("file_filter", None)
+    if file_filter is not None:
+        entries = file_filter(entries, stats)
+
+    # stat Data of the Files in flight, by Path.
+    file_stats = {}
+
+    def remember_stat(entries):
+        for entry in entries:
+            try:
+                file_stats[entry.path] = entry.stat()
+            except OSError:
+                pass
+            yield entry
+
+    # The Workers Fingerprint every File right after Hashing it.
+    for path, hash_value, *file_fingerprint in hash_files(remember_stat(entries), algorithm, workers,
+                                                          fingerprints = fingerprints, leaf_size = leaf_size, **kwargs):
+        entry = manifest_entry(path, hash_value, fingerprint = next(iter(file_fingerprint), None))
+        if leaf_size is not None and hash_value is not None:
+            entry.digest, entry.leaves = hash_value
+            entry.leaf_size = leaf_size
+
+        file_stat = file_stats.pop(path, None)
+        if file_stat is not None:
+            entry.size = file_stat.st_size
+            entry.mtime_ns = file_stat.st_mtime_ns
+        yield entry
+
+
+if __name__ == "__main__":
+    # Run the Command Line Interface, "hash" of the Current Working Directory without Arguments.
+    from checksum_cli import main
+
+    sys.exit(main())
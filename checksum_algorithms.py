@@ -0,0 +1,158 @@
+"""
+Hash Algorithm Registry.
+
+Every Hash Function takes an Algorithm by Name. The Registry maps each Name to a Factory that creates a new Hash
+Object, built once when the Module is imported:
+
+1. "blake2" is Blake2B on 64bit and Blake2S on other Operating Systems, decided once at Startup.
+2. Every fixed Size Algorithm hashlib offers, i.e "sha256", "sha3_512" or "md5", under its hashlib Name.
+3. "crc32" and "adler32" from zlib. They are many Times faster than a cryptographic Hash and good enough to
+notice Changes, but anyone can forge a File with a given Checksum, and accidental Collisions are likely in big
+Trees. Use them to detect Change, not Tampering.
+
+Other Algorithms are plugged in with register_algorithm. A Factory returns an Object with the hashlib Interface:
+update, digest, hexdigest, copy, name, digest_size and block_size. Process Pools on Platforms that spawn their
+Workers only know the Algorithms registered when a Module is imported, register them at Import Time there.
+
+Manifests record the Registry Name of their Algorithm, see algorithm_name, so they are Verified with it again.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Program Files Paths in os.environ
+PROGRAMFILES = "PROGRAMFILES"
+
+PROGRAMFILES_X86 = "PROGRAMFILES(X86)"
+
+# Processor Architecture Version
+PROCESSOR_ARCHITECTURE = "PROCESSOR_ARCHITECTURE"
+
+# hashlib Algorithms left out of the Registry: their Digest Length is chosen per Call.
+VARIABLE_LENGTH_ALGORITHMS = ("shake_128", "shake_256")
+
+# Hash Factories by Registry Name.
+ALGORITHMS = {}
+
+
+def is_64_bit_os():
+    """
+    Try and Identify if the Operating System is 64bit
+    :return: True or False
+    """
+    try:
+        if PROGRAMFILES_X86 in os.environ[PROGRAMFILES]:
+            return True
+        if os.environ[PROCESSOR_ARCHITECTURE].endswith("64"):
+            return True
+        return False
+    except Exception as exception:
+        # Not Windows: a 64bit Python only runs on a 64bit Operating System.
+        logger.debug("%r", exception)
+        return sys.maxsize > 2 ** 32
+
+
+class checksum32:
+    """
+    hashlib like Hash Object of a 32bit zlib Checksum Function, i.e zlib.crc32 or zlib.adler32.
+    """
+    __slots__ = ("name", "function", "value")
+
+    digest_size = 4
+    block_size = 64
+
+    def __init__(self, name, function, value):
+        """
+        :param name: Registry Name.
+        :param function: zlib Function (data, value) -> value.
+        :param value: Starting Value, 0 for crc32 and 1 for adler32.
+        """
+        self.name = name
+        self.function = function
+        self.value = value
+
+    def update(self, data):
+        self.value = self.function(data, self.value)
+
+    def digest(self):
+        return self.value.to_bytes(self.digest_size, "big")
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+    def copy(self):
+        return checksum32(self.name, self.function, self.value)
+
+
+def register_algorithm(name, factory, replace = False):
+    """
+    Add a Hash Algorithm to the Registry.
+    :param name: Registry Name, stored in Manifests.
+    :param factory: Callable without Arguments that returns a new Hash Object with the hashlib Interface.
+    :param replace: Replace an Algorithm of the same Name instead of raising ValueError.
+    """
+    if name in ALGORITHMS and not replace:
+        raise ValueError(f"The Algorithm {name!r} is already registered.")
+    ALGORITHMS[name] = factory
+
+
+def algorithm_names():
+    """
+    :return: Sorted List of the Registry Names.
+    """
+    return sorted(ALGORITHMS)
+
+
+def create_hash(name, **options):
+    """
+    Create a Hash Object from the Registry.
+    Names the Registry does not know are passed on to hashlib.new, i.e upper case Names or OpenSSL Aliases.
+    :param name: Registry Name.
+    :param options: Keyword Arguments for the Factory, i.e digest_size for "blake2".
+    :return: Hash Object.
+    """
+    factory = ALGORITHMS.get(name) or ALGORITHMS.get(name.lower())
+    if factory is None:
+        try:
+            return hashlib.new(name, **options)
+        except ValueError:
+            raise ValueError(f"Unknown algorithm {name!r}, use one of {', '.join(algorithm_names())}.")
+    return factory(**options)
+
+
+def algorithm_name(algorithm):
+    """
+    Registry Name an Algorithm is Recorded under, with "blake2" resolved to the Variant this Platform uses.
+    :param algorithm: Registry Name or List of Names.
+    :return: Registry Name, or List of Registry Names.
+    """
+    if isinstance(algorithm, (list, tuple)):
+        return [algorithm_name(name) for name in algorithm]
+    if algorithm == "blake2":
+        return BLAKE2().name
+    if algorithm in ALGORITHMS:
+        return algorithm
+    if algorithm.lower() in ALGORITHMS:
+        return algorithm.lower()
+    return create_hash(algorithm).name
+
+
+""" BUILT IN ALGORITHMS """
+# Blake2 Variant of this Platform.
+BLAKE2 = hashlib.blake2b if is_64_bit_os() else hashlib.blake2s
+
+register_algorithm("blake2", BLAKE2)
+
+for _name in sorted(hashlib.algorithms_available):
+    if _name.lower() == _name and _name not in VARIABLE_LENGTH_ALGORITHMS:
+        register_algorithm(_name, getattr(hashlib, _name, None) or
+                           (lambda name = _name, **options: hashlib.new(name, **options)))
+del _name
+
+register_algorithm("crc32", lambda: checksum32("crc32", zlib.crc32, 0))
+register_algorithm("adler32", lambda: checksum32("adler32", zlib.adler32, 1))
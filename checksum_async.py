@@ -0,0 +1,190 @@
+"""
+asyncio Hashing Pipeline.
+
+Hashes a Folder Tree without blocking the Event Loop, in three Stages joined by bounded Queues:
+
+1. Walk: checksum.walk_files runs on a Thread and feeds the Path Queue.
+2. Read: read_concurrency Readers each take a File and Read its Chunks on a Thread into a small Chunk Queue.
+3. Hash: every File's Hasher feeds its Chunks to the Hash Object on a Thread, hashlib releases the GIL meanwhile.
+
+Finished Files wait in the Result Queue for the Consumer. Every Queue is bounded, so a slow Consumer applies
+Backpressure all the way back to the Walker and Memory stays bounded whatever the Size of the Tree.
+Closing the Generator, i.e by leaving an async for Loop inside contextlib.aclosing early, or cancelling the
+consuming Task, cancels every Stage:
+
+    async with contextlib.aclosing(ahash_tree("/data", "sha256")) as results:
+        async for path, hash_code in results:
+            ...
+"""
+
+import asyncio
+import logging
+import os
+
+from checksum import DEFAULT_EXCLUDE, new_hash, walk_files
+
+logger = logging.getLogger(__name__)
+
+# Marks the End of a Queue.
+_END = object()
+
+
+async def _walk(root, walk_options, path_queue, batch_size):
+    """
+    Walk Stage. The Walker is advanced on a Thread, a Batch of Paths at a time.
+    """
+    loop = asyncio.get_running_loop()
+    entries = walk_files(root, **walk_options)
+
+    def next_batch():
+        batch = []
+        for entry in entries:
+            batch.append(entry.path)
+            if len(batch) >= batch_size:
+                break
+        return batch
+
+    while True:
+        batch = await loop.run_in_executor(None, next_batch)
+        if not batch:
+            return
+        for path in batch:
+            await path_queue.put(path)
+
+
+async def _read_chunks(file, chunk_size, chunk_queue):
+    """
+    Read Stage of one File. Chunks are Read on a Thread into the bounded Chunk Queue.
+    A Read Error is passed on through the Queue, so the Hasher raises it.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            chunk = await loop.run_in_executor(None, file.read, chunk_size)
+        except OSError as exception:
+            await chunk_queue.put(exception)
+            return
+        await chunk_queue.put(chunk)
+        if not chunk:
+            return
+
+
+async def _hash_chunks(hash_type, chunk_queue):
+    """
+    Hash Stage of one File. Chunks are Hashed on a Thread while the next Chunk is being Read.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await chunk_queue.get()
+        if isinstance(chunk, OSError):
+            raise chunk
+        if not chunk:
+            return hash_type.hexdigest()
+        await loop.run_in_executor(None, hash_type.update, chunk)
+
+
+async def ahash_file(file_path, algorithm = "blake2", chunk_size = 1024 ** 2, chunks_in_flight = 2):
+    """
+    Compute the Checksum of a File without blocking the Event Loop, Reading the next Chunk while Hashing one.
+    :param file_path: Path of the File.
+    :param algorithm: Algorithm Name or List of Names, see checksum.new_hash.
+    :param chunk_size: Number of Bytes per Chunk.
+    :param chunks_in_flight: Number of Chunks Read ahead of the Hasher.
+    :return: Hexadecimal Checksum, or a Dictionary {algorithm: hash_code} for a List of Names.
+    """
+    loop = asyncio.get_running_loop()
+    hash_type = new_hash(algorithm)
+    chunk_queue = asyncio.Queue(maxsize = chunks_in_flight)
+
+    file = await loop.run_in_executor(None, open, file_path, "rb")
+    try:
+        reader = asyncio.ensure_future(_read_chunks(file, chunk_size, chunk_queue))
+        try:
+            hexdigest = await _hash_chunks(hash_type, chunk_queue)
+        finally:
+            reader.cancel()
+    finally:
+        file.close()
+
+    if isinstance(algorithm, (list, tuple)):
+        return hash_type.split_hexdigest(hexdigest)
+    return hexdigest
+
+
+async def _worker(path_queue, result_queue, algorithm, chunk_size, chunks_in_flight):
+    """
+    Take Paths from the Path Queue until it Ends and put (file_path, hash_code) into the Result Queue.
+    Files that can not be Read get a None Hash Value.
+    """
+    while True:
+        path = await path_queue.get()
+        if path is _END:
+            # Let the other Workers see the End too.
+            await path_queue.put(_END)
+            return
+        try:
+            hash_value = await ahash_file(path, algorithm, chunk_size, chunks_in_flight)
+        except OSError as exception:
+            logger.warning("%s", exception)
+            hash_value = None
+        await result_queue.put((path, hash_value))
+
+
+async def ahash_tree(root = None, algorithm = "blake2", read_concurrency = 8, queue_size = 256,
+                     chunk_size = 1024 ** 2, chunks_in_flight = 2, include = None, exclude = DEFAULT_EXCLUDE,
+                     exclude_dirs = None, ignore_files = ()):
+    """
+    Compute the Checksum of all the Files in the root Folder and all Sub Directories as an async Generator.
+    :param root: Parent folder. Default is the Current Working Directory.
+    :param algorithm: Algorithm Name or List of Names, see checksum.new_hash.
+    :param read_concurrency: Number of Files Read and Hashed at once.
+    :param queue_size: Size of the Path Queue and the Result Queue.
+    :param chunk_size: Number of Bytes per Chunk.
+    :param chunks_in_flight: Number of Chunks per File Read ahead of its Hasher.
+    :param include: Glob or Regex Patterns, only Matching Files are Hashed.
+    :param exclude: Glob or Regex Patterns of Files to Skip. Default Skips Checksum and JSON Files.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+    :param ignore_files: File Names to Ignore.
+    :return: async Generator of Tuples (file_path, hash_code), as each File finishes.
+    """
+    path_queue = asyncio.Queue(maxsize = queue_size)
+    result_queue = asyncio.Queue(maxsize = queue_size)
+    walk_options = dict(include = include, exclude = exclude, exclude_dirs = exclude_dirs,
+                        ignore_files = ignore_files)
+
+    # Errors of the Stages, raised to the Consumer once the Results are drained.
+    errors = []
+
+    async def walk_stage():
+        try:
+            await _walk(root or os.getcwd(), walk_options, path_queue, queue_size)
+        except Exception as exception:
+            errors.append(exception)
+        await path_queue.put(_END)
+
+    async def hash_stage():
+        workers = [asyncio.ensure_future(_worker(path_queue, result_queue, algorithm, chunk_size, chunks_in_flight))
+                   for _ in range(read_concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as exception:
+            errors.append(exception)
+        finally:
+            for worker in workers:
+                worker.cancel()
+        await result_queue.put(_END)
+
+    tasks = [asyncio.ensure_future(walk_stage()), asyncio.ensure_future(hash_stage())]
+    try:
+        while True:
+            result = await result_queue.get()
+            if result is _END:
+                break
+            yield result
+        if errors:
+            raise errors[0]
+    finally:
+        # Cancel every Stage if the Consumer stopped early, was cancelled or a Stage failed.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
@@ -0,0 +1,334 @@
+"""
+Benchmark Suite.
+
+Builds synthetic Folder Trees and measures how fast they are Walked and Hashed, in Files per Second and Gigabytes
+per Second, for every Combination of Algorithm, Chunk Size and Execution Mode. Results are Written as JSON, so a
+Run can be Compared with a Baseline Run to catch Regressions:
+
+    python checksum_benchmark.py --scale 0.1 --output current.json --baseline baseline.json
+
+Profiles of synthetic Trees:
+
+1. tiny: many Files of at most 4 KiB.
+2. mixed: Files from 1 KiB to 64 MiB, most of them small.
+3. large: a few Files of several GiB.
+4. sparse: large Files that are mostly Holes.
+5. deep: few Files in deeply nested Folders.
+
+Every Measurement is taken with a warm Page Cache, after an unmeasured Run, and with a cold Page Cache where the
+Operating System lets a normal User drop the Cached Pages of a File (posix_fadvise).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from checksum import device_chunk_size, hash_file, hash_files, new_hash, walk_files
+
+# Version of the JSON Result Layout.
+SCHEMA_VERSION = 1
+
+PROFILES = ("tiny", "mixed", "large", "sparse", "deep")
+
+ALGORITHMS = ("blake2b", "blake2s", "sha256", "sha3_512", "md5", "crc32")
+
+# None lets checksum choose the Read Size per Device, see checksum.read_chunk_size.
+CHUNK_NUM_BLOCKS = (None, 128, 1024, 8192)
+
+# "serial" Hashes one File after the other in this Process with checksum.hash_file, without any Pool.
+MODES = ("serial", "thread", "process")
+
+CACHE_STATES = ("warm", "cold")
+
+# Block of Random Bytes that File Contents are cut from. Hashing Speed does not depend on the Content.
+_PATTERN = random.Random(0).randbytes(1024 ** 2) if hasattr(random.Random, "randbytes") else os.urandom(1024 ** 2)
+
+
+def _write_file(path, size, seed = 0):
+    """
+    Write a File of size Bytes, whose Content starts with its seed so no two Files are equal.
+    """
+    with open(path, "wb") as file:
+        file.write(str(seed).encode()[:size])
+        written = min(size, len(str(seed)))
+        while written < size:
+            chunk = _PATTERN[:size - written]
+            file.write(chunk)
+            written += len(chunk)
+
+
+def _write_sparse_file(path, size, data_blocks = 4, block_size = 64 * 1024):
+    """
+    Write a File of size Bytes of which only data_blocks evenly spaced Blocks hold Data, the Rest are Holes.
+    """
+    with open(path, "wb") as file:
+        file.truncate(size)
+        for index in range(data_blocks):
+            file.seek(min(index * (size // data_blocks), max(0, size - block_size)))
+            file.write(_PATTERN[:min(block_size, size)])
+
+
+def build_tree(root, profile = "mixed", scale = 1.0, seed = 0):
+    """
+    Build a synthetic Folder Tree.
+    :param root: Folder to Build the Tree in. It is Created if it does not exist.
+    :param profile: One of PROFILES.
+    :param scale: Factor for the Number and Size of the Files. 1.0 Builds the full Tree, i.e Files of several GiB.
+    :param seed: Seed of the Random Sizes, the same Seed Builds the same Tree.
+    :return: Tuple (number_of_files, number_of_bytes).
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok = True)
+    sizes = {}
+
+    if profile == "tiny":
+        for index in range(max(1, int(20000 * scale))):
+            sizes[os.path.join(f"d{index % 100:03d}", f"f{index}.bin")] = rng.randint(0, 4096)
+    elif profile == "mixed":
+        for index in range(max(1, int(2000 * scale))):
+            # Log-uniform Sizes from 1 KiB to 64 MiB.
+            sizes[os.path.join(f"d{index % 20:02d}", f"f{index}.bin")] = int(2 ** rng.uniform(10, 26))
+    elif profile == "large":
+        for index in range(3):
+            sizes[f"large{index}.bin"] = max(1, int(2 * 1024 ** 3 * scale))
+    elif profile == "sparse":
+        for index in range(4):
+            _write_sparse_file(os.path.join(root, f"sparse{index}.bin"), max(1, int(1024 ** 3 * scale)))
+    elif profile == "deep":
+        folder = ""
+        for depth in range(64):
+            folder = os.path.join(folder, f"level{depth}")
+            for index in range(max(1, int(16 * scale))):
+                sizes[os.path.join(folder, f"f{index}.bin")] = rng.randint(0, 64 * 1024)
+    else:
+        raise ValueError(f"Unknown profile {profile!r}, use one of {PROFILES}.")
+
+    for seed_value, (relative_path, size) in enumerate(sizes.items()):
+        path = os.path.join(root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        _write_file(path, size, seed_value)
+
+    # Flush Dirty Pages, so they can be Dropped for cold Measurements.
+    if hasattr(os, "sync"):
+        os.sync()
+
+    files = [entry for entry in walk_files(root, exclude = ())]
+    return len(files), sum(entry.stat().st_size for entry in files)
+
+
+def drop_page_cache(paths):
+    """
+    Ask the Operating System to Drop the Cached Pages of Files, so the next Read comes from the Storage.
+    :param paths: Iterable of File Paths.
+    :return: True if the Pages were Dropped, False if the Operating System does not support it.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in paths:
+        file = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(file, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(file)
+    return True
+
+
+def _measure(function, repeat, before = None):
+    """
+    Time function repeat Times.
+    :return: List of Seconds, or None if before returned False.
+    """
+    seconds = []
+    for _ in range(repeat):
+        if before is not None and not before():
+            return None
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def _result(seconds, files, size, **fields):
+    """
+    Turn Timings into a Result Dictionary. Rates use the fastest Run.
+    """
+    best = min(seconds)
+    fields.update(files = files, bytes = size, seconds = best, seconds_median = statistics.median(seconds),
+                  runs = len(seconds), files_per_second = files / best if best else None,
+                  gigabytes_per_second = size / 1e9 / best if best else None)
+    return fields
+
+
+def benchmark_walk(root, profile, files, size, repeat = 3):
+    """
+    Measure the Tree Scan alone.
+    :return: Result Dictionary.
+    """
+    seconds = _measure(lambda: sum(1 for _ in walk_files(root, exclude = ())), repeat)
+    return _result(seconds, files, size, benchmark = "walk", profile = profile, cache = "warm")
+
+
+def benchmark_hash(root, profile, files, size, algorithms = ALGORITHMS, chunk_num_blocks = CHUNK_NUM_BLOCKS,
+                   modes = MODES, cache_states = CACHE_STATES, workers = None, repeat = 3):
+    """
+    Measure Hashing a Tree for every Combination of Algorithm, Chunk Size, Mode and Page Cache State.
+    :return: Generator of Result Dictionaries.
+    """
+    paths = [entry.path for entry in walk_files(root, exclude = ())]
+    for algorithm in algorithms:
+        block_size = new_hash(algorithm).block_size
+        for blocks in chunk_num_blocks:
+            # The automatic Read Size of the Device, Files smaller than it are Read whole.
+            chunk_size = device_chunk_size(os.stat(root)) if blocks is None else blocks * block_size
+            for mode in modes:
+                pool_workers = 1 if mode == "serial" else workers
+
+                def run():
+                    if mode == "serial":
+                        for path in paths:
+                            hash_file(path, algorithm, blocks)
+                        return
+                    for _ in hash_files(paths, algorithm, workers, mode = mode, chunk_num_blocks = blocks):
+                        pass
+
+                for cache_state in cache_states:
+                    if cache_state == "cold":
+                        seconds = _measure(run, repeat, before = lambda: drop_page_cache(paths))
+                        if seconds is None:
+                            continue
+                    else:
+                        # Unmeasured Run to fill the Page Cache.
+                        run()
+                        seconds = _measure(run, repeat)
+
+                    yield _result(seconds, files, size, benchmark = "hash", profile = profile,
+                                  algorithm = algorithm, chunk_num_blocks = blocks, chunk_size = chunk_size,
+                                  mode = mode, workers = pool_workers, cache = cache_state)
+
+
+def run_benchmarks(directory = None, profiles = PROFILES, scale = 1.0, algorithms = ALGORITHMS,
+                   chunk_num_blocks = CHUNK_NUM_BLOCKS, modes = MODES, cache_states = CACHE_STATES, workers = None,
+                   repeat = 3, keep = False):
+    """
+    Build every Profile's Tree and Benchmark it.
+    :param directory: Folder the Trees are Built in. Default is the Temporary Folder. Use a Folder on the Storage
+    to Measure.
+    :param profiles: Profiles of the Trees, see PROFILES.
+    :param scale: Factor for the Number and Size of the Files.
+    :param algorithms: Algorithm Names, see checksum_algorithms.
+    :param chunk_num_blocks: Chunk Sizes in Blocks of the Algorithm.
+    :param modes: Execution Modes, see MODES.
+    :param cache_states: "warm" and/or "cold".
+    :param workers: Number of Workers of the "thread" and "process" Modes. Default is checksum.hash_files' Default.
+    :param repeat: Number of measured Runs per Combination.
+    :param keep: Keep the Trees after the Run.
+    :return: Dictionary with the Machine, the Options and a List of Results, ready for json.dump.
+    """
+    report = {"schema": SCHEMA_VERSION,
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+              "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                          "implementation": platform.python_implementation(), "cpu_count": os.cpu_count()},
+              "options": {"profiles": list(profiles), "scale": scale, "algorithms": list(algorithms),
+                          "chunk_num_blocks": list(chunk_num_blocks), "modes": list(modes),
+                          "cache_states": list(cache_states), "workers": workers, "repeat": repeat},
+              "results": []}
+
+    base = tempfile.mkdtemp(prefix = "checksum_benchmark_", dir = directory)
+    try:
+        for profile in profiles:
+            root = os.path.join(base, profile)
+            files, size = build_tree(root, profile, scale)
+            report["results"].append(benchmark_walk(root, profile, files, size, repeat))
+            report["results"].extend(benchmark_hash(root, profile, files, size, algorithms, chunk_num_blocks, modes,
+                                                    cache_states, workers, repeat))
+            if not keep:
+                shutil.rmtree(root, ignore_errors = True)
+    finally:
+        if not keep:
+            shutil.rmtree(base, ignore_errors = True)
+
+    return report
+
+
+def _result_key(result):
+    """
+    Fields that tell which Combination a Result Measured.
+    """
+    return tuple(result.get(field) for field in ("benchmark", "profile", "algorithm", "chunk_num_blocks", "mode",
+                                                 "workers", "cache"))
+
+
+def find_regressions(report, baseline, tolerance = 0.1):
+    """
+    Compare a Report with a Baseline Report of the same Options.
+    :param report: Report of run_benchmarks.
+    :param baseline: Earlier Report of run_benchmarks.
+    :param tolerance: Share a Result may be slower than its Baseline before it is a Regression.
+    :return: List of Tuples (result, baseline_result) of Results slower than their Baseline.
+    """
+    baseline_results = {_result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        baseline_result = baseline_results.get(_result_key(result))
+        if baseline_result is not None and result["seconds"] > baseline_result["seconds"] * (1 + tolerance):
+            regressions.append((result, baseline_result))
+    return regressions
+
+
+def _blocks(value):
+    return None if value == "auto" else int(value)
+
+
+def _csv(value, cast = str):
+    return tuple(cast(item) for item in value.split(",") if item)
+
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = "Benchmark Tree Scans and Hashing of synthetic Folder Trees.")
+    parser.add_argument("--directory", help = "Folder to Build the Trees in. Default is the Temporary Folder.")
+    parser.add_argument("--profiles", type = _csv, default = PROFILES, help = "Comma separated Profiles.")
+    parser.add_argument("--scale", type = float, default = 1.0, help = "Factor for the Number and Size of Files.")
+    parser.add_argument("--algorithms", type = _csv, default = ALGORITHMS, help = "Comma separated Algorithms.")
+    parser.add_argument("--chunk-num-blocks", type = lambda value: _csv(value, _blocks), default = CHUNK_NUM_BLOCKS,
+                        help = "Comma separated Chunk Sizes in Blocks, auto chooses the Size per Device.")
+    parser.add_argument("--modes", type = _csv, default = MODES, help = "Comma separated Execution Modes.")
+    parser.add_argument("--cache-states", type = _csv, default = CACHE_STATES, help = "warm, cold or warm,cold.")
+    parser.add_argument("--workers", type = int, help = "Number of Workers of the thread and process Modes.")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Number of measured Runs per Combination.")
+    parser.add_argument("--keep", action = "store_true", help = "Keep the Trees after the Run.")
+    parser.add_argument("--output", help = "JSON File to Write the Results to. Default is Standard Output.")
+    parser.add_argument("--baseline", help = "JSON Results of an earlier Run to Compare with.")
+    parser.add_argument("--tolerance", type = float, default = 0.1,
+                        help = "Share a Result may be slower than the Baseline. Default is 0.1.")
+    options = parser.parse_args(arguments)
+
+    report = run_benchmarks(options.directory, options.profiles, options.scale, options.algorithms,
+                            options.chunk_num_blocks, options.modes, options.cache_states, options.workers,
+                            options.repeat, options.keep)
+
+    if options.output:
+        with open(options.output, "w", encoding = "utf-8") as file:
+            json.dump(report, file, indent = 4)
+    else:
+        json.dump(report, sys.stdout, indent = 4)
+        print()
+
+    if options.baseline:
+        with open(options.baseline, encoding = "utf-8") as file:
+            regressions = find_regressions(report, json.load(file), options.tolerance)
+        for result, baseline_result in regressions:
+            print(f"Regression: {_result_key(result)} took {result['seconds']:.4f}s, "
+                  f"baseline {baseline_result['seconds']:.4f}s", file = sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
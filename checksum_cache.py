@@ -0,0 +1,204 @@
+"""
+Persistent Hash Cache.
+
+Stores the Checksum of every File together with its stat Data in a local SQLite Database,
+so Files that did not change since the last Run are never Read again.
+
+A File counts as unchanged while its (st_dev, st_ino, size, mtime_ns, ctime_ns) Tuple and the Hash Algorithm match.
+A random Sample of Cache Hits can still be re-hashed to catch silent Corruption, which leaves the stat Data untouched.
+
+Paths are stored as the Bytes the File System uses, see os.fsencode, so File Names that are not valid UTF-8 are
+cached as well.
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default Location of the Cache Database.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".simple_checksum_cache.sqlite3")
+
+# Number of Writes after which the Cache is Committed to Disk.
+COMMIT_INTERVAL = 1000
+
+# Version of the Database Layout, stored as PRAGMA user_version. Caches of older Versions are started over.
+CACHE_VERSION = 1
+
+
+def _path_key(path):
+    """
+    Bytes a Path is stored under, with the Undecodable Bytes of surrogateescape'd Names restored.
+    """
+    return os.fsencode(path)
+
+
+class hash_cache:
+    """
+    SQLite Hash Cache keyed by File Path and Algorithm.
+    """
+
+    def __init__(self, path = DEFAULT_CACHE_PATH, max_entries = 10_000_000, verify_sample_rate = 0.0):
+        """
+        Open or Create a Hash Cache.
+        :param path: Path of the SQLite Database File.
+        :param max_entries: Maximum Number of Entries. The least recently used Entries are Evicted on close.
+        :param verify_sample_rate: Fraction of Cache Hits, X is an Element of [0, 1], that are Hashed again anyway.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.verify_sample_rate = verify_sample_rate
+
+        # Paths whose Digest was re-hashed while their stat Data was unchanged, but whose Digest differs.
+        self.corrupted = []
+
+        # Digests of Cache Hits that were Sampled for Verification, by (path, algorithm).
+        self.__sampled = {}
+
+        # Paths of Cache Hits whose Last Use Time still has to be Written.
+        self.__touched = []
+        self.__pending_writes = 0
+
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < CACHE_VERSION:
+            # Version 0 stored Paths as TEXT, which fails for Names that are not valid UTF-8.
+            self.connection.execute("DROP TABLE IF EXISTS hashes")
+            self.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path BLOB NOT NULL, algorithm TEXT NOT NULL, "
+            "st_dev INTEGER, st_ino INTEGER, size INTEGER, mtime_ns INTEGER, ctime_ns INTEGER, "
+            "digest TEXT NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (path, algorithm))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    def __len__(self):
+        self.commit()
+        return self.connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    @staticmethod
+    def algorithm_key(hash_type):
+        """
+        Name of a Hash Object as stored in the Cache, including the Digest Size.
+        :param hash_type: Hash Object, i.e hashlib.sha256().
+        :return: Algorithm Name, i.e sha256-32.
+        """
+        return f"{hash_type.name}-{hash_type.digest_size}"
+
+    @staticmethod
+    def stat_key(file_stat):
+        """
+        Get the stat Data that identifies an unchanged File.
+        :param file_stat: os.stat_result.
+        :return: Tuple (st_dev, st_ino, size, mtime_ns, ctime_ns).
+        """
+        return file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ctime_ns
+
+    def lookup(self, path, file_stat, algorithm):
+        """
+        Get the Cached Digest of a File if its stat Data did not change.
+        :param path: Path of the File.
+        :param file_stat: Current os.stat_result of the File.
+        :param algorithm: Algorithm Key, see algorithm_key.
+        :return: Hexadecimal Checksum or None if the File has to be Hashed.
+        """
+        key = _path_key(path)
+        row = self.connection.execute(
+            "SELECT st_dev, st_ino, size, mtime_ns, ctime_ns, digest FROM hashes WHERE path = ? AND algorithm = ?",
+            (key, algorithm)).fetchone()
+
+        if row is None or tuple(row[:5]) != self.stat_key(file_stat):
+            return None
+
+        if self.verify_sample_rate and random.random() < self.verify_sample_rate:
+            # Pretend a Miss, so the File is Hashed again and store() can Compare the Digests.
+            self.__sampled[(key, algorithm)] = row[5]
+            return None
+
+        self.__touched.append((time.time(), key, algorithm))
+        if len(self.__touched) >= COMMIT_INTERVAL:
+            self.commit()
+        return row[5]
+
+    def store(self, path, file_stat, algorithm, digest):
+        """
+        Store the Digest of a File with the stat Data it had before it was Read.
+        :param path: Path of the File.
+        :param file_stat: os.stat_result of the File taken before Hashing.
+        :param algorithm: Algorithm Key, see algorithm_key.
+        :param digest: Hexadecimal Checksum. None is not Stored.
+        :return:
+        """
+        key = _path_key(path)
+        expected_digest = self.__sampled.pop((key, algorithm), None)
+        if expected_digest is not None and digest is not None and expected_digest.lower() != digest.lower():
+            self.corrupted.append(path)
+            logger.error("[Possible Corruption!] %s Content changed without any change of its stat Data.", path)
+
+        if digest is None:
+            return
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, algorithm, *self.stat_key(file_stat), digest, time.time()))
+
+        self.__pending_writes += 1
+        if self.__pending_writes >= COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        """
+        Write pending Changes to Disk.
+        :return:
+        """
+        if self.__touched:
+            self.connection.executemany("UPDATE hashes SET last_used = ? WHERE path = ? AND algorithm = ?",
+                                        self.__touched)
+            self.__touched = []
+        self.connection.commit()
+        self.__pending_writes = 0
+
+    def prune(self):
+        """
+        Evict the Entries of Files that no longer exist.
+        :return: Number of Evicted Entries.
+        """
+        self.commit()
+        missing = [(path,) for (path,) in self.connection.execute("SELECT DISTINCT path FROM hashes")
+                   if not os.path.exists(path)]
+        self.connection.executemany("DELETE FROM hashes WHERE path = ?", missing)
+        self.connection.commit()
+        return len(missing)
+
+    def evict(self):
+        """
+        Evict the least recently used Entries until at most max_entries are left.
+        :return: Number of Evicted Entries.
+        """
+        self.commit()
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self.connection.execute(
+            "DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)", (excess,))
+        self.connection.commit()
+        return excess
+
+    def close(self):
+        """
+        Evict Entries over the Size Bound and Close the Database.
+        :return:
+        """
+        self.evict()
+        self.connection.close()
@@ -0,0 +1,494 @@
+"""
+Command Line Interface.
+
+Headless Entry Point for scheduled Runs, i.e under cron or systemd:
+
+    python checksum_cli.py hash /data --algorithm sha256 --output /var/lib/checksum/data.jsonl
+    python checksum_cli.py hash /images --leaf-size 4M --output images.jsonl
+    python checksum_cli.py verify /var/lib/checksum/data.jsonl --root /data --quiet
+    python checksum_cli.py diff yesterday.jsonl today.jsonl --json
+    python checksum_cli.py dedupe /data /backup --min-size 1M
+    python checksum_cli.py shard /data --shards 4 --index 0 --output shard0.jsonl
+    python checksum_cli.py merge shard*.jsonl --output data.cksum
+    python checksum_cli.py watch /data --manifest /var/lib/checksum/data.jsonl
+
+Exit Codes:
+
+0. Success, nothing changed.
+1. Files were altered, added or removed, Duplicates were found, or Shards disagree on a Digest.
+2. Wrong Arguments.
+3. Files could not be Read.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import chain
+
+from checksum import DEFAULT_EXCLUDE, hash_entries, walk_files
+from checksum_algorithms import algorithm_name
+from checksum_dedupe import find_duplicates
+from checksum_filters import SYMLINK_POLICIES, file_filter
+from checksum_diff import ADDED, ALTERED, LABELS, REMOVED, SKIPPED, diff_checksums
+from checksum_manifest import read_manifest, read_manifest_header, write_manifest
+from checksum_shard import STRATEGIES, hash_shard, hash_sharded, merge_manifests
+from checksum_stats import hash_stats
+from checksum_verify import quick_verify, verify
+from checksum_watch import BACKENDS, tree_watcher
+
+logger = logging.getLogger(__name__)
+
+""" EXIT CODES """
+EXIT_OK = 0
+EXIT_CHANGED = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+
+# Statuses of a Diff that are Printed, Matched Files are only Counted.
+CHANGE_STATUSES = (ALTERED, ADDED, REMOVED, SKIPPED)
+
+# Size Suffixes and their Number of Bytes.
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+# Age Suffixes and their Number of Seconds.
+AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_size(text):
+    """
+    Parse a Size in Bytes with an optional Suffix, i.e "512", "64K", "1.5G".
+    :param text: Size Text.
+    :return: Number of Bytes.
+    """
+    value = text.strip().upper()
+    if value.endswith("B"):
+        value = value[:-1]
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        return int(float(value[:len(value) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size {text!r}, use i.e 512, 64K, 100M or 2G.")
+
+
+def parse_time(text):
+    """
+    Parse a Point in Time, an ISO Date such as "2024-05-01" or "2024-05-01T12:00", or an Age such as "90m", "36h"
+    or "7d" before now.
+    :param text: Time Text.
+    :return: Seconds since the Epoch.
+    """
+    value = text.strip()
+    if value[-1:].lower() in AGE_UNITS:
+        try:
+            return time.time() - float(value[:-1]) * AGE_UNITS[value[-1:].lower()]
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid time {text!r}, use i.e 2024-05-01, 2024-05-01T12:00 or 7d.")
+
+
+def _walk_filter(options):
+    """
+    Create the file_filter of the Options.
+    """
+    return file_filter(options.min_size, options.max_size, options.ext, options.exclude_ext,
+                       options.modified_after, options.modified_before, options.special_files, options.symlinks)
+
+
+def _checked_roots(roots):
+    """
+    Check that every Root is a Folder that can be Read before it is Walked, the Walker Skips Folders it can not Read.
+    :param roots: List of Folder Paths.
+    :return: roots.
+    :raise OSError: A Root is missing, is no Folder or can not be Read.
+    """
+    for root in roots:
+        with os.scandir(root):
+            pass
+    return roots
+
+
+def _walk_roots(options):
+    """
+    Chain the Walkers of every Root, with the Pattern Filters of the Options.
+    """
+    exclude = DEFAULT_EXCLUDE if options.exclude is None else options.exclude
+    return chain.from_iterable(walk_files(root, options.include, exclude, options.exclude_dir)
+                               for root in _checked_roots(options.roots or [os.getcwd()]))
+
+
+def _write_stats(stats, path):
+    """
+    Write Stats as Prometheus Text for a .prom Path, otherwise as JSON.
+    """
+    with open(path, "w", encoding = "utf-8") as file:
+        file.write(stats.to_prometheus() if path.endswith(".prom") else stats.to_json())
+
+
+def _print_json(document):
+    json.dump(document, sys.stdout, ensure_ascii = False)
+    sys.stdout.write("\n")
+
+
+def _report_diff(command, diff, options):
+    """
+    Print a Diff and choose the Exit Code.
+    """
+    if options.json:
+        document = {"command": command, "counts": diff.counts}
+        document.update({status: [file_path for file_path, _, _ in getattr(diff, status)]
+                         for status in CHANGE_STATUSES})
+        if diff.ranges:
+            document["ranges"] = diff.ranges
+        _print_json(document)
+    elif not options.quiet:
+        sys.stdout.writelines(diff.render(CHANGE_STATUSES))
+        print(diff.summary(), file = sys.stderr)
+
+    if diff.has_changes:
+        return EXIT_CHANGED
+    return EXIT_ERROR if diff.skipped else EXIT_OK
+
+
+""" COMMANDS """
+
+
+def command_hash(options):
+    """
+    Hash the Roots and Write a Manifest, or Print the Checksums.
+    """
+    # Sparse Hashing Reports the Bytes of Holes it did not Read, which hash_stats counts.
+    stats = hash_stats() if options.stats or options.sparse else None
+    algorithm = options.algorithm or "blake2"
+    walk_filter = _walk_filter(options)
+    entries = hash_entries(_walk_roots(options), algorithm, options.workers, not options.no_fingerprints,
+                           options.leaf_size, mode = options.mode, stats = stats, file_filter = walk_filter,
+                           read_mode = "sparse" if options.sparse else "readinto")
+
+    counts = {"files": 0, "errors": 0}
+
+    def counted(entries):
+        for entry in entries:
+            counts["files"] += 1
+            if entry.digest is None:
+                counts["errors"] += 1
+            yield entry
+
+    if options.output:
+        write_manifest(counted(entries), options.output, options.format or "jsonl",
+                       algorithm = algorithm_name(algorithm))
+    else:
+        for entry in counted(entries):
+            if options.quiet:
+                continue
+            if options.json:
+                record = {"path": entry.path, "digest": entry.digest}
+                record.update(entry.fields())
+                _print_json(record)
+            elif entry.digest is not None:
+                print(f"{entry.digest}  {entry.path}")
+
+    if options.stats:
+        _write_stats(stats, options.stats)
+    if options.sparse:
+        counts["bytes_sparse"] = stats.bytes_sparse
+
+    if options.output and options.json:
+        _print_json({"command": "hash", "manifest": options.output, **counts, "skipped": walk_filter.skipped})
+    elif not options.quiet and not options.json:
+        summary = f"{counts['files']} Files, {counts['errors']} Errors, {walk_filter.skipped_count} Skipped"
+        if options.sparse:
+            summary += f", {stats.bytes_sparse} Bytes of Holes not Read"
+        print(summary, file = sys.stderr)
+
+    return EXIT_ERROR if counts["errors"] else EXIT_OK
+
+
+def command_verify(options):
+    """
+    Verify the Files of a Manifest.
+    """
+    if options.root is not None:
+        _checked_roots([options.root])
+    if options.quick:
+        diff, _ = quick_verify(options.manifest, options.root, options.algorithm, options.workers, options.mode,
+                               fail_fast = options.fail_fast)
+    else:
+        diff = verify(options.manifest, options.root, options.algorithm, options.workers, options.mode,
+                      fail_fast = options.fail_fast)
+    return _report_diff("verify", diff, options)
+
+
+def command_diff(options):
+    """
+    Compare two Manifests without Reading any File.
+    """
+    diff = diff_checksums(read_manifest(options.new), read_manifest(options.old),
+                          _single_algorithm(options.new), _single_algorithm(options.old))
+    return _report_diff("diff", diff, options)
+
+
+def _single_algorithm(path):
+    """
+    Algorithm of a Manifest of single Digests, None for a Manifest of several Algorithms or without Header.
+    """
+    algorithm = read_manifest_header(path).get("algorithm")
+    return algorithm if isinstance(algorithm, str) else None
+
+
+def command_dedupe(options):
+    """
+    Find Files with the same Content in the Roots.
+    """
+    exclude = DEFAULT_EXCLUDE if options.exclude is None else options.exclude
+    walk_filter = _walk_filter(options)
+    roots = _checked_roots(options.roots or [os.getcwd()])
+    report = find_duplicates(roots, options.algorithm or "sha256", options.edge_size,
+                             options.min_size if options.min_size is not None else 1, options.workers,
+                             options.mode, options.include, exclude, options.exclude_dir, walk_filter)
+
+    if options.json:
+        _print_json({"command": "dedupe", "groups": [{"size": size, "paths": paths} for size, paths in report.groups],
+                     "files_scanned": report.files_scanned, "bytes_scanned": report.bytes_scanned,
+                     "bytes_read": report.bytes_read, "bytes_saved": report.bytes_saved,
+                     "skipped": walk_filter.skipped})
+    elif not options.quiet:
+        print(report)
+
+    return EXIT_CHANGED if report.groups else EXIT_OK
+
+
+def _report_merge(command, report, options):
+    """
+    Print the Result of a Merge and choose the Exit Code.
+    """
+    if options.json:
+        _print_json({"command": command, "manifest": options.output, "files": report.files,
+                     "overlaps": [file_path for file_path, _ in report.overlaps],
+                     "conflicts": [file_path for file_path, _ in report.conflicts]})
+    elif not options.quiet:
+        print(report, file = sys.stderr)
+    return EXIT_CHANGED if report.conflicts else EXIT_OK
+
+
+def command_shard(options):
+    """
+    Hash one Shard of a Tree, or every Shard in its own Process and Merge them.
+    """
+    _checked_roots([options.root])
+    exclude = DEFAULT_EXCLUDE if options.exclude is None else options.exclude
+    algorithm = options.algorithm or "blake2"
+    walk_options = {"include": options.include, "exclude": exclude, "exclude_dirs": options.exclude_dir}
+
+    if options.index is None:
+        report = hash_sharded(options.root, options.shards, options.output, algorithm, options.strategy,
+                              options.format, options.workers, **walk_options)
+        return _report_merge("shard", report, options)
+
+    count = hash_shard(options.root, options.index, options.shards, options.output, algorithm, options.strategy,
+                       options.format, options.workers, mode = options.mode, **walk_options)
+    if options.json:
+        _print_json({"command": "shard", "manifest": options.output, "index": options.index,
+                     "shards": options.shards, "files": count})
+    elif not options.quiet:
+        print(f"Shard {options.index} of {options.shards}: {count} Files", file = sys.stderr)
+    return EXIT_OK
+
+
+def command_merge(options):
+    """
+    Merge sorted Shard Manifests into one.
+    """
+    report = merge_manifests(options.manifests, options.output, options.format, root = options.root)
+    return _report_merge("merge", report, options)
+
+
+def command_watch(options):
+    """
+    Watch a Tree and Print every Change as it is found, until Interrupted.
+    """
+    _checked_roots([options.root])
+    exclude = DEFAULT_EXCLUDE if options.exclude is None else options.exclude
+    watcher = tree_watcher(options.root, options.manifest, options.algorithm, options.backend, options.debounce,
+                           options.poll_interval, options.save_interval, workers = options.workers,
+                           include = options.include, exclude = exclude, exclude_dirs = options.exclude_dir)
+    events = watcher.events()
+    try:
+        for status, file_path, new_hash, old_hash in events:
+            if options.json:
+                _print_json({"command": "watch", "status": status, "path": file_path, "digest": new_hash,
+                             "old_digest": old_hash})
+            elif not options.quiet:
+                print(f"{LABELS[status]} {file_path}")
+            sys.stdout.flush()
+    finally:
+        # Saves the Manifest.
+        events.close()
+    return EXIT_OK
+
+
+def build_parser():
+    """
+    Create the Argument Parser with every Command.
+    :return: argparse.ArgumentParser.
+    """
+    output = argparse.ArgumentParser(add_help = False)
+    output.add_argument("-q", "--quiet", action = "store_true", help = "Print nothing, only set the Exit Code.")
+    output.add_argument("--json", action = "store_true", help = "Print the Result as JSON.")
+    output.add_argument("-v", "--verbose", action = "count", default = 0, help = "Log more, repeat for Debug.")
+
+    hashing = argparse.ArgumentParser(add_help = False)
+    hashing.add_argument("-a", "--algorithm", help = "Hash Algorithm, i.e blake2, sha256, sha3_512, or crc32 and "
+                                                              "adler32 for fast Change Detection only.")
+    hashing.add_argument("-w", "--workers", type = int, help = "Number of Worker Processes or Threads.")
+    hashing.add_argument("--mode", choices = ("process", "thread"), default = "process",
+                         help = "Hash on a Process or Thread Pool. Default is process.")
+
+    walking = argparse.ArgumentParser(add_help = False)
+    walking.add_argument("roots", nargs = "*", help = "Folders to Walk. Default is the Current Working Directory.")
+    walking.add_argument("--include", action = "append", help = "Glob or re: Pattern of Files to Hash.")
+    walking.add_argument("--exclude", action = "append",
+                         help = "Glob or re: Pattern of Files to Skip. Default Skips Checksum and JSON Files.")
+    walking.add_argument("--exclude-dir", action = "append", help = "Glob or re: Pattern of Folders to Skip.")
+    walking.add_argument("--min-size", type = parse_size, help = "Skip Files smaller than this, i.e 4K.")
+    walking.add_argument("--max-size", type = parse_size, help = "Skip Files bigger than this, i.e 2G.")
+    walking.add_argument("--ext", action = "append", help = "Only Hash Files with this Extension, i.e jpg.")
+    walking.add_argument("--exclude-ext", action = "append", help = "Skip Files with this Extension, i.e tmp.")
+    walking.add_argument("--modified-after", type = parse_time,
+                         help = "Skip Files last modified before this Time, i.e 2024-05-01 or 7d ago.")
+    walking.add_argument("--modified-before", type = parse_time,
+                         help = "Skip Files last modified after this Time, i.e 2024-05-01 or 36h ago.")
+    walking.add_argument("--special-files", action = "store_true",
+                         help = "Hash FIFOs, Sockets and Devices too. Reading them can block.")
+    walking.add_argument("--symlinks", choices = SYMLINK_POLICIES, default = "follow",
+                         help = "Hash the Target of Symbolic Links to Files, or skip them. Default is follow.")
+
+    parser = argparse.ArgumentParser(prog = "checksum", description = "Hash, Verify and Compare Folder Trees.",
+                                     epilog = "Exit Codes: 0 unchanged, 1 changes or duplicates found, "
+                                              "2 wrong arguments, 3 files could not be read.")
+    commands = parser.add_subparsers(dest = "command", required = True)
+
+    hash_parser = commands.add_parser("hash", parents = [walking, hashing, output],
+                                      help = "Hash Folder Trees into a Manifest.")
+    hash_parser.add_argument("-o", "--output", help = "Manifest to Write. Default Prints the Checksums.")
+    hash_parser.add_argument("-f", "--format", choices = ("json", "jsonl", "binary"),
+                             help = "Manifest Format. Default is jsonl, which keeps Size and Modification Time.")
+    hash_parser.add_argument("--no-fingerprints", action = "store_true",
+                             help = "Do not store sampled Fingerprints for quick Verification.")
+    hash_parser.add_argument("--sparse", action = "store_true",
+                             help = "Skip Reading the Holes of Sparse Files, i.e VM Disk Images. Same Checksums.")
+    hash_parser.add_argument("--leaf-size", type = parse_size,
+                             help = "Hash every File as a Merkle Tree of Leaves of this Size, i.e 4M, so verify "
+                                    "Reports which Byte Ranges changed.")
+    hash_parser.add_argument("--stats", help = "Write Hashing Stats to this File, Prometheus Text for *.prom.")
+    hash_parser.set_defaults(function = command_hash)
+
+    verify_parser = commands.add_parser("verify", parents = [hashing, output],
+                                        help = "Verify the Files of a Manifest.",
+                                        description = "Verify the Files of a Manifest. Files Hashed with "
+                                                      "--leaf-size are Checked Leaf by Leaf with the Leaf Size "
+                                                      "of their Entry, and their changed Byte Ranges are Reported.")
+    verify_parser.add_argument("manifest", help = "Manifest to Verify against.")
+    verify_parser.add_argument("--root", help = "Report Files in this Folder the Manifest does not know as added. "
+                                                "The Paths of merged Shards are resolved against it.")
+    verify_parser.add_argument("--quick", action = "store_true",
+                               help = "Trust Files whose Size, Modification Time and Fingerprint match.")
+    verify_parser.add_argument("--fail-fast", action = "store_true",
+                               help = "Stop at the first altered or removed File. Size Changes and missing Files "
+                                      "are found from stat Data alone, before any File is Read.")
+    verify_parser.set_defaults(function = command_verify)
+
+    diff_parser = commands.add_parser("diff", parents = [output], help = "Compare two Manifests.")
+    diff_parser.add_argument("old", help = "Earlier Manifest.")
+    diff_parser.add_argument("new", help = "Later Manifest.")
+    diff_parser.set_defaults(function = command_diff)
+
+    dedupe_parser = commands.add_parser("dedupe", parents = [walking, hashing, output],
+                                        help = "Find Files with the same Content.")
+    dedupe_parser.add_argument("--edge-size", type = parse_size, default = 4096,
+                               help = "Bytes Hashed at the Head and Tail of a File before a full Hash.")
+    dedupe_parser.set_defaults(function = command_dedupe, mode = "thread")
+
+    shard_parser = commands.add_parser("shard", parents = [hashing, output],
+                                       help = "Hash one Shard of a Folder Tree into a sorted Manifest.")
+    shard_parser.add_argument("root", help = "Folder to Walk, the same for every Shard.")
+    shard_parser.add_argument("--shards", type = int, required = True, help = "Number of Shards.")
+    shard_parser.add_argument("--index", type = int,
+                              help = "Shard to Hash, from 0. Default Hashes every Shard in its own Process and "
+                                     "Merges them, with --workers Processes at once.")
+    shard_parser.add_argument("--strategy", choices = STRATEGIES, default = "hash",
+                              help = "Split by Hash of the Path, or by top-level Folder. Default is hash.")
+    shard_parser.add_argument("-o", "--output", required = True, help = "Manifest to Write.")
+    shard_parser.add_argument("-f", "--format", choices = ("json", "jsonl", "binary"),
+                              help = "Manifest Format. Default is guessed from the Extension of the Output.")
+    shard_parser.add_argument("--include", action = "append", help = "Glob or re: Pattern of Files to Hash.")
+    shard_parser.add_argument("--exclude", action = "append",
+                              help = "Glob or re: Pattern of Files to Skip. Default Skips Checksum and JSON Files.")
+    shard_parser.add_argument("--exclude-dir", action = "append", help = "Glob or re: Pattern of Folders to Skip.")
+    shard_parser.set_defaults(function = command_shard)
+
+    merge_parser = commands.add_parser("merge", parents = [output],
+                                       help = "Merge sorted Shard Manifests into one sorted Manifest.")
+    merge_parser.add_argument("manifests", nargs = "+", help = "Shard Manifests sorted by Path.")
+    merge_parser.add_argument("-o", "--output", required = True, help = "Manifest to Write.")
+    merge_parser.add_argument("--root", help = "Root to record for the relative Paths. Default is the first Shard's.")
+    merge_parser.add_argument("-f", "--format", choices = ("json", "jsonl", "binary"),
+                              help = "Manifest Format. Default is guessed from the Extension of the Output.")
+    merge_parser.set_defaults(function = command_merge)
+
+    watch_parser = commands.add_parser("watch", parents = [hashing, output],
+                                       help = "Keep a Manifest current and Print Changes as they happen.")
+    watch_parser.add_argument("root", help = "Folder to Watch.")
+    watch_parser.add_argument("-m", "--manifest",
+                              help = "Manifest to keep current, Hashed first if it does not exist. JSON Lines or "
+                                     "Binary keep the stat Data that lets a Restart only Hash what changed.")
+    watch_parser.add_argument("--backend", choices = BACKENDS, default = "auto",
+                              help = "inotify, poll, or auto for inotify where it is available.")
+    watch_parser.add_argument("--debounce", type = float, default = 1.0,
+                              help = "Seconds a File has to be quiet before it is Hashed.")
+    watch_parser.add_argument("--poll-interval", type = float, default = 10.0,
+                              help = "Seconds between two Scans with the poll Backend.")
+    watch_parser.add_argument("--save-interval", type = float, default = 60.0,
+                              help = "Least Seconds between two Saves of the Manifest.")
+    watch_parser.add_argument("--include", action = "append", help = "Glob or re: Pattern of Files to Watch.")
+    watch_parser.add_argument("--exclude", action = "append",
+                              help = "Glob or re: Pattern of Files to Skip. Default Skips Checksum and JSON Files.")
+    watch_parser.add_argument("--exclude-dir", action = "append", help = "Glob or re: Pattern of Folders to Skip.")
+    watch_parser.set_defaults(function = command_watch)
+
+    return parser
+
+
+def main(arguments = None):
+    """
+    Run the Command Line Interface.
+    :param arguments: List of Arguments. Default is sys.argv, and "hash" if it has none.
+    :return: Exit Code.
+    """
+    arguments = sys.argv[1:] if arguments is None else arguments
+    options = build_parser().parse_args(arguments or ["hash"])
+
+    level = logging.ERROR if options.quiet else (logging.WARNING, logging.INFO, logging.DEBUG)[min(options.verbose, 2)]
+    logging.basicConfig(level = level, format = "%(levelname)s %(name)s: %(message)s", stream = sys.stderr)
+
+    try:
+        return options.function(options)
+    except ValueError as exception:
+        # i.e an unknown Algorithm or Manifest Format.
+        logger.error("%s", exception)
+        return EXIT_USAGE
+    except OSError as exception:
+        logger.error("%s", exception)
+        return EXIT_ERROR
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Duplicate File Finder.
+
+Finds Files with the same Content in Stages, so only a small Fraction of the Data is Read:
+
+1. Group Files by Size, taken from the stat Data the Walker already has. An optional checksum_filters.file_filter
+drops Files on the same stat Data first.
+2. Within Groups of more than one File, Hash only the first and last edge_size Bytes.
+3. Fully Hash only the Files that still share their Size and partial Hash.
+"""
+
+import logging
+from collections import defaultdict
+from itertools import chain
+
+from checksum import DEFAULT_EXCLUDE, hash_files, new_hash, walk_files
+
+logger = logging.getLogger(__name__)
+
+
+class duplicate_report:
+    """
+    Result of a Duplicate Search.
+    """
+    __slots__ = ("groups", "files_scanned", "bytes_scanned", "bytes_read")
+
+    def __init__(self):
+        # Lists of Paths with the same Content, with the Size of one of them: Tuples (size, [file_path, ...]).
+        self.groups = []
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.bytes_read = 0
+
+    @property
+    def bytes_saved(self):
+        """
+        Number of Bytes freed if only one File of every Group was kept.
+        """
+        return sum(size * (len(paths) - 1) for size, paths in self.groups)
+
+    def __str__(self):
+        lines = [f"[Duplicates] {len(paths)} Files of {size} Bytes\n" + "\n".join(paths) + "\n"
+                 for size, paths in self.groups]
+        lines.append(f"{len(self.groups)} Groups, {self.bytes_saved} Bytes saved, "
+                     f"{self.bytes_read} of {self.bytes_scanned} Bytes Read.")
+        return "\n".join(lines)
+
+
+def partial_checksum(file_path, size, edge_size = 4096, algorithm = "sha256"):
+    """
+    Compute the Checksum of the first and last edge_size Bytes of a File.
+    Files of at most 2 * edge_size Bytes are Hashed whole.
+    :param file_path: Path of the File.
+    :param size: Size of the File in Bytes.
+    :param edge_size: Number of Bytes Read at the Head and at the Tail.
+    :param algorithm: Algorithm Name, see checksum.new_hash.
+    :return: Hexadecimal Checksum.
+    """
+    hash_type = new_hash(algorithm)
+    with open(file_path, "rb") as file:
+        if size <= 2 * edge_size:
+            hash_type.update(file.read())
+        else:
+            hash_type.update(file.read(edge_size))
+            file.seek(size - edge_size)
+            hash_type.update(file.read(edge_size))
+    return hash_type.hexdigest()
+
+
+def find_duplicates(root = None, algorithm = "sha256", edge_size = 4096, min_size = 1, workers = None,
+                    mode = "thread", include = None, exclude = DEFAULT_EXCLUDE, exclude_dirs = None,
+                    file_filter = None):
+    """
+    Find Files with the same Content in the root Folder and all Sub Directories.
+    Symbolic Links are Skipped and Hard Links to the same File are counted once.
+    :param root: Parent folder, or a List of Parent Folders Searched together. Default is the Current Working
+    Directory.
+    :param algorithm: Algorithm Name used for the partial and full Hashes, see checksum.new_hash.
+    :param edge_size: Number of Bytes Hashed at the Head and Tail of a File in the partial Stage.
+    :param min_size: Files smaller than min_size Bytes are Ignored. Default Ignores empty Files.
+    :param workers: Number of Workers of the full Hash Stage, see checksum.hash_files.
+    :param mode: "thread" or "process" Pool of the full Hash Stage.
+    :param include: Glob or Regex Patterns, only Matching Files are Checked.
+    :param exclude: Glob or Regex Patterns of Files to Skip.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+    :param file_filter: Optional checksum_filters.file_filter that drops Files before they are Grouped, i.e by Size
+    Range, Extension or Modification Time.
+    :return: duplicate_report.
+    """
+    report = duplicate_report()
+
+    # Stage 1: Group by Size.
+    sizes = defaultdict(list)
+    seen_files = set()
+    roots = root if isinstance(root, (list, tuple)) else [root]
+    entries = chain.from_iterable(walk_files(folder, include, exclude, exclude_dirs) for folder in roots)
+    if file_filter is not None:
+        entries = file_filter(entries)
+    for entry in entries:
+        try:
+            if entry.is_symlink():
+                continue
+            file_stat = entry.stat()
+        except OSError:
+            continue
+        if file_stat.st_size < min_size:
+            continue
+
+        # Hard Links share their Content and Storage, they are not Duplicates worth Removing.
+        file_id = (file_stat.st_dev, file_stat.st_ino)
+        if file_stat.st_ino and file_id in seen_files:
+            continue
+        seen_files.add(file_id)
+
+        sizes[file_stat.st_size].append(entry.path)
+        report.files_scanned += 1
+        report.bytes_scanned += file_stat.st_size
+    seen_files.clear()
+
+    # Stage 2: Group Files of the same Size by the Hash of their Head and Tail.
+    candidates = defaultdict(list)
+    for size, paths in sizes.items():
+        if len(paths) < 2:
+            continue
+        for path in paths:
+            try:
+                candidates[(size, partial_checksum(path, size, edge_size, algorithm))].append(path)
+            except OSError as exception:
+                logger.warning("%s", exception)
+                continue
+            report.bytes_read += min(size, 2 * edge_size)
+    sizes.clear()
+
+    # Files this small were Hashed whole already.
+    to_hash = []
+    for (size, _), paths in candidates.items():
+        if len(paths) < 2:
+            continue
+        if size <= 2 * edge_size:
+            report.groups.append((size, sorted(paths)))
+        else:
+            to_hash.extend(paths)
+
+    # Stage 3: Fully Hash the remaining Candidates.
+    path_sizes = {path: size for (size, _), paths in candidates.items()
+                  if len(paths) > 1 and size > 2 * edge_size for path in paths}
+    candidates.clear()
+
+    full_hashes = defaultdict(list)
+    for path, hash_value in hash_files(to_hash, algorithm, workers, mode = mode):
+        if hash_value is None:
+            continue
+        size = path_sizes[path]
+        report.bytes_read += size
+        full_hashes[(size, hash_value)].append(path)
+
+    report.groups.extend((size, sorted(paths)) for (size, _), paths in full_hashes.items() if len(paths) > 1)
+    report.groups.sort(key = lambda group: group[0] * (len(group[1]) - 1), reverse = True)
+    return report
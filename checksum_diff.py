@@ -0,0 +1,170 @@
+"""
+Checksum Diff Engine.
+
+Compares new Checksum Data with previous Checksum Data in one Hash Join Pass and returns structured Results:
+matched, altered, added and removed Files. Rendering the Results as Text is a separate, lazy Step.
+"""
+
+import os
+
+from checksum_algorithms import algorithm_name
+
+# Status of a File in a Diff.
+MATCHED = "matched"
+ALTERED = "altered"
+ADDED = "added"
+REMOVED = "removed"
+SKIPPED = "skipped"
+STATUSES = (MATCHED, ALTERED, ADDED, REMOVED, SKIPPED)
+
+# Previous Digest of a File the previous Checksum Data does not know, apart from a None Digest it does know.
+_MISSING = object()
+
+# Text Labels of every Status, as they are shown in the Log.
+LABELS = {MATCHED: "[Match]", ALTERED: "[This is an altered File!]", ADDED: "[This is a new File!]",
+          REMOVED: "[This File was removed!]", SKIPPED: "[This File was not Hashed!]"}
+
+
+class checksum_diff:
+    """
+    Result of a Diff. Every Status holds a List of Tuples (file_path, new_hash_code, old_hash_code).
+    """
+    __slots__ = STATUSES + ("ranges",)
+
+    def __init__(self):
+        self.matched = []
+        self.altered = []
+        self.added = []
+        self.removed = []
+        self.skipped = []
+
+        # Changed Byte Ranges of altered Files Checked Leaf by Leaf, see checksum_tree: {file_path: [(start, end)]}.
+        self.ranges = {}
+
+    def __str__(self):
+        return "".join(self.render())
+
+    def __iter__(self):
+        """
+        Iterate over every File of the Diff.
+        :return: Generator of Tuples (status, file_path, new_hash_code, old_hash_code).
+        """
+        for status in (ALTERED, ADDED, REMOVED, SKIPPED, MATCHED):
+            for file_path, new_hash, old_hash in getattr(self, status):
+                yield status, file_path, new_hash, old_hash
+
+    @property
+    def counts(self):
+        """
+        Number of Files of every Status.
+        :return: Dictionary {status: count}.
+        """
+        return {status: len(getattr(self, status)) for status in STATUSES}
+
+    @property
+    def has_changes(self):
+        """
+        True if any File was altered, added or removed.
+        """
+        return bool(self.altered or self.added or self.removed)
+
+    def render(self, statuses = (ALTERED, ADDED, REMOVED, SKIPPED, MATCHED)):
+        """
+        Lazily Render the Diff as Text, one File at a time.
+        :param statuses: Statuses to Render, in this Order.
+        :return: Generator of Strings.
+        """
+        for status in statuses:
+            label = LABELS[status]
+            for file_path, new_hash, old_hash in getattr(self, status):
+                hash_value = old_hash if status == REMOVED else new_hash
+                yield f"{label}\n{file_path}\n{os.path.basename(file_path)} : {hash_value} \n"
+                if file_path in self.ranges:
+                    yield f"Changed Bytes : {', '.join(f'{start}-{end}' for start, end in self.ranges[file_path])}\n"
+                yield "\n"
+
+    def summary(self):
+        """
+        Render the Number of Files of every Status as one Line.
+        :return: String.
+        """
+        return ", ".join(f"{count} {status}" for status, count in self.counts.items())
+
+
+def _shared_digest(digests, hash_value, algorithm = None):
+    """
+    Find the Digest in a Dictionary {algorithm: hash_code} to compare a single Hexadecimal Digest with.
+    :param digests: Dictionary {algorithm: hash_code}, i.e of a multi_hash.
+    :param hash_value: Hexadecimal Digest.
+    :param algorithm: Algorithm of hash_value. None looks for the one Algorithm with a Digest of the same Length.
+    :return: Hexadecimal Digest of the shared Algorithm.
+    """
+    if algorithm is not None:
+        for name in (algorithm, algorithm_name(algorithm)):
+            if name in digests:
+                return digests[name]
+        raise ValueError(f"The Algorithm {algorithm!r} is not one of {', '.join(digests)}.")
+
+    candidates = [name for name, digest in digests.items() if digest is not None and len(digest) == len(hash_value)]
+    if len(candidates) != 1:
+        raise ValueError(f"Can not tell which of {', '.join(digests)} a Digest of {len(hash_value)} Characters "
+                         f"was made with, give its algorithm.")
+    return digests[candidates[0]]
+
+
+def same_digest(hash_value, other_hash_value, algorithm = None, other_algorithm = None):
+    """
+    Check if two Digests are equal, ignoring the Case of Hexadecimal Digits.
+    Dictionaries {algorithm: hash_code} are equal if every Algorithm they share has the same Digest.
+    A single Digest is compared with the Digest of its Algorithm in a Dictionary, see _shared_digest.
+    :param algorithm: Algorithm of hash_value if it is a single Digest, or None.
+    :param other_algorithm: Algorithm of other_hash_value if it is a single Digest, or None.
+    :return: True or False.
+    :raise ValueError: The Digests share no Algorithm.
+    """
+    if isinstance(hash_value, dict) and isinstance(other_hash_value, dict):
+        shared = hash_value.keys() & other_hash_value.keys()
+        if not shared:
+            raise ValueError(f"The Digests share no Algorithm: {', '.join(hash_value)} and "
+                             f"{', '.join(other_hash_value)}.")
+        return all(same_digest(hash_value[name], other_hash_value[name]) for name in shared)
+    if isinstance(hash_value, dict):
+        hash_value = _shared_digest(hash_value, other_hash_value, other_algorithm)
+    elif isinstance(other_hash_value, dict):
+        other_hash_value = _shared_digest(other_hash_value, hash_value, algorithm)
+    return hash_value.lower() == other_hash_value.lower()
+
+
+def diff_checksums(new_checksum_data = [], old_checksum_data = {}, algorithm = None, old_algorithm = None):
+    """
+    Compare new Checksum Data with previous Checksum Data in one Pass.
+    :param new_checksum_data: Iterable of Tuples (file_path, hash_code).
+    :param old_checksum_data: Dictionary {file_path: hash_code} or Iterable of Tuples (file_path, hash_code).
+    :param algorithm: Algorithm Name of single new Digests, to compare them with Dictionaries of several
+    Algorithms, see same_digest.
+    :param old_algorithm: Algorithm Name of single previous Digests.
+    :return: checksum_diff. Files without a new or a previous Digest are skipped, unless they are new.
+    :raise ValueError: A new and a previous Digest share no Algorithm.
+    """
+    diff = checksum_diff()
+
+    # Every previous File that is not found again was removed.
+    remaining = dict(old_checksum_data)
+
+    for file_path, hash_value in new_checksum_data:
+        old_hash = remaining.pop(file_path, _MISSING)
+        if old_hash is _MISSING:
+            if hash_value is None:
+                diff.skipped.append((file_path, None, None))
+            else:
+                diff.added.append((file_path, hash_value, None))
+        elif hash_value is None or old_hash is None:
+            # The File was not Hashed on one Side, so it can not be Compared.
+            diff.skipped.append((file_path, hash_value, old_hash))
+        elif same_digest(hash_value, old_hash, algorithm, old_algorithm):
+            diff.matched.append((file_path, hash_value, old_hash))
+        else:
+            diff.altered.append((file_path, hash_value, old_hash))
+
+    diff.removed.extend((file_path, None, old_hash) for file_path, old_hash in remaining.items())
+    return diff
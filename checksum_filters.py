@@ -0,0 +1,160 @@
+"""
+Pre-Hash File Filters.
+
+A file_filter sits between the Walker and the Hashers and drops Files before any Worker sees them. Every Check
+works on the Name and on the stat Data the os.DirEntry of checksum.walk_files already holds, so a File is stat'ed
+at most once, and its Entry keeps the Result for the Hashers:
+
+1. Symbolic Links: "follow" Hashes their Target, "skip" drops them.
+2. Extensions to keep or to drop, without Case.
+3. File Type: FIFOs, Sockets and Devices are dropped unless special_files is set, Reading them can block forever.
+4. Size Range in Bytes.
+5. Modification Time Window in Seconds since the Epoch.
+
+Dropped Files are counted per Reason in file_filter.skipped and in a checksum_stats.hash_stats, never Logged one
+by one. Entries whose stat Data can not be Read are kept, Hashing them Reports the Error.
+
+    walk_filter = file_filter(max_size = 2 * 1024 ** 3, exclude_extensions = (".iso", ".tmp"), symlinks = "skip")
+    checksum_data = hash_files(walk_files("/data"), "sha256", file_filter = walk_filter)
+"""
+
+import os
+import stat
+
+# What is done with Symbolic Links to Files.
+SYMLINK_POLICIES = ("follow", "skip")
+
+""" SKIP REASONS """
+SYMLINK = "symlink"
+EXTENSION = "extension"
+FILE_TYPE = "file_type"
+SIZE = "size"
+MTIME = "mtime"
+
+
+def _extensions(extensions):
+    """
+    Normalize Extensions to lower case with a leading Dot.
+    """
+    if extensions is None:
+        return None
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return tuple(extension.lower() if extension.startswith(".") else f".{extension.lower()}"
+                 for extension in extensions)
+
+
+class file_filter:
+    """
+    Composable Pipeline of Checks on Walker Entries.
+    """
+    __slots__ = ("name_checks", "stat_checks", "skipped")
+
+    def __init__(self, min_size = None, max_size = None, extensions = None, exclude_extensions = None,
+                 modified_after = None, modified_before = None, special_files = False, symlinks = "follow"):
+        """
+        :param min_size: Drop Files smaller than this many Bytes.
+        :param max_size: Drop Files bigger than this many Bytes.
+        :param extensions: Only keep Files with one of these Extensions, i.e (".jpg", "png").
+        :param exclude_extensions: Drop Files with one of these Extensions.
+        :param modified_after: Drop Files last modified before this Time, in Seconds since the Epoch.
+        :param modified_before: Drop Files last modified after this Time, in Seconds since the Epoch.
+        :param special_files: Keep FIFOs, Sockets and Devices.
+        :param symlinks: "follow" or "skip" Symbolic Links to Files.
+        """
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Unknown symlinks policy {symlinks!r}, use {' or '.join(map(repr, SYMLINK_POLICIES))}.")
+
+        # Tuples (reason, check) of Checks on the Entry alone, and on the Entry and its stat Data.
+        # A Check returns True to keep the File.
+        self.name_checks = []
+        self.stat_checks = []
+
+        # Number of dropped Files by Reason.
+        self.skipped = {}
+
+        if symlinks == "skip":
+            self.add_check(SYMLINK, lambda entry: not _is_symlink(entry), needs_stat = False)
+
+        extensions = _extensions(extensions)
+        if extensions is not None:
+            self.add_check(EXTENSION, lambda entry: _name(entry).lower().endswith(extensions), needs_stat = False)
+        exclude_extensions = _extensions(exclude_extensions)
+        if exclude_extensions:
+            self.add_check(EXTENSION, lambda entry: not _name(entry).lower().endswith(exclude_extensions),
+                           needs_stat = False)
+
+        if not special_files:
+            self.add_check(FILE_TYPE, lambda entry, file_stat: stat.S_ISREG(file_stat.st_mode))
+
+        if min_size is not None or max_size is not None:
+            low = 0 if min_size is None else min_size
+            high = float("inf") if max_size is None else max_size
+            self.add_check(SIZE, lambda entry, file_stat: low <= file_stat.st_size <= high)
+
+        if modified_after is not None or modified_before is not None:
+            after = float("-inf") if modified_after is None else int(modified_after * 10 ** 9)
+            before = float("inf") if modified_before is None else int(modified_before * 10 ** 9)
+            self.add_check(MTIME, lambda entry, file_stat: after <= file_stat.st_mtime_ns <= before)
+
+    def add_check(self, reason, check, needs_stat = True):
+        """
+        Add a Check to the Pipeline. Checks without stat Data run first, so a dropped File is never stat'ed.
+        :param reason: Name the dropped Files are counted under.
+        :param check: Function (entry, file_stat) -> bool, or (entry) -> bool if needs_stat is False.
+        True keeps the File.
+        :param needs_stat: The Check needs the stat Data of the File.
+        :return: self.
+        """
+        (self.stat_checks if needs_stat else self.name_checks).append((reason, check))
+        return self
+
+    def __call__(self, entries, stats = None):
+        """
+        Filter Walker Entries.
+        :param entries: Iterable of os.DirEntry Objects or File Paths.
+        :param stats: Optional checksum_stats.hash_stats the dropped Files are counted in.
+        :return: Generator of the kept Entries.
+        """
+        for entry in entries:
+            reason = self.reject(entry)
+            if reason is None:
+                yield entry
+                continue
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+            if stats is not None:
+                stats.add_skip(reason)
+
+    def reject(self, entry):
+        """
+        Run the Checks on one Entry.
+        :param entry: os.DirEntry or File Path.
+        :return: Reason the File is dropped for, or None to keep it.
+        """
+        for reason, check in self.name_checks:
+            if not check(entry):
+                return reason
+        if not self.stat_checks:
+            return None
+
+        try:
+            # os.DirEntry Caches the Result for the Hashers.
+            file_stat = entry.stat() if isinstance(entry, os.DirEntry) else os.stat(entry)
+        except OSError:
+            return None
+        for reason, check in self.stat_checks:
+            if not check(entry, file_stat):
+                return reason
+        return None
+
+    @property
+    def skipped_count(self):
+        return sum(self.skipped.values())
+
+
+def _name(entry):
+    return entry.name if isinstance(entry, os.DirEntry) else os.path.basename(entry)
+
+
+def _is_symlink(entry):
+    return entry.is_symlink() if isinstance(entry, os.DirEntry) else os.path.islink(entry)
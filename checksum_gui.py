@@ -3,14 +3,276 @@ Created By : Ubaidullah Effendi-Emjedi
 LinkedIn :
 Icon By : https://www.flaticon.com/authors/freepik
 """
+import logging
 import sys
+import time
+from array import array
 
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication, QAction, qApp, QFileDialog
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QThread, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QIcon
+from PyQt5.QtWidgets import QApplication, QAction, QActionGroup, qApp, QFileDialog
 
 from checksum import *
+from checksum_algorithms import algorithm_name
+from checksum_diff import ADDED, ALTERED, MATCHED, REMOVED, SKIPPED
+from checksum_filters import file_filter
+from checksum_manifest import manifest_format, read_manifest, read_manifest_header
+from checksum_results import checksum_results
 from pyqt_creator import *
 
+logger = logging.getLogger(__name__)
+
+
+class checksum_worker(QThread):
+    """
+    Background Thread that Hashes a Folder Tree, so the Window stays Responsive.
+    Results and Progress are emitted in throttled Batches, at most once every BATCH_INTERVAL Seconds.
+    """
+
+    """ SECONDS BETWEEN TWO BATCHES OF RESULTS """
+    BATCH_INTERVAL = 0.25
+
+    """ SIGNALS """
+    # Files done, Files in total, Bytes done, Bytes in total. Bytes are Python Integers, they exceed 32 bits.
+    progress = pyqtSignal(int, int, object, object)
+
+    # Batch of Tuples (file_path, hash_code, size).
+    results = pyqtSignal(list)
+
+    # Error Message.
+    failed = pyqtSignal(str)
+
+    def __init__(self, root = None, algorithm = "blake2", ignore_files = (), size_cap_in_mb = None, parent = None):
+        super(checksum_worker, self).__init__(parent)
+        self.root = root
+        self.algorithm = algorithm
+        self.ignore_files = ignore_files
+        self.size_cap_in_mb = size_cap_in_mb
+
+        # Drops FIFOs, Sockets and Devices, Reading them can block the Worker forever.
+        self.walk_filter = file_filter()
+
+    def run(self):
+        """
+        Walk and Hash the Folder Tree until it is done or Interruption is Requested.
+        :return:
+        """
+        try:
+            # Walk first, so the Progress Bar knows the Number of Files and Bytes.
+            # The Entries keep their stat Data, hash_files decides the Size Cap from it without stat'ing again.
+            entries = []
+            sizes = {}
+            walker = walk_files(self.root, exclude = DEFAULT_EXCLUDE, ignore_files = self.ignore_files)
+            for entry in self.walk_filter(walker):
+                if self.isInterruptionRequested():
+                    return
+                entries.append(entry)
+                try:
+                    sizes[entry.path] = entry.stat().st_size
+                except OSError:
+                    sizes[entry.path] = 0
+
+            total_files = len(sizes)
+            total_bytes = sum(sizes.values())
+            files_done = 0
+            bytes_done = 0
+            self.progress.emit(files_done, total_files, bytes_done, total_bytes)
+
+            batch = []
+            last_emit = time.monotonic()
+            checksum_data = hash_files(entries, self.algorithm, size_cap_in_mb = self.size_cap_in_mb)
+            try:
+                for file_path, hash_value in checksum_data:
+                    if self.isInterruptionRequested():
+                        break
+
+                    size = sizes.pop(file_path, 0)
+                    batch.append((file_path, hash_value, size))
+                    files_done += 1
+                    bytes_done += size
+
+                    now = time.monotonic()
+                    if now - last_emit >= self.BATCH_INTERVAL:
+                        self.results.emit(batch)
+                        self.progress.emit(files_done, total_files, bytes_done, total_bytes)
+                        batch = []
+                        last_emit = now
+            finally:
+                # Stop the Worker Pool, Files not yet started are Cancelled.
+                checksum_data.close()
+
+            self.results.emit(batch)
+            self.progress.emit(files_done, total_files, bytes_done, total_bytes)
+        except Exception as exception:
+            self.failed.emit(str(exception))
+
+
+class checksum_table_model(QAbstractTableModel):
+    """
+    Table of Checksum Results for a QTableView.
+    Rows are backed by the Columns of a checksum_results, with the Status of every Row in an Array, and a Row is only
+    turned into Text when the View asks for a visible Cell, so Millions of Rows stay cheap. Sorting and Filtering
+    only rearrange an Array of Row Indexes.
+    """
+
+    """ COLUMNS """
+    COLUMNS = ("Path", "Status", "Algorithm", "Digest", "Size")
+    PATH, STATUS, ALGORITHM, DIGEST, SIZE = range(len(COLUMNS))
+
+    """ STATUS OF A ROW BY ITS CODE IN THE STATUS ARRAY, NO STATUS BEFORE A COMPARISON """
+    ROW_STATUSES = ("", MATCHED, ALTERED, ADDED, REMOVED, SKIPPED)
+    STATUS_CODES = {status: code for code, status in enumerate(ROW_STATUSES)}
+
+    """ TEXT COLOUR OF EVERY STATUS """
+    STATUS_COLOURS = {ALTERED: QColor(200, 0, 0), ADDED: QColor(0, 120, 0), REMOVED: QColor(160, 90, 0),
+                      SKIPPED: QColor(120, 120, 120)}
+
+    def __init__(self, parent = None):
+        super(checksum_table_model, self).__init__(parent)
+        self.results = checksum_results()
+        self.algorithm = None
+
+        # Status Code of every Row, see ROW_STATUSES.
+        self.row_statuses = array("B")
+
+        # Indexes of the Rows that pass the Filter, in Sort Order.
+        self.visible = array("q")
+
+        # Filter: Status Codes to Show, None Shows every Status, and Text the Path has to contain.
+        self.statuses = None
+        self.text = ""
+
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+
+    """ QAbstractTableModel """
+
+    def rowCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible)
+
+    def columnCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        position = self.visible[index.row()]
+        status = self.ROW_STATUSES[self.row_statuses[position]]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == self.PATH:
+                return self.results.path(position)
+            if column == self.STATUS:
+                return status.capitalize()
+            if column == self.ALGORITHM:
+                return self.algorithm
+            if column == self.DIGEST:
+                hash_value = self.results.digest(position)
+                return "" if hash_value is None else str(hash_value)
+            size = self.results.size(position)
+            return "" if size is None else f"{size:,}"
+        if role == Qt.ToolTipRole and column in (self.PATH, self.DIGEST):
+            return self.results.path(position) if column == self.PATH else str(self.results.digest(position))
+        if role == Qt.TextAlignmentRole and column == self.SIZE:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.ForegroundRole:
+            return self.STATUS_COLOURS.get(status)
+        return None
+
+    def sort(self, column, order = Qt.AscendingOrder):
+        """
+        Sort the visible Rows by a Column.
+        :param column: Column Index.
+        :param order: Qt.AscendingOrder or Qt.DescendingOrder.
+        :return:
+        """
+        # Column -1 means no Sort Column, the Rows keep their Order.
+        self.sort_column, self.sort_order = (column if column >= 0 else None), order
+        self.layoutAboutToBeChanged.emit()
+        self.visible = self.__sorted(self.visible)
+        self.layoutChanged.emit()
+
+    """ FUNCTIONS """
+
+    def __sort_key(self, column):
+        """
+        Key Function of a Column for sorted, over Row Indexes.
+        """
+        results = self.results
+        if column == self.SIZE:
+            # Unknown Sizes are -1 in the Size Array, they sort first.
+            return results.sizes.__getitem__
+        if column == self.DIGEST:
+            return lambda position: "" if results.digest(position) is None else str(results.digest(position))
+        if column == self.STATUS:
+            return lambda position: self.ROW_STATUSES[self.row_statuses[position]]
+        return results.path
+
+    def __sorted(self, positions):
+        """
+        Sort Row Indexes by the current Sort Column. Every Row has the same Algorithm, it keeps the Order.
+        """
+        if self.sort_column is None or self.sort_column == self.ALGORITHM:
+            return array("q", positions)
+        return array("q", sorted(positions, key = self.__sort_key(self.sort_column),
+                                 reverse = self.sort_order == Qt.DescendingOrder))
+
+    def __accepts(self, position):
+        """
+        Check if a Row passes the Filter.
+        """
+        return ((self.statuses is None or self.row_statuses[position] in self.statuses) and
+                (not self.text or self.text in self.results.path(position)))
+
+    def set_results(self, results = None, row_statuses = None, algorithm = None):
+        """
+        Replace every Row.
+        :param results: checksum_results, Read by the Model without a Copy. Default is no Rows.
+        :param row_statuses: Array of the Status Code of every File, see ROW_STATUSES. Default is no Status.
+        :param algorithm: Name of the Hash Algorithm of the Digests.
+        :return:
+        """
+        self.beginResetModel()
+        self.results = checksum_results() if results is None else results
+        self.row_statuses = array("B", bytes(len(self.results))) if row_statuses is None else row_statuses
+        self.algorithm = algorithm
+        self.visible = self.__sorted(position for position in range(len(self.results)) if self.__accepts(position))
+        self.endResetModel()
+
+    def extend(self, checksum_data = []):
+        """
+        Add Files at the End of the Results, i.e while a Tree is being Hashed. New Rows are not Sorted in, until the
+        next Sort. Files without a Hash Value are skipped.
+        :param checksum_data: List of Tuples (file_path, hash_code, size).
+        :return:
+        """
+        start = len(self.results)
+        self.results.extend(checksum_data)
+        self.row_statuses.extend(self.STATUS_CODES[SKIPPED if hash_value is None else ""]
+                                 for _, hash_value, _ in checksum_data)
+        positions = [position for position in range(start, len(self.results)) if self.__accepts(position)]
+        if positions:
+            self.beginInsertRows(QModelIndex(), len(self.visible), len(self.visible) + len(positions) - 1)
+            self.visible.extend(positions)
+            self.endInsertRows()
+
+    def set_filter(self, statuses = None, text = ""):
+        """
+        Only Show Rows of some Statuses and whose Path contains a Text.
+        :param statuses: Collection of Statuses to Show. None Shows every Status.
+        :param text: Text the Path has to contain. Empty Text Shows every Path.
+        :return:
+        """
+        self.statuses = None if statuses is None else frozenset(self.STATUS_CODES[status] for status in statuses)
+        self.text = text
+        self.set_results(self.results, self.row_statuses, self.algorithm)
+
 
 class checksum_window(QMainWindow):
     """
@@ -30,8 +292,15 @@ class checksum_window(QMainWindow):
     """ JSON FILE REFERENCE """
     json_file = ""
 
+    """ HASH ALGORITHMS: MENU TEXT AND REGISTRY NAME """
+    HASH_ALGORITHMS = {"Blake2": "blake2", "SHA3_512": "sha3_512", "SHA256": "sha256",
+                       "CRC32 (fast, Change Detection only)": "crc32"}
+
     """ HASH FUNCTION """
-    __hash_type = hashlib.blake2b()
+    __algorithm = "blake2"
+
+    """ NAME OF THE HASH ALGORITHM OF THE CHECKSUM DATA """
+    algorithm = None
 
     """ COMMON FILE SIZE RANGES """
     FILE_SIZES = {"32mb": 32.0, "64mb": 64.0, "128mb": 128.0, "256mb": 256.0, "512mb": 512.0, "1024mb": 1024.0,
@@ -41,7 +310,17 @@ class checksum_window(QMainWindow):
 
     checksum_string = ""
 
-    checksum_data = []
+    # Checksum Data of the last Run or Opened File, held in Columns of raw Digests.
+    checksum_data = checksum_results()
+
+    """ RESULT TABLE FILTERS: NAME AND STATUSES SHOWN """
+    RESULT_FILTERS = {"All": None, "Changes": (ALTERED, ADDED, REMOVED, SKIPPED), "Altered": (ALTERED,),
+                      "Added": (ADDED,), "Removed": (REMOVED,), "Skipped": (SKIPPED,), "Matched": (MATCHED,)}
+
+    """ BACKGROUND CHECKSUM WORKER """
+    worker = None
+
+    hash_started = 0.0
 
     """ CONSTRUCTOR """
 
@@ -93,29 +372,27 @@ class checksum_window(QMainWindow):
         quit_action.setShortcut("Ctrl+Q")
         quit_action.setStatusTip("Quit Application.")
 
-        self.blake2_hash_action = QAction("Blake2", self)
-        self.blake2_hash_action.setCheckable(True)
-        self.blake2_hash_action.setChecked(True)
-        self.blake2_hash_action.setStatusTip("Use Blake2 Hashing Algorithm.")
-
-        self.sha3_512_hash_action = QAction("SHA3_512", self)
-        self.sha3_512_hash_action.setCheckable(True)
-        self.sha3_512_hash_action.setStatusTip("Use SHA3_512 Hashing Algorithm.")
+        # One checked Action per Hash Algorithm.
+        hash_action_group = QActionGroup(self)
+        hash_action_group.setExclusive(True)
+        for text, algorithm in self.HASH_ALGORITHMS.items():
+            hash_action = QAction(text, hash_action_group)
+            hash_action.setCheckable(True)
+            hash_action.setChecked(algorithm == self.__algorithm)
+            hash_action.setStatusTip(f"Use {text} Hashing Algorithm.")
+            hash_action.toggled.connect(lambda is_checked, algorithm = algorithm:
+                                        self.__change_algorithm(is_checked, algorithm))
+            self.hash_menu.addAction(hash_action)
 
         # Add Actions
         file_menu.addAction(open_action)
         file_menu.addAction(save_action)
         file_menu.addAction(quit_action)
 
-        self.hash_menu.addAction(self.blake2_hash_action)
-        self.hash_menu.addAction(self.sha3_512_hash_action)
-
         # Events
         open_action.triggered.connect(self.open_file_dialog)
         save_action.triggered.connect(lambda: self.save_file_dialog())
-        quit_action.triggered.connect(lambda: (qApp.quit(), print("Close Application!")))
-        self.blake2_hash_action.toggled.connect(lambda: self.__blake2_hash_action())
-        self.sha3_512_hash_action.toggled.connect(lambda: self.__sha3_512_hash_action())
+        quit_action.triggered.connect(lambda: (qApp.quit(), logger.info("Close Application!")))
 
     def main_window_layout_setup(self):
         """
@@ -140,8 +417,11 @@ class checksum_window(QMainWindow):
         """
         # CUSTOM GUI
         file_size_hlayout = self.choose_file_sizes_to_ignore()
-        self.log_file = self.checksum_log_file()
+        filter_hlayout = self.result_table_filter()
+        self.result_table = self.checksum_result_table()
+        self.progress_bar = self.checksum_progress_bar()
         self.hash_button = self.calculate_hash_button()
+        self.cancel_button = self.cancel_hash_button()
         self.compare_button = self.compare_hash_button()
 
         # Create Vertical Layout
@@ -152,8 +432,10 @@ class checksum_window(QMainWindow):
         vertical_layout.addLayout(file_size_hlayout)
 
         # Add Widgets to Vertical Layout.
-        vertical_layout.addWidget(self.log_file)
-        vertical_layout.addWidget(self.hash_button)
+        vertical_layout.addLayout(filter_hlayout)
+        vertical_layout.addWidget(self.result_table)
+        vertical_layout.addWidget(self.progress_bar)
+        vertical_layout.addLayout(create_horizontal_layout(self.hash_button, self.cancel_button))
         vertical_layout.addWidget(self.compare_button)
 
         # Set MainWindow Layout to Vertical Layout
@@ -199,22 +481,53 @@ class checksum_window(QMainWindow):
 
         return horizontal_layout
 
-    def checksum_log_file(self):
+    def checksum_result_table(self):
         """
-        Create Checksum Log File
-        :return:
+        Create Checksum Result Table
+        :return: Table View
         """
-        # Create Line Edit Widget
-        log_file = create_text_edit()
+        self.table_model = checksum_table_model(self)
 
-        log_file.setToolTip("Checksum Log Text")
-        log_file.setStatusTip(
+        table_view = create_table_view(self.table_model, tooltip = "Checksum Results")
+        table_view.setStatusTip(
             "This is where the new Calculated Checksum Data or Opened Checksum File Data is Displayed.")
 
-        # Set to ReadOnly True
-        log_file.setReadOnly(True)
+        # Sort on a Header Click. No Sort Column until the first Click keeps the Hashing Order.
+        table_view.setSortingEnabled(True)
+        table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+
+        return table_view
+
+    def result_table_filter(self):
+        """
+        Create the Status and Path Filter of the Result Table.
+        :return: Horizontal Layout.
+        """
+        self.status_filter_combo_box = QComboBox()
+        self.status_filter_combo_box.addItems(list(self.RESULT_FILTERS))
+        self.status_filter_combo_box.setStatusTip("Only Show Files with this Status of the last Comparison.")
+
+        self.path_filter_line_edit = create_line_edit(hint = "Filter Paths")
+        self.path_filter_line_edit.setStatusTip("Only Show Files whose Path contains this Text.")
+
+        # Filter once Typing Pauses, instead of on every Key.
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(lambda: self.filter_result_table())
+
+        self.status_filter_combo_box.currentIndexChanged.connect(lambda: self.filter_result_table())
+        self.path_filter_line_edit.textChanged.connect(lambda: self.filter_timer.start())
 
-        return log_file
+        return create_horizontal_layout(self.status_filter_combo_box, self.path_filter_line_edit)
+
+    def filter_result_table(self):
+        """
+        Apply the Status and Path Filter to the Result Table.
+        :return:
+        """
+        self.table_model.set_filter(self.RESULT_FILTERS[self.status_filter_combo_box.currentText()],
+                                    self.path_filter_line_edit.text())
 
     def calculate_hash_button(self):
         """
@@ -228,38 +541,116 @@ class checksum_window(QMainWindow):
             "Files in sub-directories are included.")
         return button
 
+    def checksum_progress_bar(self):
+        """
+        Create Checksum Progress Bar, in Thousandths of the Bytes to Hash.
+        :return: Progress Bar
+        """
+        progress_bar = create_progress_bar(maximum = 1000, tooltip = "Checksum Progress")
+        progress_bar.setStatusTip("Share of the Bytes whose Checksum is Calculated.")
+        return progress_bar
+
+    def cancel_hash_button(self):
+        """
+        Create Cancel Hash Button
+        :return: Button
+        """
+        button = create_button(text = "Cancel")
+        button.clicked.connect(lambda: self.cancel_checksum_data())
+        button.setStatusTip("Stop Calculating the Checksum of Files.")
+        button.setEnabled(False)
+        return button
+
     def calculate_checksum_data(self):
         """
-        Calculate Checksum Data
+        Calculate Checksum Data on a Background Worker.
         :return:
         """
-        paths = get_path_to_all_files(
-            ignore_files = [os.path.basename(__file__), sys.argv[0], os.path.basename(sys.argv[0]), "checksum.py"])
+        ignore_files = [os.path.basename(__file__), sys.argv[0], os.path.basename(sys.argv[0]), "checksum.py"]
 
-        print(f"Hash Type: {self.__hash_type}\n")
+        logger.debug("Hash Type: %s", self.__algorithm)
 
-        if self.skip_file_checkbox.isChecked():
+        # Registry Name of the Chosen Hash Algorithm.
+        algorithm = self.__algorithm
 
+        size_cap_in_mb = None
+        if self.skip_file_checkbox.isChecked():
             # Get Custom File Size
             self.custom_file_size = self.get_file_size(self.combo_box.currentText())
-            if self.blake2_hash_action.isChecked():
+            size_cap_in_mb = self.custom_file_size
 
-                self.checksum_data = [(path, size_cap_checksum_blake2(path,
-                                                                      size_cap_in_mb = self.custom_file_size))
-                                      for path in paths]
-            else:
-                self.checksum_data = [
-                    (
-                        path,
-                        size_cap_checksum(path, hash_type = self.__hash_type(), size_cap_in_mb = self.custom_file_size))
-                    for path in paths]
-        else:
-            if self.blake2_hash_action.isChecked():
-                self.checksum_data = [(path, checksum_blake2(path)) for path in paths]
-            else:
-                self.checksum_data = [(path, checksum(path, hash_type = self.__hash_type())) for path in paths]
+        self.checksum_data = checksum_results()
+        self.algorithm = algorithm_name(algorithm)
+        self.show_checksum_data(self.checksum_data)
+        self.progress_bar.setValue(0)
+        self.hash_started = time.monotonic()
+
+        self.worker = checksum_worker(algorithm = algorithm, ignore_files = ignore_files,
+                                      size_cap_in_mb = size_cap_in_mb, parent = self)
+        self.worker.results.connect(self.add_checksum_data)
+        self.worker.progress.connect(self.show_checksum_progress)
+        self.worker.failed.connect(lambda message: self.status_bar.showMessage(f"Failed: {message}"))
+        self.worker.finished.connect(self.checksum_data_finished)
+
+        self.hash_button.setEnabled(False)
+        self.compare_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.worker.start()
+
+    def cancel_checksum_data(self):
+        """
+        Ask the Background Worker to Stop.
+        :return:
+        """
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.cancel_button.setEnabled(False)
+            self.status_bar.showMessage("Cancelling...")
 
-        self.set_log_file_text(stringify_checksum_data_array(self.checksum_data))
+    def add_checksum_data(self, batch = []):
+        """
+        Add a Batch of Checksum Data from the Background Worker to the Result Table.
+        :param batch: List of Tuples (file_path, hash_code, size).
+        :return:
+        """
+        # The Result Table Reads the Checksum Data of the Run, extending it extends both.
+        self.table_model.extend(batch)
+
+    def show_checksum_progress(self, files_done = 0, total_files = 0, bytes_done = 0, total_bytes = 0):
+        """
+        Show Progress, Throughput and Estimated Time Left of the Background Worker.
+        :return:
+        """
+        self.progress_bar.setValue(int(1000 * bytes_done / total_bytes) if total_bytes else 0)
+
+        elapsed = time.monotonic() - self.hash_started
+        throughput = bytes_done / elapsed if elapsed > 0 else 0.0
+        message = f"{files_done} of {total_files} Files, {throughput / 1024.0 ** 2:.1f} MB/s"
+        if throughput > 0:
+            minutes, seconds = divmod(int((total_bytes - bytes_done) / throughput), 60)
+            message += f", ETA {minutes}:{seconds:02d}"
+        self.status_bar.showMessage(message)
+
+    def checksum_data_finished(self):
+        """
+        Background Worker finished, was Cancelled or Failed.
+        :return:
+        """
+        cancelled = self.worker.isInterruptionRequested()
+        skipped = self.worker.walk_filter.skipped_count
+        self.worker = None
+
+        self.hash_button.setEnabled(True)
+        self.compare_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if cancelled:
+            self.status_bar.showMessage(f"Cancelled after {len(self.checksum_data)} Files.")
+        elif not self.status_bar.currentMessage().startswith("Failed"):
+            self.progress_bar.setValue(self.progress_bar.maximum())
+            message = f"Done, {len(self.checksum_data)} Files"
+            if skipped:
+                message += f", {skipped} Special Files skipped"
+            self.status_bar.showMessage(message + ".")
 
     def compare_hash_button(self):
         """
@@ -278,7 +669,7 @@ class checksum_window(QMainWindow):
         Compare Checksum with Saved Checksum Json
         :return:
         """
-        if self.log_file.toPlainText() == "":
+        if not self.checksum_data:
             self.message = QMessageBox()
             self.message.setWindowTitle("Warning")
             self.message.setText("No Checksum Calculated!")
@@ -287,43 +678,44 @@ class checksum_window(QMainWindow):
             options = QFileDialog.Options()
             options |= QFileDialog.DontUseNativeDialog
             path, _ = QFileDialog.getOpenFileName(self, "Open Checksum File", "",
-                                                  "Json (*.json)", options = options)
+                                                  "Checksum Files (*.json *.jsonl *.cksum);;All Files (*)",
+                                                  options = options)
 
             # If the Path is not Empty String
             if path:
-                # Open the File
-                self.json_file = open(path, mode = "r")
-                # Store Checksum data
-                self.checksum_string = self.json_file.read()
-                self.compare_checksums(self.checksum_data, json.loads(self.checksum_string))
+                self.json_file = path
+                # Read the Checksum File of any Manifest Format as a Stream.
+                self.compare_checksums(self.checksum_data, read_manifest(path))
 
     def compare_checksums(self, checksum_array = [], checksum_dict = {}):
         """
-        Compare the new Computed Hash Values with the Existing Backup to check if any files were altered or newly found.
+        Compare the new Computed Hash Values with the Existing Backup to check if any files were altered, newly found
+        or removed.
         :param checksum_array:
-        :param checksum_dict:
-        :return:
-        """
-        checksum_string = ""
-        file_name = ""
-        for file_path, hash_value in checksum_array:
-            if file_path in checksum_dict.keys():
-                file_name = os.path.basename(file_path)
-                if hash_value.lower() == checksum_dict[file_path].lower():
-                    checksum_string += f"[Match]\n{file_path}\n{file_name} : {hash_value} \n\n"
-                    self.log_file.setText(checksum_string)
-                    print(f"\nChecksum :\n{checksum_string}\n")
-                else:
-                    checksum_string += f"[This is an altered File!]\n{file_path}\n{file_name} : {hash_value} \n\n"
-                    print(f"\nChecksum :\n{checksum_string}\n")
-                    self.log_file.setText(checksum_string)
-            else:
-                file_name = os.path.basename(file_path)
-                checksum_string += f"[This is a new File!]\n{file_path}\n{file_name} : {hash_value} \n\n"
-                print(f"\nChecksum :\n{checksum_string}\n")
-                self.log_file.setText(checksum_string)
-
-        return checksum_string
+        :param checksum_dict: Dictionary {file_path: hash_code}, or Iterable of Tuples or manifest_entry.
+        :return: checksum_diff with the matched, altered, added and removed Files.
+        """
+        # Sizes of the Files, from the Result Table and from Manifest Entries that have them.
+        sizes = {file_path: size for file_path, _, size in self.table_model.results.rows() if size is not None}
+        if not isinstance(checksum_dict, dict):
+            entries = list(checksum_dict)
+            sizes.update((entry.path, entry.size) for entry in entries
+                         if isinstance(entry, manifest_entry) and entry.size is not None and entry.path not in sizes)
+            checksum_dict = dict(entries)
+
+        diff = diff_checksums(checksum_array, checksum_dict)
+
+        # The Table renders only the visible Rows of the Diff, from Columns.
+        results = checksum_results()
+        row_statuses = array("B")
+        for status, file_path, new_hash, old_hash in diff:
+            results.append(file_path, old_hash if status == REMOVED else new_hash, sizes.get(file_path))
+            row_statuses.append(self.table_model.STATUS_CODES[status])
+        sizes.clear()
+        self.table_model.set_results(results, row_statuses, self.algorithm)
+        self.status_bar.showMessage(diff.summary())
+
+        return diff
 
     def open_file_dialog(self):
         """
@@ -336,18 +728,18 @@ class checksum_window(QMainWindow):
 
         # Save Path
         path, _ = QFileDialog.getOpenFileName(self, "Open Checksum File", "",
-                                              "All Files (*);;Json (*.json)", options = options)
+                                              "All Files (*);;Json (*.json);;Json Lines (*.jsonl);;"
+                                              "Binary Checksum (*.cksum)", options = options)
 
         # If the Path is not Empty String
         if path:
-            # Open the File
-            self.json_file = open(path, mode = "r")
-            # Store Checksum data
-            self.checksum_string = self.json_file.read()
-            self.checksum_data = checksum_data_dict_to_array(json.loads(self.checksum_string))
-            self.set_log_file_text(text = stringify_checksum_data_array(self.checksum_data))
+            self.json_file = path
+            # Store Checksum data, read from a Checksum File of any Manifest Format.
+            self.checksum_data = checksum_results(entry for entry in read_manifest(path) if entry.digest is not None)
+            self.algorithm = read_manifest_header(path)["algorithm"]
+            self.show_checksum_data(self.checksum_data)
 
-            print(f"\nChecksum Data :\n{self.checksum_data}")
+            logger.debug("Checksum Data : %s Files from %s", len(self.checksum_data), path)
 
     def save_file_dialog(self):
         """
@@ -360,56 +752,38 @@ class checksum_window(QMainWindow):
 
         # Store the Path
         path, _ = QFileDialog.getSaveFileName(self, "Save Checksum Data", "",
-                                              "All Files (*);;Json Files (*.json)", options = options)
+                                              "All Files (*);;Json Files (*.json);;Json Lines Files (*.jsonl);;"
+                                              "Binary Checksum Files (*.cksum)", options = options)
 
-        # Save the Checksum Data if log_file is not an Empty String.
-        if path and self.log_file != "":
-            write_checksum_to_json(self.checksum_data, path = path)
+        # Save the Checksum Data if there is any.
+        if path and self.checksum_data:
+            if manifest_format(path) == "json":
+                write_checksum_to_json(self.checksum_data, path = path)
+            else:
+                write_manifest(self.checksum_data, path, algorithm = self.algorithm)
         else:
-            print("No Checksum Data to Save")
+            logger.warning("No Checksum Data to Save")
 
-    def set_log_file_text(self, text = ""):
+    def show_checksum_data(self, checksum_data = []):
         """
-        Set Log File Text
-        :param text: Checksum Data as String Format
+        Show Checksum Data in the Result Table.
+        :param checksum_data: checksum_results, which the Table Reads without a Copy, or List of Tuples
+        (file_path, hash_code).
         :return:
         """
-        self.log_file.setFontPointSize(10)
-        self.log_file.setText(text)
+        if not isinstance(checksum_data, checksum_results):
+            checksum_data = checksum_results(checksum_data)
+        self.table_model.set_results(checksum_data, algorithm = self.algorithm)
 
-    def __change_hash_type(self, is_checked = False, hash_type = hashlib.blake2b):
+    def __change_algorithm(self, is_checked = False, algorithm = "blake2"):
         """
         Change Hash Algorithm
         :param is_checked: Checkbox is Checked Value
-        :param hash_type: Hash Algorithm to Use.
+        :param algorithm: Registry Name of the Hash Algorithm to Use, see checksum_algorithms.
         :return:
         """
         if is_checked:
-            self.__hash_type = hash_type
-
-    def __blake2_hash_action(self):
-        """
-        Blake2 Hash Action Event.
-        :return:
-        """
-        if self.blake2_hash_action.isChecked():
-            self.sha3_512_hash_action.setChecked(False)
-            self.__hash_type = hashlib.blake2b
-        else:
-            self.sha3_512_hash_action.setChecked(True)
-            self.__hash_type = hashlib.sha3_512
-
-    def __sha3_512_hash_action(self):
-        """
-        SHA3 512 Hash Action Event.
-        :return:
-        """
-        if self.sha3_512_hash_action.isChecked():
-            self.blake2_hash_action.setChecked(False)
-            self.__hash_type = hashlib.sha3_512
-        else:
-            self.blake2_hash_action.setChecked(True)
-            self.__hash_type = hashlib.blake2b
+            self.__algorithm = algorithm
 
     def choose_file_size_active(self, is_checked = False):
         """
@@ -435,7 +809,7 @@ class checksum_window(QMainWindow):
             else:
                 return float(self.file_size_line_edit.text())
         except ValueError | ArithmeticError:
-            print(f"{ValueError} or {ArithmeticError}")
+            logger.warning("Invalid File Size %r", current_value)
 
     def set_file_size_line_edit_active(self, text = ""):
         """
@@ -460,6 +834,7 @@ class checksum_window(QMainWindow):
 
 
 def window():
+    logging.basicConfig(level = logging.INFO, format = "%(levelname)s %(name)s: %(message)s")
     application = QApplication(sys.argv)
     win = checksum_window()
     win.show()
@@ -0,0 +1,484 @@
+"""
+Checksum Manifest Files.
+
+A Manifest stores the Checksum of every File of a Folder Tree. Three Formats can be Written and Read as a Stream:
+
+1. "json" is the original checksum.json Format, one JSON Object {file_path: hash_code}.
+It is Written as a Stream, but has to be Loaded at once to be Read.
+
+2. "jsonl" is JSON Lines. The first Line is a Header, i.e {"simple_checksum": "jsonl", "version": 1, "algorithm": ...},
+every other Line is one File {"path": ..., "digest": ...}, with optional Fields such as "size", "mtime_ns",
+"fingerprint", "leaves" and "leaf_size".
+
+3. "binary" is a compact Format storing raw Digest Bytes:
+MAGIC, a 4 Byte Little Endian Length and a JSON Header, then one Record per File sorted by Path.
+A Record is a Flags Byte, the Varint Length of the Prefix it shares with the previous Path,
+the Varint Length and UTF-8 Bytes of the rest of the Path, then the Digest Bytes.
+Records with FLAG_STAT add the Varint Size and the ZigZag Varint mtime_ns,
+Records with FLAG_FINGERPRINT the Varint Length and raw Bytes of the sampled Fingerprint and
+Records with FLAG_LEAVES the Varint leaf_size, Leaf Digest Size and Number of Leaves, then the raw Leaf Digests.
+The Records end with an END_OF_RECORDS Byte and the Varint Number of Records.
+
+Headers with a "root" mark a relative Manifest: its Paths are relative to that Folder with "/" Separators, i.e of
+Shards Hashed on Nodes that Mount the Tree at different Points, see checksum_shard.
+
+Files Hashed with several Algorithms at once have a Dictionary {algorithm: hash_code} as Digest.
+JSON Lines stores it as it is, the Binary Format concatenates the raw Digests in the Order of its "algorithms" Header.
+"""
+
+import json
+import os
+import struct
+from itertools import chain
+
+# First Bytes of a Binary Manifest.
+MAGIC = b"SCKSUM\x00\x01"
+
+# Version of the JSON Lines and Binary Formats.
+VERSION = 1
+
+# Key of the JSON Lines Header Line.
+JSONL_HEADER_KEY = "simple_checksum"
+
+# Binary Record Flags.
+FLAG_DIGEST = 0x01
+FLAG_LEAVES = 0x02
+FLAG_STAT = 0x04
+FLAG_FINGERPRINT = 0x08
+
+# Flags Byte that marks the End of the Binary Records.
+END_OF_RECORDS = 0xFF
+
+# Manifest Formats by File Extension.
+FORMAT_EXTENSIONS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".cksum": "binary", ".bin": "binary"}
+
+# Number of Bytes Read at once from a Binary Manifest.
+READ_BUFFER_SIZE = 1024 ** 2
+
+
+class manifest_entry:
+    """
+    One File of a Manifest. Unpacks like the Tuple (file_path, hash_code) used everywhere else.
+    """
+    __slots__ = ("path", "digest", "size", "mtime_ns", "fingerprint", "leaves", "leaf_size")
+
+    def __init__(self, path, digest, size = None, mtime_ns = None, fingerprint = None, leaves = None,
+                 leaf_size = None):
+        """
+        :param path: Path of the File.
+        :param digest: Hexadecimal Checksum, a Dictionary {algorithm: hash_code} or None.
+        :param size: Size of the File in Bytes when it was Hashed.
+        :param mtime_ns: Modification Time of the File in Nanoseconds when it was Hashed.
+        :param fingerprint: Hexadecimal sampled Fingerprint, see checksum.fingerprint.
+        :param leaves: Hexadecimal Leaf Digests of a Merkle Tree Checksum, see checksum_tree.
+        :param leaf_size: Size of a Leaf in Bytes.
+        """
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.fingerprint = fingerprint
+        self.leaves = leaves
+        self.leaf_size = leaf_size
+
+    @classmethod
+    def of(cls, item):
+        """
+        Get a manifest_entry from a manifest_entry or a Tuple (file_path, hash_code).
+        """
+        if isinstance(item, cls):
+            return item
+        path, digest = item
+        return cls(path, digest)
+
+    def fields(self):
+        """
+        Optional Fields that are set.
+        :return: Dictionary {field: value}.
+        """
+        return {field: getattr(self, field) for field in self.__slots__[2:] if getattr(self, field) is not None}
+
+    def __iter__(self):
+        yield self.path
+        yield self.digest
+
+    def __eq__(self, other):
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"manifest_entry({self.path!r}, {self.digest!r})"
+
+
+def manifest_format(path):
+    """
+    Guess the Manifest Format of a Path from its Extension.
+    :param path: Path of the Manifest.
+    :return: "json", "jsonl" or "binary". Unknown Extensions are "json".
+    """
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "json")
+
+
+def write_manifest(checksum_data, path, format = None, algorithm = None, presorted = False, root = None):
+    """
+    Write Checksum Data to a Manifest File as a Stream.
+    :param checksum_data: Iterable of Tuples (file_path, hash_code). hash_code may be a Dictionary
+    {algorithm: hash_code} for Files Hashed with several Algorithms.
+    :param path: Path of the Manifest.
+    :param format: "json", "jsonl" or "binary". Default is guessed from the Extension of path.
+    :param algorithm: Name or List of Names of the Hash Algorithms, stored in the Header of "jsonl" and "binary"
+    Manifests.
+    :param presorted: checksum_data is already sorted by sort_key, so a "binary" Manifest is Written as a Stream
+    instead of being sorted in Memory first.
+    :param root: Folder the Paths are relative to, stored in the Header of "jsonl" and "binary" Manifests.
+    :return: Number of Files Written.
+    """
+    format = format or manifest_format(path)
+    if format == "json":
+        return _write_json(checksum_data, path)
+    if format == "jsonl":
+        return _write_jsonl(checksum_data, path, algorithm, root)
+    if format == "binary":
+        return _write_binary(checksum_data, path, algorithm, presorted, root)
+    raise ValueError(f"Unknown Manifest format {format!r}, use \"json\", \"jsonl\" or \"binary\".")
+
+
+def _write_json(checksum_data, path):
+    """
+    Write the original checksum.json Format one File at a time, as json.dump(..., indent = 4) would.
+    """
+    count = 0
+    with open(path, mode = "w", encoding = "utf-8", errors = "surrogateescape") as file:
+        file.write("{")
+        for file_path, hash_value in checksum_data:
+            file.write(",\n    " if count else "\n    ")
+            # Nested Dictionaries of Digests are Indented one more Level, as json.dump(..., indent = 4) does.
+            hash_text = json.dumps(hash_value, indent = 4).replace("\n", "\n    ")
+            file.write(f"{json.dumps(file_path, ensure_ascii = False)}: {hash_text}")
+            count += 1
+        file.write("\n}" if count else "}")
+    return count
+
+
+def _write_jsonl(checksum_data, path, algorithm, root = None):
+    """
+    Write a JSON Lines Manifest one File per Line.
+    """
+    count = 0
+    with open(path, mode = "w", encoding = "utf-8", errors = "surrogateescape") as file:
+        header = {JSONL_HEADER_KEY: "jsonl", "version": VERSION, "algorithm": algorithm}
+        if root is not None:
+            header["root"] = root
+        file.write(json.dumps(header) + "\n")
+        for item in checksum_data:
+            entry = manifest_entry.of(item)
+            record = {"path": entry.path, "digest": entry.digest}
+            record.update(entry.fields())
+            file.write(json.dumps(record, ensure_ascii = False) + "\n")
+            count += 1
+    return count
+
+
+def _encode_path(file_path):
+    """
+    Encode a Path as Bytes. Undecodable File Names survive through surrogateescape.
+    """
+    return file_path.encode("utf-8", "surrogateescape")
+
+
+def sort_key(item):
+    """
+    Key that Binary Manifests, Shards and Merges sort Entries by: the UTF-8 Bytes of the Path.
+    :param item: manifest_entry or Tuple (file_path, hash_code).
+    :return: Bytes.
+    """
+    return _encode_path(item[0] if isinstance(item, tuple) else item.path)
+
+
+def _varint(value):
+    """
+    Encode a non negative Integer as an unsigned LEB128 Varint.
+    """
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def _digest_bytes(hash_value, algorithms, digest_sizes):
+    """
+    Convert a Hexadecimal Digest, or a Dictionary of Digests in the Order of algorithms, to raw Bytes.
+    The Size of every Algorithm's Digest is Recorded in digest_sizes the first time it is seen.
+    """
+    if hash_value is None:
+        return None
+    if not isinstance(hash_value, dict):
+        return bytes.fromhex(hash_value)
+
+    if not algorithms:
+        algorithms.extend(hash_value)
+    digests = [bytes.fromhex(hash_value[name]) for name in algorithms]
+    if not digest_sizes:
+        digest_sizes.extend(len(digest) for digest in digests)
+    return b"".join(digests)
+
+
+def _zigzag(value):
+    """
+    Map a signed Integer to a non negative one, so it can be Encoded as a Varint.
+    """
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    """
+    Reverse _zigzag.
+    """
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+def _write_binary(checksum_data, path, algorithm, presorted = False, root = None):
+    """
+    Write a Binary Manifest. Records are sorted by Path and share Path Prefixes with the previous Record.
+    The Records are held as compact Bytes while they are sorted, or Streamed if they are presorted.
+    """
+    # Order of the Algorithms whose Digests are Concatenated, for Dictionaries of Digests.
+    algorithms = list(algorithm) if isinstance(algorithm, (list, tuple)) else []
+    digest_sizes = []
+
+    def encode(item):
+        entry = manifest_entry.of(item)
+
+        # Optional Fields are Encoded right away, so only compact Bytes are held while Sorting.
+        flags = FLAG_DIGEST if entry.digest is not None else 0
+        fields = b""
+        if entry.size is not None and entry.mtime_ns is not None:
+            flags |= FLAG_STAT
+            fields += _varint(entry.size) + _varint(_zigzag(entry.mtime_ns))
+        if entry.fingerprint is not None:
+            flags |= FLAG_FINGERPRINT
+            fingerprint = bytes.fromhex(entry.fingerprint)
+            fields += _varint(len(fingerprint)) + fingerprint
+        if entry.leaves is not None:
+            flags |= FLAG_LEAVES
+            leaf_digests = [bytes.fromhex(leaf) for leaf in entry.leaves]
+            fields += _varint(entry.leaf_size) + _varint(len(leaf_digests[0]) if leaf_digests else 0)
+            fields += _varint(len(leaf_digests)) + b"".join(leaf_digests)
+
+        return _encode_path(entry.path), flags, _digest_bytes(entry.digest, algorithms, digest_sizes), fields
+
+    records = map(encode, checksum_data)
+    if not presorted:
+        records = sorted(records, key = lambda record: record[0])
+    records = iter(records)
+
+    # Hold Records until the first Digest, which sets the Digest Size of the Header.
+    held = []
+    for record in records:
+        held.append(record)
+        if record[2] is not None:
+            break
+    digest_size = len(held[-1][2]) if held and held[-1][2] is not None else 0
+
+    header = {"algorithm": algorithm, "digest_size": digest_size, "version": VERSION}
+    if digest_sizes:
+        header.update(algorithms = algorithms, digest_sizes = digest_sizes)
+    if root is not None:
+        header["root"] = root
+    header = json.dumps(header).encode("utf-8")
+
+    with open(path, mode = "wb") as file:
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+
+        count = 0
+        previous_path = b""
+        for encoded_path, flags, digest, fields in chain(held, records):
+            if encoded_path < previous_path:
+                raise ValueError(f"Presorted Checksum Data is not sorted at {encoded_path!r}.")
+
+            # Length of the Prefix shared with the previous Path.
+            shared = 0
+            limit = min(len(previous_path), len(encoded_path))
+            while shared < limit and previous_path[shared] == encoded_path[shared]:
+                shared += 1
+
+            suffix = encoded_path[shared:]
+            file.write(bytes((flags,)))
+            file.write(_varint(shared))
+            file.write(_varint(len(suffix)))
+            file.write(suffix)
+            if digest is not None:
+                if len(digest) != digest_size:
+                    raise ValueError(f"All Digests of a Binary Manifest need {digest_size} Bytes.")
+                file.write(digest)
+            file.write(fields)
+            previous_path = encoded_path
+            count += 1
+
+        file.write(bytes((END_OF_RECORDS,)))
+        file.write(_varint(count))
+    return count
+
+
+class _binary_reader:
+    """
+    Buffered Reader of Bytes and Varints from a Binary Manifest.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = b""
+        self.position = 0
+
+    def read(self, size):
+        if self.position + size > len(self.buffer):
+            self.buffer = self.buffer[self.position:] + self.file.read(max(size, READ_BUFFER_SIZE))
+            self.position = 0
+            if size > len(self.buffer):
+                raise ValueError("Binary Manifest is truncated.")
+        data = self.buffer[self.position:self.position + size]
+        self.position += size
+        return data
+
+    def read_byte(self):
+        return self.read(1)[0]
+
+    def read_varint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+
+def _detect_format(path):
+    """
+    Detect the Format of a Manifest from its Content.
+    :return: "json", "jsonl" or "binary".
+    """
+    with open(path, mode = "rb") as file:
+        if file.read(len(MAGIC)) == MAGIC:
+            return "binary"
+        file.seek(0)
+        first_line = file.readline()
+
+    try:
+        header = json.loads(first_line)
+    except ValueError:
+        return "json"
+    return "jsonl" if isinstance(header, dict) and JSONL_HEADER_KEY in header else "json"
+
+
+def read_manifest_header(path):
+    """
+    Read the Header of a Manifest.
+    :param path: Path of the Manifest.
+    :return: Dictionary with at least the "format" and "algorithm" of the Manifest.
+    """
+    format = _detect_format(path)
+    if format == "json":
+        return {"format": "json", "algorithm": None}
+
+    if format == "jsonl":
+        with open(path, mode = "r", encoding = "utf-8", errors = "surrogateescape") as file:
+            header = json.loads(file.readline())
+        header["format"] = "jsonl"
+        return header
+
+    with open(path, mode = "rb") as file:
+        file.seek(len(MAGIC))
+        header_size, = struct.unpack("<I", file.read(4))
+        header = json.loads(file.read(header_size))
+    header["format"] = "binary"
+    return header
+
+
+def read_manifest(path):
+    """
+    Read a Manifest File of any Format one File at a time.
+    The original checksum.json Format is accepted too, but is Loaded at once.
+    :param path: Path of the Manifest.
+    :return: Generator of manifest_entry, which unpack as Tuples (file_path, hash_code).
+    """
+    format = _detect_format(path)
+
+    if format == "json":
+        with open(path, mode = "r", encoding = "utf-8", errors = "surrogateescape") as file:
+            checksum_dictionary = json.load(file)
+        for file_path, hash_value in checksum_dictionary.items():
+            yield manifest_entry(file_path, hash_value)
+
+    elif format == "jsonl":
+        with open(path, mode = "r", encoding = "utf-8", errors = "surrogateescape") as file:
+            # Skip the Header Line.
+            file.readline()
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    # Fields of newer Versions are Ignored.
+                    fields = {field: value for field, value in record.items() if field in manifest_entry.__slots__}
+                    yield manifest_entry(**fields)
+
+    else:
+        yield from _read_binary(path)
+
+
+def _read_binary(path):
+    """
+    Read the Records of a Binary Manifest.
+    """
+    with open(path, mode = "rb") as file:
+        reader = _binary_reader(file)
+        reader.read(len(MAGIC))
+        header_size, = struct.unpack("<I", reader.read(4))
+        header = json.loads(reader.read(header_size))
+        digest_size = header["digest_size"]
+
+        # Offsets of every Algorithm's Digest in the Record's Digest Bytes, if there are several Algorithms.
+        offsets = []
+        offset = 0
+        for name, size in zip(header.get("algorithms", ()), header.get("digest_sizes", ())):
+            offsets.append((name, offset, offset + size))
+            offset += size
+
+        count = 0
+        previous_path = b""
+        while True:
+            flags = reader.read_byte()
+            if flags == END_OF_RECORDS:
+                break
+
+            shared = reader.read_varint()
+            encoded_path = previous_path[:shared] + reader.read(reader.read_varint())
+            digest = reader.read(digest_size) if flags & FLAG_DIGEST else None
+            if digest is not None:
+                digest = {name: digest[start:end].hex() for name, start, end in offsets} if offsets else digest.hex()
+
+            entry = manifest_entry(encoded_path.decode("utf-8", "surrogateescape"), digest)
+            if flags & FLAG_STAT:
+                entry.size = reader.read_varint()
+                entry.mtime_ns = _unzigzag(reader.read_varint())
+            if flags & FLAG_FINGERPRINT:
+                entry.fingerprint = reader.read(reader.read_varint()).hex()
+            if flags & FLAG_LEAVES:
+                entry.leaf_size = reader.read_varint()
+                leaf_digest_size = reader.read_varint()
+                leaf_digests = reader.read(leaf_digest_size * reader.read_varint())
+                entry.leaves = [leaf_digests[offset:offset + leaf_digest_size].hex()
+                                for offset in range(0, len(leaf_digests), leaf_digest_size)]
+
+            yield entry
+            previous_path = encoded_path
+            count += 1
+
+        if reader.read_varint() != count:
+            raise ValueError("Binary Manifest is corrupted, the Number of Records does not match.")
@@ -0,0 +1,180 @@
+"""
+Compact Checksum Data.
+
+A List of Tuples (file_path, hash_code) costs several hundred Bytes per File: a Tuple, the full Path String and a
+128 Character Hexadecimal String for a 64 Byte BLAKE2b Digest. checksum_results holds the same Data in Columns:
+
+1. Folders are Interned, every File stores the Index of its Folder and its Name as UTF-8 in one shared Buffer.
+2. Digests are stored as raw Bytes in one contiguous Buffer, digest_size Bytes per File.
+Digests that do not fit, such as None, Dictionaries of several Algorithms or upper case Hexadecimal, are kept
+as they are in a small Side Table.
+3. Sizes are an array of Integers, -1 where the Size is unknown.
+
+Iterating yields Tuples (file_path, hash_code) built on the fly, so it can be passed wherever a List of them is
+expected, i.e to checksum.write_checksum_to_json, checksum.compare or checksum_manifest.write_manifest.
+"""
+
+import os
+from array import array
+
+# Path Separators a Folder ends with.
+SEPARATORS = os.sep + (os.altsep or "")
+
+
+class checksum_results:
+    """
+    Column Store of Checksum Data.
+    """
+    __slots__ = ("directories", "_directory_index", "_directory_ids", "_names", "_name_ends", "_digests",
+                 "digest_size", "_other_digests", "sizes")
+
+    def __init__(self, checksum_data = ()):
+        """
+        :param checksum_data: Iterable of Tuples (file_path, hash_code) or (file_path, hash_code, size), or
+        checksum_manifest.manifest_entry.
+        """
+        # Interned Folders with their Separator, and their Index by Folder.
+        self.directories = []
+        self._directory_index = {}
+
+        # Folder Index of every File, and the End Offset of its Name in the Name Buffer.
+        self._directory_ids = array("I")
+        self._names = bytearray()
+        self._name_ends = array("Q")
+
+        # digest_size Bytes per File, set by the first Hexadecimal Digest.
+        self._digests = bytearray()
+        self.digest_size = None
+
+        # Digests that are not stored as raw Bytes, by Index.
+        self._other_digests = {}
+
+        self.sizes = array("q")
+
+        self.extend(checksum_data)
+
+    def __len__(self):
+        return len(self._name_ends)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.path(index), self.digest(index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("checksum_results index out of range")
+        return self.path(index), self.digest(index)
+
+    def __repr__(self):
+        return f"checksum_results({len(self)} Files, {self.nbytes} Bytes)"
+
+    """ ADDING """
+
+    def append(self, file_path, hash_value, size = None):
+        """
+        Add one File.
+        :param file_path: Path of the File.
+        :param hash_value: Hexadecimal Checksum, a Dictionary {algorithm: hash_code} or None.
+        :param size: Size of the File in Bytes, or None.
+        """
+        split = max(file_path.rfind(separator) for separator in SEPARATORS) + 1
+        directory = file_path[:split]
+        directory_id = self._directory_index.get(directory)
+        if directory_id is None:
+            directory_id = self._directory_index[directory] = len(self.directories)
+            self.directories.append(directory)
+
+        index = len(self)
+        self._directory_ids.append(directory_id)
+        self._names += file_path[split:].encode("utf-8", "surrogateescape")
+        self._name_ends.append(len(self._names))
+        self.sizes.append(-1 if size is None else size)
+
+        raw_digest = self.__raw_digest(hash_value)
+        if raw_digest is None:
+            self._other_digests[index] = hash_value
+            raw_digest = bytes(self.digest_size or 0)
+        self._digests += raw_digest
+
+    def __raw_digest(self, hash_value):
+        """
+        Raw Bytes of a Digest that round-trips through bytes.hex, or None.
+        """
+        if not isinstance(hash_value, str) or hash_value != hash_value.lower():
+            return None
+        try:
+            raw_digest = bytes.fromhex(hash_value)
+        except ValueError:
+            return None
+        if self.digest_size is None:
+            self.digest_size = len(raw_digest)
+            # Files added before the first Digest reserve their Bytes now.
+            self._digests = bytearray(self.digest_size * len(self._other_digests))
+        return raw_digest if len(raw_digest) == self.digest_size and raw_digest.hex() == hash_value else None
+
+    def extend(self, checksum_data):
+        """
+        Add many Files.
+        :param checksum_data: Iterable of Tuples (file_path, hash_code) or (file_path, hash_code, size), or
+        checksum_manifest.manifest_entry.
+        :raise ValueError: A Tuple of another Shape, i.e (file_path, hash_code, fingerprint) from
+        checksum.hash_files with fingerprints.
+        """
+        for item in checksum_data:
+            if not isinstance(item, tuple):
+                self.append(item.path, item.digest, item.size)
+            elif len(item) == 2:
+                file_path, hash_value = item
+                self.append(file_path, hash_value)
+            elif len(item) == 3 and (item[2] is None or isinstance(item[2], int)):
+                file_path, hash_value, size = item
+                self.append(file_path, hash_value, size)
+            else:
+                raise ValueError(f"Expected a Tuple (file_path, hash_code) or (file_path, hash_code, size), "
+                                 f"not {item!r}.")
+
+    """ READING """
+
+    def path(self, index):
+        start = self._name_ends[index - 1] if index else 0
+        name = self._names[start:self._name_ends[index]].decode("utf-8", "surrogateescape")
+        return self.directories[self._directory_ids[index]] + name
+
+    def digest(self, index):
+        """
+        :return: Hexadecimal Checksum as it was added.
+        """
+        if index in self._other_digests:
+            return self._other_digests[index]
+        return self.raw_digest(index).hex()
+
+    def raw_digest(self, index):
+        """
+        :return: Digest Bytes, or None if the Digest is not stored as Bytes.
+        """
+        if index in self._other_digests:
+            return None
+        start = index * self.digest_size
+        return bytes(self._digests[start:start + self.digest_size])
+
+    def size(self, index):
+        size = self.sizes[index]
+        return None if size < 0 else size
+
+    def rows(self):
+        """
+        :return: Generator of Tuples (file_path, hash_code, size).
+        """
+        for index in range(len(self)):
+            yield self.path(index), self.digest(index), self.size(index)
+
+    @property
+    def nbytes(self):
+        """
+        Approximate Memory held by the Columns, without the Side Table and the Object Headers.
+        """
+        return (sum(len(directory) for directory in self.directories) + len(self._names) + len(self._digests) +
+                self._directory_ids.itemsize * len(self._directory_ids) +
+                self._name_ends.itemsize * len(self._name_ends) + self.sizes.itemsize * len(self.sizes))
@@ -0,0 +1,281 @@
+"""
+Sharded Manifests.
+
+One Tree can be Hashed by several Workers, Processes on one Machine or Nodes sharing the Storage, that each Hash
+one Shard of the Files into their own Manifest. The Path Space is split deterministically, so every Worker walks
+the whole Tree but only Hashes its own Files, without any Coordination:
+
+1. "hash" puts a File into the Shard blake2b(relative_path) modulo the Number of Shards, which spreads the Files
+evenly.
+2. "subtree" puts every top-level Folder with all its Content into one Shard, so a Worker stays in its Subtrees.
+Few or uneven top-level Folders give uneven Shards.
+
+Paths are Hashed and Written relative to the Root with "/" Separators, so Nodes that Mount the Tree elsewhere agree
+on the Shards and on the Paths of their Entries. Every Shard Manifest records its Root in the Header and is sorted
+by relative Path, and merge_manifests combines them into one sorted Manifest with a heapq.merge of the Streams,
+holding one Entry per Shard in Memory. A Path found in several Shards is an Overlap, with different Digests also a
+Conflict. verify resolves the relative Paths of a merged Manifest against the Root it is given.
+
+    python checksum_cli.py shard /data --shards 4 --index 0 --output shard0.jsonl
+    python checksum_cli.py merge shard0.jsonl shard1.jsonl shard2.jsonl shard3.jsonl --output data.cksum
+    python checksum_cli.py shard /data --shards 4 --output data.cksum
+"""
+
+import hashlib
+import heapq
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+from checksum import DEFAULT_EXCLUDE, hash_entries, walk_files
+from checksum_algorithms import algorithm_name
+from checksum_diff import same_digest
+from checksum_manifest import read_manifest, read_manifest_header, sort_key, write_manifest
+
+logger = logging.getLogger(__name__)
+
+# Ways of splitting the Path Space into Shards.
+STRATEGIES = ("hash", "subtree")
+
+# Number of Entries sorted in Memory before they are spilled into a Run File.
+SORT_RUN_SIZE = 100000
+
+
+class merge_report:
+    """
+    Result of Merging Shard Manifests.
+    """
+    __slots__ = ("files", "overlaps", "conflicts")
+
+    def __init__(self):
+        self.files = 0
+
+        # Paths found in several Shards, with the Indexes of those Shards: Tuples (file_path, [shard, ...]).
+        self.overlaps = []
+
+        # Overlaps whose Digests differ. The Entry of the first Shard with a Digest is kept.
+        self.conflicts = []
+
+    def __str__(self):
+        lines = [f"[Conflict] {file_path} in Shards {', '.join(map(str, shards))}"
+                 for file_path, shards in self.conflicts]
+        lines.append(f"{self.files} Files, {len(self.overlaps)} Overlaps, {len(self.conflicts)} Conflicts")
+        return "\n".join(lines)
+
+
+def relative_path(file_path, root):
+    """
+    Path of a File relative to the Root, with "/" Separators on every Platform.
+    :param file_path: Path of a File in root.
+    :param root: Parent folder the Tree was Walked from.
+    :return: String.
+    """
+    prefix = os.path.join(root, "")
+    relative = file_path[len(prefix):] if file_path.startswith(prefix) else os.path.relpath(file_path, root)
+    return relative.replace(os.sep, "/")
+
+
+def shard_of(relative, shards, strategy = "hash"):
+    """
+    Choose the Shard of a File. The Choice only depends on the relative Path, so every Worker makes the same one.
+    :param relative: Path relative to the Root with "/" Separators, see relative_path.
+    :param shards: Number of Shards.
+    :param strategy: "hash" or "subtree".
+    :return: Index of the Shard, from 0 to shards - 1.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown Shard strategy {strategy!r}, use {' or '.join(map(repr, STRATEGIES))}.")
+    if strategy == "subtree":
+        relative = relative.split("/", 1)[0]
+    digest = hashlib.blake2b(relative.encode("utf-8", "surrogateescape"), digest_size = 8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def shard_entries(entries, root, index, shards, strategy = "hash"):
+    """
+    Keep the Entries of one Shard.
+    :param entries: Iterable of os.DirEntry Objects, i.e from checksum.walk_files(root).
+    :param root: Parent folder the Entries were Walked from.
+    :param index: Index of the Shard to keep.
+    :param shards: Number of Shards.
+    :param strategy: "hash" or "subtree".
+    :return: Generator of os.DirEntry Objects.
+    """
+    if not 0 <= index < shards:
+        raise ValueError(f"Shard index {index} is not within 0 and {shards - 1}.")
+    for entry in entries:
+        if shard_of(relative_path(entry.path, root), shards, strategy) == index:
+            yield entry
+
+
+def sorted_entries(entries, run_size = SORT_RUN_SIZE):
+    """
+    Sort Manifest Entries by Path with bounded Memory.
+    Up to run_size Entries are sorted in Memory, more are spilled as sorted Runs into temporary JSON Lines Files
+    that are merged back.
+    :param entries: Iterable of checksum_manifest.manifest_entry.
+    :param run_size: Number of Entries held in Memory at once.
+    :return: Generator of checksum_manifest.manifest_entry sorted by checksum_manifest.sort_key.
+    """
+    entries = iter(entries)
+    run = sorted(islice(entries, run_size), key = sort_key)
+    if len(run) < run_size:
+        yield from run
+        return
+
+    directory = tempfile.mkdtemp(prefix = "checksum-sort-")
+    try:
+        runs = []
+        while run:
+            run_path = os.path.join(directory, f"run{len(runs)}.jsonl")
+            write_manifest(run, run_path, "jsonl")
+            runs.append(run_path)
+            run = sorted(islice(entries, run_size), key = sort_key)
+        logger.debug("Merging %s sorted Runs of %s Entries", len(runs), run_size)
+        yield from heapq.merge(*map(read_manifest, runs), key = sort_key)
+    finally:
+        shutil.rmtree(directory, ignore_errors = True)
+
+
+def hash_shard(root, index, shards, output, algorithm = "blake2", strategy = "hash", format = None, workers = None,
+               include = None, exclude = DEFAULT_EXCLUDE, exclude_dirs = None, run_size = SORT_RUN_SIZE, **kwargs):
+    """
+    Hash one Shard of a Tree into a Manifest of Paths relative to root, sorted by Path.
+    :param root: Parent folder, the same for every Shard.
+    :param index: Index of the Shard, from 0 to shards - 1.
+    :param shards: Number of Shards.
+    :param output: Path of the Shard Manifest.
+    :param algorithm: "blake2" or any Algorithm Name known to hashlib.new.
+    :param strategy: "hash" or "subtree".
+    :param format: Manifest Format, see checksum_manifest.write_manifest.
+    :param workers: Number of Workers of this Shard, see checksum.hash_files.
+    :param include: Glob or Regex Patterns, only Matching Files are Hashed.
+    :param exclude: Glob or Regex Patterns of Files to Skip. Default Skips Checksum and JSON Files.
+    :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+    :param run_size: Number of Entries sorted in Memory, see sorted_entries.
+    :param kwargs: Additional Arguments for checksum.hash_entries, i.e fingerprints, mode or stats.
+    :return: Number of Files Written.
+    """
+    entries = shard_entries(walk_files(root, include, exclude, exclude_dirs), root, index, shards, strategy)
+    checksum_data = hash_entries(entries, algorithm, workers, **kwargs)
+    count = write_manifest(sorted_entries(_relative_entries(checksum_data, root), run_size), output, format,
+                           algorithm = algorithm_name(algorithm), presorted = True, root = os.path.abspath(root))
+    logger.info("Shard %s of %s: %s Files", index, shards, count)
+    return count
+
+
+def _relative_entries(entries, root):
+    """
+    Pass Manifest Entries on with their Paths relative to root, see relative_path.
+    """
+    for entry in entries:
+        entry.path = relative_path(entry.path, root)
+        yield entry
+
+
+def _checked_order(entries, path, shard):
+    """
+    Pass the Entries of a Manifest on as Tuples (key, shard, entry), checking that they are sorted by Path.
+    """
+    previous = None
+    for entry in entries:
+        key = sort_key(entry)
+        if previous is not None and key < previous:
+            raise ValueError(f"Manifest {path} is not sorted by Path at {entry.path!r}, "
+                             f"Shards need to be sorted before they are merged.")
+        previous = key
+        yield key, shard, entry
+
+
+def merged_entries(manifest_paths, report = None):
+    """
+    Merge sorted Manifests into one sorted Stream, Reporting Paths found in several of them.
+    :param manifest_paths: Paths of Manifests sorted by Path, i.e Written by hash_shard.
+    :param report: Optional merge_report to Count the Files, Overlaps and Conflicts into.
+    :return: Generator of checksum_manifest.manifest_entry, one per Path. Of Overlapping Entries the first with a
+    Digest is kept, Shards that could not Read the File have none.
+    """
+    report = report if report is not None else merge_report()
+    streams = [_checked_order(read_manifest(path), path, shard) for shard, path in enumerate(manifest_paths)]
+
+    for _, group in groupby(heapq.merge(*streams, key = lambda item: item[:2]), key = lambda item: item[0]):
+        _, first_shard, entry = next(group)
+        report.files += 1
+
+        others = list(group)
+        if others:
+            shards = [first_shard] + [shard for _, shard, _ in others]
+            report.overlaps.append((entry.path, shards))
+
+            hashed = [candidate for candidate in [entry] + [other for _, _, other in others]
+                      if candidate.digest is not None]
+            if hashed:
+                entry = hashed[0]
+                if any(not same_digest(other.digest, entry.digest) for other in hashed[1:]):
+                    report.conflicts.append((entry.path, shards))
+        yield entry
+
+
+def merge_manifests(manifest_paths, output, format = None, algorithm = None, root = None):
+    """
+    Merge sorted Shard Manifests into one Manifest sorted by Path, with bounded Memory.
+    Shards of relative Paths are merged on them, whichever Root each Node recorded.
+    :param manifest_paths: Paths of Manifests sorted by Path, i.e Written by hash_shard.
+    :param output: Path of the merged Manifest.
+    :param format: Manifest Format, see checksum_manifest.write_manifest.
+    :param algorithm: Algorithm Name stored in the Header. Default is the Algorithm of the first Shard.
+    :param root: Root stored in the Header of a merged relative Manifest. Default is the Root of the first Shard.
+    :return: merge_report.
+    """
+    algorithms = []
+    roots = []
+    for path in manifest_paths:
+        header = read_manifest_header(path)
+        if header["algorithm"] is not None and header["algorithm"] not in algorithms:
+            algorithms.append(header["algorithm"])
+        roots.append(header.get("root"))
+    if len(algorithms) > 1:
+        raise ValueError(f"Shards were Hashed with different Algorithms: {', '.join(map(str, algorithms))}.")
+    if None in roots and any(shard_root is not None for shard_root in roots):
+        raise ValueError("Shards of relative and of absolute Paths can not be merged.")
+
+    report = merge_report()
+    write_manifest(merged_entries(manifest_paths, report), output, format,
+                   algorithm = algorithm or next(iter(algorithms), None), presorted = True,
+                   root = root or next(iter(roots), None))
+    if report.conflicts:
+        logger.warning("%s Paths have different Digests in several Shards", len(report.conflicts))
+    return report
+
+
+def hash_sharded(root, shards, output, algorithm = "blake2", strategy = "hash", format = None, processes = None,
+                 **kwargs):
+    """
+    Hash a Tree on one Machine with one Process per Shard, then Merge the Shards, as several Nodes would.
+    :param root: Parent folder.
+    :param shards: Number of Shards.
+    :param output: Path of the merged Manifest.
+    :param algorithm: "blake2" or any Algorithm Name known to hashlib.new.
+    :param strategy: "hash" or "subtree".
+    :param format: Manifest Format of the merged Manifest. The Shards are Written as JSON Lines.
+    :param processes: Number of Shards Hashed at once. Default is the Number of Shards.
+    :param kwargs: Additional Arguments for hash_shard, i.e include or exclude.
+    :return: merge_report.
+    """
+    directory = tempfile.mkdtemp(prefix = "checksum-shards-")
+    try:
+        shard_paths = [os.path.join(directory, f"shard{index}.jsonl") for index in range(shards)]
+        # Every Process Hashes its Shard itself, instead of starting a Pool of its own.
+        kwargs.setdefault("workers", 1)
+        with ProcessPoolExecutor(max_workers = processes or shards) as executor:
+            futures = [executor.submit(hash_shard, root, index, shards, shard_path, algorithm, strategy, "jsonl",
+                                       **kwargs)
+                       for index, shard_path in enumerate(shard_paths)]
+            for future in futures:
+                future.result()
+        return merge_manifests(shard_paths, output, format, algorithm_name(algorithm), os.path.abspath(root))
+    finally:
+        shutil.rmtree(directory, ignore_errors = True)
@@ -0,0 +1,243 @@
+"""
+Hashing Instrumentation.
+
+A hash_stats Object passed to checksum.hash_files, hash_tree or hash_tree_entries as stats collects where the Time
+of a Sweep goes: Walking the Tree, opening Files, reading them and updating the Hash, together with the Number of
+Files and Bytes, the Bytes of Holes the "sparse" read_mode did not Read, the slowest Files, the Errors by Type and
+the Files a checksum_filters.file_filter dropped. Workers collect into their own hash_stats per Batch, which is
+merged into the given one, so Threads and Processes never share one.
+
+Without stats nothing is Timed, the Hash Functions only check once per File whether a Collector is active.
+
+    stats = hash_stats()
+    checksum_data = list(hash_tree("/data", "sha256", stats = stats))
+    print(stats)
+    open("metrics.prom", "w").write(stats.to_prometheus())
+"""
+
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases of Hashing a Tree.
+WALK = "walk"
+OPEN = "open"
+READ = "read"
+HASH = "hash"
+PHASES = (WALK, OPEN, READ, HASH)
+
+# Collector of the current Thread, see collect_stats.
+_local = threading.local()
+
+
+class hash_stats:
+    """
+    Timings, Counters and Errors of a Sweep.
+    """
+    __slots__ = ("phase_seconds", "phase_calls", "files", "bytes_read", "bytes_sparse", "errors", "skipped",
+                 "slowest_count", "slowest", "started", "finished")
+
+    def __init__(self, slowest_count = 10):
+        """
+        :param slowest_count: Number of slowest Files to keep.
+        """
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(PHASES, 0)
+        self.files = 0
+        self.bytes_read = 0
+
+        # Bytes of Holes in Sparse Files Hashed as Zeros without being Read.
+        self.bytes_sparse = 0
+
+        # Number of Errors by Exception Type Name.
+        self.errors = {}
+
+        # Number of Files dropped before Hashing by Reason, see checksum_filters.
+        self.skipped = {}
+
+        # Min-Heap of Tuples (seconds, file_path, size) of the slowest Files.
+        self.slowest_count = slowest_count
+        self.slowest = []
+
+        self.started = time.time()
+        self.finished = None
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __str__(self):
+        lines = [f"{self.files} Files, {self.bytes_read} Bytes in {self.elapsed:.3f}s, "
+                 f"{self.files_per_second:.1f} Files/s, {self.bytes_per_second / 1024.0 ** 2:.1f} MB/s"]
+        if self.bytes_sparse:
+            lines.append(f"{self.bytes_sparse} Bytes of Holes not Read")
+        lines.extend(f"{phase}: {self.phase_seconds[phase]:.3f}s in {self.phase_calls[phase]} Calls"
+                     for phase in PHASES)
+        lines.extend(f"Error {name}: {count}" for name, count in sorted(self.errors.items()))
+        lines.extend(f"Skipped {reason}: {count}" for reason, count in sorted(self.skipped.items()))
+        lines.extend(f"Slow {seconds:.3f}s {size} Bytes {file_path}"
+                     for seconds, file_path, size in self.slowest_files)
+        return "\n".join(lines)
+
+    """ COLLECTING """
+
+    def add_phase(self, phase, seconds, calls = 1):
+        self.phase_seconds[phase] += seconds
+        self.phase_calls[phase] += calls
+
+    def add_file(self, file_path, seconds, size):
+        """
+        Count a Hashed File and keep it if it is one of the slowest.
+        """
+        self.files += 1
+        self.__keep_slowest(seconds, file_path, size)
+
+    def __keep_slowest(self, seconds, file_path, size):
+        if self.slowest_count <= 0:
+            return
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, (seconds, file_path, size))
+        elif seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (seconds, file_path, size))
+
+    def add_error(self, exception):
+        name = type(exception).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def add_skip(self, reason):
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def timed(self, iterable, phase = WALK):
+        """
+        Iterate over an Iterable, adding the Time spent getting each Item to a Phase, i.e a lazy Walker.
+        :return: Generator of the Items.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_phase(phase, time.perf_counter() - start, 0)
+                return
+            self.add_phase(phase, time.perf_counter() - start)
+            yield item
+
+    def merge(self, other):
+        """
+        Add the Counters of another hash_stats, i.e of a Worker's Batch.
+        :return: self.
+        """
+        for phase in PHASES:
+            self.add_phase(phase, other.phase_seconds[phase], other.phase_calls[phase])
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        self.bytes_sparse += other.bytes_sparse
+        for name, count in other.errors.items():
+            self.errors[name] = self.errors.get(name, 0) + count
+        for reason, count in other.skipped.items():
+            self.skipped[reason] = self.skipped.get(reason, 0) + count
+        for seconds, file_path, size in other.slowest:
+            self.__keep_slowest(seconds, file_path, size)
+        return self
+
+    def finish(self):
+        """
+        Stop the Clock of the Sweep. Until then the elapsed Time runs on.
+        :return: self.
+        """
+        self.finished = time.time()
+        return self
+
+    """ RESULTS """
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_read / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def slowest_files(self):
+        """
+        :return: List of Tuples (seconds, file_path, size), slowest first.
+        """
+        return sorted(self.slowest, reverse = True)
+
+    def as_dict(self):
+        return {"files": self.files, "bytes_read": self.bytes_read, "bytes_sparse": self.bytes_sparse,
+                "elapsed_seconds": self.elapsed,
+                "files_per_second": self.files_per_second, "bytes_per_second": self.bytes_per_second,
+                "phases": {phase: {"seconds": self.phase_seconds[phase], "calls": self.phase_calls[phase]}
+                           for phase in PHASES},
+                "errors": dict(self.errors), "skipped": dict(self.skipped),
+                "slowest": [{"path": file_path, "seconds": seconds, "size": size}
+                            for seconds, file_path, size in self.slowest_files]}
+
+    def to_json(self, indent = 4):
+        return json.dumps(self.as_dict(), indent = indent)
+
+    def to_prometheus(self, prefix = "simple_checksum"):
+        """
+        Render the Counters in the Prometheus Text Exposition Format.
+        Single Files are left out, a Label per Path would grow without Bound.
+        :param prefix: Prefix of every Metric Name.
+        :return: String.
+        """
+        lines = [f"# HELP {prefix}_phase_seconds_total Seconds spent per Phase.",
+                 f"# TYPE {prefix}_phase_seconds_total counter"]
+        lines.extend(f'{prefix}_phase_seconds_total{{phase="{phase}"}} {self.phase_seconds[phase]}'
+                     for phase in PHASES)
+        lines.extend([f"# HELP {prefix}_phase_calls_total Calls per Phase.",
+                      f"# TYPE {prefix}_phase_calls_total counter"])
+        lines.extend(f'{prefix}_phase_calls_total{{phase="{phase}"}} {self.phase_calls[phase]}' for phase in PHASES)
+        lines.extend([f"# HELP {prefix}_files_total Files Hashed.", f"# TYPE {prefix}_files_total counter",
+                      f"{prefix}_files_total {self.files}",
+                      f"# HELP {prefix}_bytes_read_total Bytes Read.", f"# TYPE {prefix}_bytes_read_total counter",
+                      f"{prefix}_bytes_read_total {self.bytes_read}",
+                      f"# HELP {prefix}_sparse_bytes_total Bytes of Holes Hashed as Zeros without being Read.",
+                      f"# TYPE {prefix}_sparse_bytes_total counter", f"{prefix}_sparse_bytes_total {self.bytes_sparse}",
+                      f"# HELP {prefix}_errors_total Errors by Type.", f"# TYPE {prefix}_errors_total counter"])
+        lines.extend(f'{prefix}_errors_total{{type="{name}"}} {count}' for name, count in sorted(self.errors.items()))
+        lines.extend([f"# HELP {prefix}_skipped_total Files dropped before Hashing by Reason.",
+                      f"# TYPE {prefix}_skipped_total counter"])
+        lines.extend(f'{prefix}_skipped_total{{reason="{reason}"}} {count}'
+                     for reason, count in sorted(self.skipped.items()))
+        lines.extend([f"# HELP {prefix}_elapsed_seconds Duration of the Sweep.",
+                      f"# TYPE {prefix}_elapsed_seconds gauge", f"{prefix}_elapsed_seconds {self.elapsed}",
+                      f"# HELP {prefix}_files_per_second Files Hashed per Second.",
+                      f"# TYPE {prefix}_files_per_second gauge", f"{prefix}_files_per_second {self.files_per_second}"])
+        return "\n".join(lines) + "\n"
+
+
+def active_stats():
+    """
+    Collector of the current Thread.
+    :return: hash_stats or None.
+    """
+    return getattr(_local, "stats", None)
+
+
+@contextmanager
+def collect_stats(stats):
+    """
+    Let the Hash Functions called in this Thread collect into stats, i.e checksum.checksum called directly.
+    :param stats: hash_stats, or None to collect nothing.
+    """
+    previous = active_stats()
+    _local.stats = stats
+    try:
+        yield stats
+    finally:
+        _local.stats = previous
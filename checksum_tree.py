@@ -0,0 +1,188 @@
+"""
+Merkle Tree Hashing of large Files.
+
+A File is split into Leaves of leaf_size Bytes that are Hashed in Parallel on a Thread Pool.
+The Leaf Digests are combined into one Root Digest, and kept, so a later Verification can tell which Byte Ranges
+changed and can re-check single Ranges on their own.
+
+Scheme, with H the chosen Hash Algorithm:
+
+1. Leaf Digest = H(0x00 + Leaf Bytes). An empty File has one empty Leaf.
+2. Node Digest = H(0x01 + Left Child Digest + Right Child Digest).
+3. A Node without a Right Sibling is moved up to the next Level unchanged.
+4. The Root Digest is the one Node left at the Top Level.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from checksum import new_hash
+from checksum_manifest import manifest_entry
+
+logger = logging.getLogger(__name__)
+
+# Default Size of a Leaf in Bytes.
+DEFAULT_LEAF_SIZE = 4 * 1024 ** 2
+
+# Prefixes that keep Leaf and Node Digests apart.
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def _read_at(file, size, offset):
+    """
+    Read size Bytes at offset without moving a shared File Position, so Threads can Read the same File.
+    """
+    if hasattr(os, "pread"):
+        return os.pread(file.fileno(), size, offset)
+
+    # Operating Systems without pread get their own File Object per Read.
+    with open(file.name, "rb") as own_file:
+        own_file.seek(offset)
+        return own_file.read(size)
+
+
+def _leaf_digest(file, algorithm, leaf_size, index):
+    """
+    Hash one Leaf of an open File.
+    """
+    hash_type = new_hash(algorithm)
+    hash_type.update(LEAF_PREFIX)
+    hash_type.update(_read_at(file, leaf_size, index * leaf_size))
+    return hash_type.digest()
+
+
+def leaf_count(size, leaf_size = DEFAULT_LEAF_SIZE):
+    """
+    Number of Leaves of a File.
+    :param size: Size of the File in Bytes.
+    :param leaf_size: Size of a Leaf in Bytes.
+    :return: Number of Leaves, at least 1.
+    """
+    return max(1, -(-size // leaf_size))
+
+
+def leaf_checksums(file_path, algorithm = "sha256", leaf_size = DEFAULT_LEAF_SIZE, workers = None, indexes = None):
+    """
+    Hash the Leaves of a File in Parallel.
+    :param file_path: Path of the File.
+    :param algorithm: Algorithm Name, see checksum.new_hash.
+    :param leaf_size: Size of a Leaf in Bytes.
+    :param workers: Number of Threads. Default is min(32, CPUs + 4).
+    :param indexes: Indexes of the Leaves to Hash. Default is every Leaf.
+    :return: List of raw Leaf Digests, in the Order of indexes.
+    """
+    with open(file_path, "rb", buffering = 0) as file:
+        if indexes is None:
+            indexes = range(leaf_count(os.fstat(file.fileno()).st_size, leaf_size))
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            return list(executor.map(lambda index: _leaf_digest(file, algorithm, leaf_size, index), indexes))
+
+
+def merkle_root(leaves, algorithm = "sha256"):
+    """
+    Combine raw Leaf Digests into the Root Digest.
+    :param leaves: List of raw Leaf Digests.
+    :param algorithm: Algorithm Name, see checksum.new_hash.
+    :return: Raw Root Digest.
+    """
+    level = list(leaves)
+    while len(level) > 1:
+        next_level = []
+        for index in range(0, len(level) - 1, 2):
+            hash_type = new_hash(algorithm)
+            hash_type.update(NODE_PREFIX + level[index] + level[index + 1])
+            next_level.append(hash_type.digest())
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def tree_checksum(file_path, algorithm = "sha256", leaf_size = DEFAULT_LEAF_SIZE, workers = None):
+    """
+    Compute the Merkle Tree Checksum of a File.
+    :param file_path: Path of the File.
+    :param algorithm: Algorithm Name, see checksum.new_hash.
+    :param leaf_size: Size of a Leaf in Bytes.
+    :param workers: Number of Threads Hashing Leaves.
+    :return: Tuple (root_hash_code, [leaf_hash_code, ...]) of Hexadecimal Digests.
+    """
+    leaves = leaf_checksums(file_path, algorithm, leaf_size, workers)
+    return merkle_root(leaves, algorithm).hex(), [leaf.hex() for leaf in leaves]
+
+
+def _leaf_ranges(indexes, leaf_size, size):
+    """
+    Merge the Indexes of adjacent Leaves into Byte Ranges (start, end), end excluded.
+    """
+    ranges = []
+    for index in sorted(indexes):
+        start, end = index * leaf_size, min((index + 1) * leaf_size, size)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def changed_ranges(file_path, leaves, algorithm = "sha256", leaf_size = DEFAULT_LEAF_SIZE, workers = None,
+                   start = 0, end = None):
+    """
+    Find the Byte Ranges of a File that changed since its Leaves were Hashed.
+    Only the Leaves overlapping [start, end) are Read, so single Ranges can be re-checked on their own.
+    :param file_path: Path of the File.
+    :param leaves: Hexadecimal Leaf Digests stored for the File.
+    :param algorithm: Algorithm Name the Leaves were Hashed with.
+    :param leaf_size: Size of a Leaf in Bytes the Leaves were Hashed with.
+    :param workers: Number of Threads Hashing Leaves.
+    :param start: First Byte to Check.
+    :param end: Byte after the last Byte to Check. Default is the End of the File.
+    :return: List of changed Byte Ranges (start, end), end excluded. Growth or Shrinkage of the File is a changed
+    Range as well.
+    """
+    size = os.stat(file_path).st_size
+    current_count = leaf_count(size, leaf_size)
+    common_count = min(current_count, len(leaves))
+    first_leaf = start // leaf_size
+    end_leaf = max(current_count, len(leaves)) if end is None else leaf_count(end, leaf_size)
+
+    indexes = range(first_leaf, min(common_count, end_leaf))
+    current = leaf_checksums(file_path, algorithm, leaf_size, workers, indexes)
+    changed = [index for index, leaf in zip(indexes, current) if leaf.hex() != leaves[index].lower()]
+
+    # Leaves only one Side has, because the File grew or shrank.
+    changed.extend(range(max(common_count, first_leaf), min(max(current_count, len(leaves)), end_leaf)))
+
+    return _leaf_ranges(changed, leaf_size, max(size, len(leaves) * leaf_size))
+
+
+def merkle_entries(paths, algorithm = "sha256", leaf_size = DEFAULT_LEAF_SIZE, workers = None):
+    """
+    Compute the Merkle Tree Checksum of many Files, ready to be Written to a Manifest.
+    :param paths: Iterable of File Paths or os.DirEntry Objects, i.e from checksum.walk_files.
+    :param algorithm: Algorithm Name, see checksum.new_hash.
+    :param leaf_size: Size of a Leaf in Bytes.
+    :param workers: Number of Threads Hashing the Leaves of a File.
+    :return: Generator of manifest_entry with the Root Digest as digest, and its leaves and leaf_size.
+    """
+    for path in map(os.fspath, paths):
+        try:
+            root, leaves = tree_checksum(path, algorithm, leaf_size, workers)
+        except OSError as exception:
+            logger.warning("%s", exception)
+            yield manifest_entry(path, None)
+        else:
+            yield manifest_entry(path, root, leaves = leaves, leaf_size = leaf_size)
+
+
+def verify_entry(entry, algorithm = "sha256", workers = None):
+    """
+    Verify a File against its Manifest Entry with Leaves.
+    :param entry: manifest_entry with leaves and leaf_size.
+    :param algorithm: Algorithm Name the Leaves were Hashed with.
+    :param workers: Number of Threads Hashing Leaves.
+    :return: List of changed Byte Ranges (start, end). Empty if the File is unchanged.
+    """
+    return changed_ranges(entry.path, entry.leaves, algorithm, entry.leaf_size, workers)
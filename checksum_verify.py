@@ -0,0 +1,277 @@
+"""
+Verification of a Folder Tree against a Checksum Manifest.
+
+verify Hashes every File of a Manifest again and Compares the Digests. The stored Size and Modification Time are
+Checked first, before any File is Read: a missing File or a changed Size proves a Change without Hashing, and Files
+whose Modification Time changed are Hashed before the others. With fail_fast a Verification stops at the first
+altered or removed File, so a broken Tree is Rejected in the Time of a few stat Calls.
+
+Relative Manifests, whose Header records a "root" such as merged Shards, are resolved against the root given to
+verify, or against the recorded one, see manifest_entries.
+
+quick_verify is a cheap Drift Check: a File is only Hashed in full when its stat Data or its sampled Fingerprint
+disagree with the Manifest. Files whose Size, Modification Time and Fingerprint match are trusted.
+
+Entries with Leaves, whose Digest is a Merkle Tree Root, are Checked Leaf by Leaf with checksum_tree instead of
+being Hashed whole, and the changed Byte Ranges of altered ones are added to the Diff.
+"""
+
+import logging
+import os
+
+from checksum import DEFAULT_EXCLUDE, fingerprint_files, hash_files, walk_files
+from checksum_diff import checksum_diff, same_digest
+from checksum_manifest import read_manifest, read_manifest_header
+from checksum_tree import verify_entry
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_entries(manifest_path, root = None):
+    """
+    Read the Entries of a Manifest with the Paths of their Files.
+    Paths of a relative Manifest are joined to root, or to the root its Header records if root is None.
+    :param manifest_path: Path of a Manifest of any Format.
+    :param root: Optional Parent folder the Tree is Mounted at.
+    :return: Generator of checksum_manifest.manifest_entry.
+    """
+    manifest_root = read_manifest_header(manifest_path).get("root")
+    if manifest_root is None:
+        yield from read_manifest(manifest_path)
+        return
+
+    base = root or manifest_root
+    for entry in read_manifest(manifest_path):
+        entry.path = os.path.join(base, *entry.path.split("/"))
+        yield entry
+
+
+def stat_matches(entry, file_stat):
+    """
+    Check if a File still has the Size and Modification Time its Manifest Entry recorded.
+    :param entry: checksum_manifest.manifest_entry.
+    :param file_stat: Current os.stat_result of the File.
+    :return: True, False, or None if the Entry has no stat Data.
+    """
+    if entry.size is None or entry.mtime_ns is None:
+        return None
+    return entry.size == file_stat.st_size and entry.mtime_ns == file_stat.st_mtime_ns
+
+
+def _check_stat(diff, entry):
+    """
+    Check a Manifest Entry against the stat Data of its File, without Reading it.
+    A missing File is added to the Diff as removed, a File of another Size as altered without a new Hash Value,
+    unless the Entry has Leaves that tell which Ranges changed.
+    :param diff: checksum_diff to add to.
+    :param entry: checksum_manifest.manifest_entry.
+    :return: Current os.stat_result of the File, or None if the Entry was Decided and added to the Diff.
+    """
+    try:
+        file_stat = os.stat(entry.path)
+    except FileNotFoundError:
+        diff.removed.append((entry.path, None, entry.digest))
+        return None
+    except OSError:
+        diff.skipped.append((entry.path, None, entry.digest))
+        return None
+
+    if entry.digest is None:
+        diff.skipped.append((entry.path, None, None))
+        return None
+    if entry.size is not None and entry.size != file_stat.st_size and entry.leaves is None:
+        diff.altered.append((entry.path, None, entry.digest))
+        return None
+    return file_stat
+
+
+def quick_verify(manifest_path, root = None, algorithm = None, workers = None, mode = "thread",
+                 exclude = DEFAULT_EXCLUDE, fail_fast = False):
+    """
+    Verify the Files of a Manifest, Hashing a File in full only if its stat Data or Fingerprint disagree.
+    Files of another Size than the Manifest recorded are altered without being Hashed. Files with Leaves are Checked
+    Leaf by Leaf instead, see _compare_trees.
+    :param manifest_path: Path of a Manifest of any Format.
+    :param root: Optional Parent folder. Files in it that the Manifest does not know are Reported as added.
+    The Paths of a relative Manifest are resolved against it.
+    :param algorithm: Algorithm of the full Hashes. Default is the Algorithm in the Manifest Header, or "blake2".
+    :param workers: Number of Workers Fingerprinting and Hashing the Files, see checksum.hash_files.
+    :param mode: "thread" or "process" Pool Fingerprinting and Hashing the Files.
+    :param exclude: Glob or "re:" Regex Patterns of Files in root that are not Reported as added, see
+    checksum.compile_patterns.
+    :param fail_fast: Stop at the first altered or removed File. The Diff then only holds the Files Checked so far.
+    :return: Tuple (checksum_diff, escalated) with the Paths of the Files that were Hashed in full or Checked Leaf
+    by Leaf. Added Files and altered Files with Leaves have no new Hash Value.
+    """
+    algorithm = algorithm or read_manifest_header(manifest_path)["algorithm"] or "blake2"
+
+    diff = checksum_diff()
+    known_paths = set()
+
+    # Stored Digest of every File whose stat Data or Fingerprint disagree, by Path.
+    escalated = {}
+
+    # Entries with Leaves not yet trusted, by Path.
+    trees = {}
+
+    # Stored Digest and Fingerprint of every File whose Fingerprint is Checked on the Pool, by Path.
+    sampled = {}
+
+    def stat_checked():
+        """
+        Check the stat Data of every Entry and yield the Paths of the Files whose Fingerprint decides.
+        """
+        for entry in manifest_entries(manifest_path, root):
+            known_paths.add(entry.path)
+            file_stat = _check_stat(diff, entry)
+            if file_stat is None:
+                if fail_fast and diff.has_changes:
+                    return
+                continue
+
+            trusted = stat_matches(entry, file_stat)
+            if trusted is None:
+                trusted = entry.fingerprint is not None
+            if trusted and entry.fingerprint is not None:
+                sampled[entry.path] = (entry.digest, entry.fingerprint.lower())
+            elif trusted:
+                diff.matched.append((entry.path, entry.digest, entry.digest))
+                continue
+            else:
+                escalated[entry.path] = entry.digest
+
+            if entry.leaves is not None:
+                trees[entry.path] = entry
+            if entry.path in sampled:
+                yield entry.path
+
+    for path, file_fingerprint in fingerprint_files(stat_checked(), workers, mode = mode):
+        digest, stored_fingerprint = sampled.pop(path)
+        if file_fingerprint == stored_fingerprint:
+            diff.matched.append((path, digest, digest))
+            trees.pop(path, None)
+        else:
+            escalated[path] = digest
+    if fail_fast and diff.has_changes:
+        return diff, list(escalated)
+
+    stored = {path: digest for path, digest in escalated.items() if path not in trees}
+    complete = (_compare_hashes(diff, hash_files(list(stored), algorithm, workers, mode = mode), stored, fail_fast)
+                and _compare_trees(diff, trees.values(), algorithm, workers, fail_fast))
+    if complete and root is not None:
+        _add_unknown_files(diff, root, known_paths, exclude)
+
+    return diff, list(escalated)
+
+
+def _compare_hashes(diff, checksum_data, stored, fail_fast = False):
+    """
+    Sort new Hashes into a Diff by the Digests stored for them.
+    :param diff: checksum_diff to add to.
+    :param checksum_data: Generator of Tuples (file_path, hash_code), i.e from checksum.hash_files.
+    :param stored: Dictionary {file_path: hash_code} of the Manifest.
+    :param fail_fast: Stop at the first altered File and close checksum_data, which Cancels the pending Files.
+    :return: True if every File was Compared, False if fail_fast stopped early.
+    """
+    for path, hash_value in checksum_data:
+        old_hash = stored[path]
+        if hash_value is None:
+            diff.skipped.append((path, None, old_hash))
+        elif same_digest(hash_value, old_hash):
+            diff.matched.append((path, hash_value, old_hash))
+        else:
+            diff.altered.append((path, hash_value, old_hash))
+            if fail_fast:
+                checksum_data.close()
+                return False
+    return True
+
+
+def _compare_trees(diff, entries, algorithm, workers = None, fail_fast = False):
+    """
+    Check Files Leaf by Leaf against their Manifest Entries, adding the changed Byte Ranges of altered Files to
+    diff.ranges. Altered Files get no new Hash Value.
+    :param diff: checksum_diff to add to.
+    :param entries: Iterable of checksum_manifest.manifest_entry with leaves and leaf_size.
+    :param algorithm: Algorithm Name the Leaves were Hashed with.
+    :param workers: Number of Threads Hashing the Leaves of a File.
+    :param fail_fast: Stop at the first altered File.
+    :return: True if every File was Compared, False if fail_fast stopped early.
+    """
+    for entry in entries:
+        try:
+            ranges = verify_entry(entry, algorithm, workers)
+        except OSError as exception:
+            logger.warning("%s", exception)
+            diff.skipped.append((entry.path, None, entry.digest))
+            continue
+
+        if not ranges:
+            diff.matched.append((entry.path, entry.digest, entry.digest))
+            continue
+        diff.altered.append((entry.path, None, entry.digest))
+        diff.ranges[entry.path] = ranges
+        if fail_fast:
+            return False
+    return True
+
+
+def _add_unknown_files(diff, root, known_paths, exclude):
+    """
+    Report the Files in root that the Manifest does not know as added, without a Hash Value.
+    """
+    for entry in walk_files(root, exclude = exclude):
+        if entry.path not in known_paths:
+            diff.added.append((entry.path, None, None))
+
+
+def verify(manifest_path, root = None, algorithm = None, workers = None, mode = "process",
+           exclude = DEFAULT_EXCLUDE, fail_fast = False):
+    """
+    Verify the Files of a Manifest by Hashing every one of them again, after a stat Pass over all of them.
+    Missing Files are removed and Files of another Size altered without being Hashed. Files with Leaves are Checked
+    Leaf by Leaf instead, see _compare_trees.
+    :param manifest_path: Path of a Manifest of any Format.
+    :param root: Optional Parent folder. Files in it that the Manifest does not know are Reported as added.
+    The Paths of a relative Manifest are resolved against it.
+    :param algorithm: Algorithm of the Hashes. Default is the Algorithm in the Manifest Header, or "blake2".
+    :param workers: Number of Workers, see checksum.hash_files.
+    :param mode: "process" or "thread" Pool.
+    :param exclude: Glob or "re:" Regex Patterns of Files in root that are not Reported as added, see
+    checksum.compile_patterns.
+    :param fail_fast: Stop at the first altered or removed File. The Diff then only holds the Files Checked so far.
+    :return: checksum_diff. Added Files, Files altered by Size and altered Files with Leaves have no new Hash Value.
+    """
+    algorithm = algorithm or read_manifest_header(manifest_path)["algorithm"] or "blake2"
+
+    diff = checksum_diff()
+    known_paths = set()
+
+    # Stored Digest of every File to Hash, by Path, of Files whose Modification Time changed and of the others.
+    touched = {}
+    untouched = {}
+
+    # Entries with Leaves, Checked after the others.
+    trees = []
+
+    for entry in manifest_entries(manifest_path, root):
+        known_paths.add(entry.path)
+        file_stat = _check_stat(diff, entry)
+        if file_stat is None:
+            if fail_fast and diff.has_changes:
+                return diff
+        elif entry.leaves is not None:
+            trees.append(entry)
+        elif stat_matches(entry, file_stat):
+            untouched[entry.path] = entry.digest
+        else:
+            touched[entry.path] = entry.digest
+
+    # Hash the likely Changes first, so fail_fast stops sooner.
+    stored = {**touched, **untouched}
+    complete = (_compare_hashes(diff, hash_files(list(stored), algorithm, workers, mode = mode), stored, fail_fast)
+                and _compare_trees(diff, trees, algorithm, workers, fail_fast))
+    if complete and root is not None:
+        _add_unknown_files(diff, root, known_paths, exclude)
+
+    return diff
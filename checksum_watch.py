@@ -0,0 +1,470 @@
+"""
+Continuous Integrity Monitoring.
+
+A tree_watcher keeps the Manifest of a Folder Tree current between full Sweeps. On Linux it listens to inotify,
+elsewhere, or when the inotify Watch Limit is reached, it polls the stat Data of the Tree:
+
+1. Only Files that were closed after Writing, or moved into the Tree, are Hashed again. Deleted Files are removed.
+2. Events are coalesced per Path and debounced: a File is Hashed once it was quiet for debounce Seconds, so a
+Burst of Writes costs one Hash. A polled File has to keep its Size and Modification Time for that long.
+3. Altered, added, removed and skipped Files are yielded as they are Decided, as Tuples
+(status, file_path, new_hash_code, old_hash_code) like checksum_diff yields them.
+4. The Manifest is kept in Memory and Saved to Disk every save_interval Seconds while it changed, and on Exit.
+At most max_pending Paths wait for their Debounce. Beyond that, and when the Kernel Queue overflows, the Tree is
+Rescanned by its stat Data once the pending Paths are Hashed.
+
+    for status, file_path, new_hash, old_hash in tree_watcher("/data", "/var/lib/checksum/data.jsonl"):
+        print(LABELS[status], file_path)
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import stat
+import struct
+import threading
+import time
+
+from checksum import DEFAULT_EXCLUDE, _matches, compile_patterns, hash_files, hash_tree_entries
+from checksum_algorithms import algorithm_name
+from checksum_diff import ADDED, ALTERED, REMOVED, SKIPPED, same_digest
+from checksum_manifest import manifest_entry, manifest_format, read_manifest, read_manifest_header, write_manifest
+
+logger = logging.getLogger(__name__)
+
+# Watch Backends.
+BACKENDS = ("auto", "inotify", "poll")
+
+""" INOTIFY """
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Events of every watched Folder. IN_MODIFY is left out, a File is only Hashed once it is closed.
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF |
+              IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+# struct inotify_event without its Name: wd, mask, cookie, len.
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# Number of Bytes Read from the inotify Descriptor at once.
+INOTIFY_READ_SIZE = 64 * 1024
+
+# stat_key of a polled Path that is gone.
+MISSING = ()
+
+# Longest Wait in Seconds before the Watcher checks whether it was stopped.
+STOP_CHECK_INTERVAL = 1.0
+
+
+class _inotify:
+    """
+    Minimal ctypes Binding of the Linux inotify API.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno = True)
+        # Raises AttributeError where the C Library has no inotify.
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path, mask = WATCH_MASK):
+        """
+        :return: Watch Descriptor of the Folder. Adding a watched Folder again returns its Descriptor.
+        """
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd):
+        # The Kernel removes the Watches of deleted Folders itself.
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """
+        Read the queued Events without Blocking.
+        :return: List of Tuples (wd, mask, name).
+        """
+        try:
+            data = os.read(self.fd, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, name_size = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + name_size].rstrip(b"\0"))
+            offset += name_size
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class tree_watcher:
+    """
+    Watch a Folder Tree and keep its Manifest current. Iterating a tree_watcher runs it until stop is called.
+    """
+
+    def __init__(self, root, manifest_path = None, algorithm = None, backend = "auto", debounce = 1.0,
+                 poll_interval = 10.0, save_interval = 60.0, max_pending = 100000, workers = None,
+                 fingerprints = True, include = None, exclude = DEFAULT_EXCLUDE, exclude_dirs = None):
+        """
+        :param root: Parent folder to Watch.
+        :param manifest_path: Manifest Loaded at the Start and kept current. Without it the Tree is Hashed first.
+        Drift since the Manifest was Written is Reported at the Start.
+        :param algorithm: Algorithm Name. Default is the Algorithm in the Manifest Header, or "blake2".
+        :param backend: "inotify", "poll", or "auto" for inotify where it is available.
+        :param debounce: Seconds a File has to be quiet before it is Hashed.
+        :param poll_interval: Seconds between two Scans of the stat Data with the "poll" Backend.
+        :param save_interval: Least Seconds between two Saves of the Manifest.
+        :param max_pending: Most Paths waiting for their Debounce. Beyond it the Tree is Rescanned instead.
+        :param workers: Number of Threads Hashing due Files, see checksum.hash_files.
+        :param fingerprints: Store a sampled Fingerprint of every File, for checksum_verify.quick_verify.
+        :param include: Glob or Regex Patterns, only Matching Files are Watched.
+        :param exclude: Glob or Regex Patterns of Files to Skip. Default Skips Checksum and JSON Files.
+        :param exclude_dirs: Glob or Regex Patterns of Folders to Skip.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, use {' or '.join(map(repr, BACKENDS))}.")
+        if manifest_path is not None and algorithm is None and os.path.exists(manifest_path):
+            algorithm = read_manifest_header(manifest_path)["algorithm"]
+
+        self.root = root
+        self.manifest_path = manifest_path
+        self.algorithm = algorithm or "blake2"
+        self.backend = backend
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.save_interval = save_interval
+        self.max_pending = max_pending
+        self.workers = workers
+        self.fingerprints = fingerprints
+        self.include = compile_patterns(include)
+        self.exclude = compile_patterns(exclude)
+        self.exclude_dirs = compile_patterns(exclude_dirs)
+        self.walk_patterns = {"include": include, "exclude": exclude, "exclude_dirs": exclude_dirs}
+
+        # Manifest in Memory: manifest_entry by Path.
+        self.entries = {}
+
+        # Paths waiting for their Debounce: Tuples (deadline, stat_key) by Path, in the Order of their Deadlines.
+        self.pending = {}
+        self.rescan_needed = False
+
+        # Watched Folders: Tuples (directory, relative_directory) by Watch Descriptor.
+        self.watches = {}
+        self._inotify = None
+
+        self.changed = False
+        self.saved_at = time.monotonic()
+        self._stopped = threading.Event()
+
+        # The Manifest and its temporary File may lie in the Tree, their own Events are Ignored.
+        self._own_files = set()
+        if manifest_path is not None:
+            self._own_files = {os.path.abspath(manifest_path), os.path.abspath(manifest_path + ".tmp")}
+
+    def __iter__(self):
+        return self.events()
+
+    def stop(self):
+        """
+        Stop the Watcher from another Thread. It Saves the Manifest and returns within STOP_CHECK_INTERVAL.
+        """
+        self._stopped.set()
+
+    """ WATCHING """
+
+    def events(self):
+        """
+        Run the Watcher until stop is called or the Generator is closed.
+        :return: Generator of Tuples (status, file_path, new_hash_code, old_hash_code).
+        """
+        self._stopped.clear()
+        if self.backend != "poll":
+            self._open_inotify()
+        try:
+            yield from self._load()
+            next_poll = time.monotonic() + self.poll_interval
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                deadlines = [now + STOP_CHECK_INTERVAL, self.saved_at + self.save_interval]
+                if self.pending:
+                    deadlines.append(next(iter(self.pending.values()))[0])
+                if self._inotify is None:
+                    deadlines.append(next_poll)
+                timeout = max(0.0, min(deadlines) - now)
+
+                if self._inotify is not None:
+                    readable, _, _ = select.select([self._inotify.fd], [], [], timeout)
+                    if readable:
+                        for wd, mask, name in self._inotify.read_events():
+                            self._on_event(wd, mask, name)
+                else:
+                    self._stopped.wait(timeout)
+                    if time.monotonic() >= next_poll:
+                        self.rescan_needed = True
+                        next_poll = time.monotonic() + self.poll_interval
+
+                yield from self._hash_due()
+                if self.rescan_needed and len(self.pending) < self.max_pending:
+                    self.rescan_needed = False
+                    self._rescan()
+                if self.changed and time.monotonic() >= self.saved_at + self.save_interval:
+                    self.save()
+        finally:
+            self.save()
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+                self.watches.clear()
+
+    def _open_inotify(self):
+        """
+        Start inotify, or fall back to Polling where it is missing or its Watch Limit is reached.
+        """
+        try:
+            self._inotify = _inotify()
+            for _ in self._scan(self.root, "", watch = True):
+                pass
+            logger.info("Watching %s Folders with inotify", len(self.watches))
+        except (AttributeError, OSError) as exception:
+            if self.backend == "inotify":
+                raise
+            logger.warning("inotify is not available, polling every %ss instead: %s", self.poll_interval, exception)
+            if self._inotify is not None:
+                self._inotify.close()
+            self._inotify = None
+            self.watches.clear()
+
+    def _load(self):
+        """
+        Load the Manifest and Report the Drift since it was Written, or Hash the Tree if there is none.
+        """
+        if self.manifest_path is not None and os.path.exists(self.manifest_path):
+            self.entries = {entry.path: entry for entry in read_manifest(self.manifest_path)}
+            logger.info("Loaded %s Files from %s", len(self.entries), self.manifest_path)
+            self._rescan(delay = 0.0)
+            yield from self._hash_due()
+            return
+
+        entries = hash_tree_entries(self.root, self.algorithm, None, self.fingerprints, **self.walk_patterns)
+        self.entries = {entry.path: entry for entry in entries if entry.digest is not None}
+        logger.info("Hashed %s Files of %s", len(self.entries), self.root)
+        self.changed = True
+        self.save()
+
+    def _scan(self, directory, relative_directory, watch = False):
+        """
+        Walk a Folder like checksum.walk_files, optionally adding an inotify Watch to every Sub Folder.
+        :return: Generator of os.DirEntry Objects of the wanted Files.
+        """
+        directories = [(directory, relative_directory)]
+        while directories:
+            directory, relative_directory = directories.pop()
+            if watch:
+                self.watches[self._inotify.add_watch(directory)] = (directory, relative_directory)
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    relative_path = f"{relative_directory}/{entry.name}" if relative_directory else entry.name
+                    try:
+                        is_directory = entry.is_dir(follow_symlinks = False)
+                    except OSError:
+                        is_directory = False
+                    if is_directory:
+                        if self._wanted_directory(entry.name, relative_path):
+                            directories.append((entry.path, relative_path))
+                    elif self._wanted_file(entry.name, relative_path, entry.path):
+                        yield entry
+
+    def _wanted_directory(self, name, relative_path):
+        return self.exclude_dirs is None or not _matches(self.exclude_dirs, name, relative_path)
+
+    def _wanted_file(self, name, relative_path, file_path):
+        if self.include is not None and not _matches(self.include, name, relative_path):
+            return False
+        if self.exclude is not None and _matches(self.exclude, name, relative_path):
+            return False
+        return not self._own_files or os.path.abspath(file_path) not in self._own_files
+
+    def _on_event(self, wd, mask, name):
+        """
+        Schedule the Paths an inotify Event touches.
+        """
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify Queue overflowed, Rescanning %s", self.root)
+            self.rescan_needed = True
+            return
+        if wd not in self.watches:
+            return
+        if mask & IN_IGNORED:
+            del self.watches[wd]
+            return
+        if not name:
+            # IN_DELETE_SELF and IN_MOVE_SELF of the Folder, its Files are Reported by its Parent.
+            return
+
+        directory, relative_directory = self.watches[wd]
+        file_path = os.path.join(directory, name)
+        relative_path = f"{relative_directory}/{name}" if relative_directory else name
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if self._wanted_directory(name, relative_path):
+                    # Files written before the Watch was added have no Events of their own.
+                    for entry in self._scan(file_path, relative_path, watch = True):
+                        self._schedule(entry.path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._forget_directory(file_path)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+            if self._wanted_file(name, relative_path, file_path):
+                self._schedule(file_path)
+
+    def _forget_directory(self, directory):
+        """
+        Check every known File below a Folder that was deleted or moved away, and stop Watching it.
+        """
+        prefix = os.path.join(directory, "")
+        for file_path in [file_path for file_path in self.entries if file_path.startswith(prefix)]:
+            self._schedule(file_path)
+        for wd, (watched, _) in list(self.watches.items()):
+            if watched == directory or watched.startswith(prefix):
+                del self.watches[wd]
+                self._inotify.rm_watch(wd)
+
+    def _schedule(self, file_path, stat_key = None, delay = None):
+        """
+        Hash a Path once it was quiet for the Debounce Time. A Path scheduled again waits anew, unless a polled
+        Path still has the same stat_key.
+        """
+        pending = self.pending.pop(file_path, None)
+        if pending is not None and stat_key is not None and pending[1] == stat_key:
+            # Unchanged since the last Poll, keep its Deadline and its Place in the Order of Deadlines.
+            self.pending[file_path] = pending
+            return
+        if pending is None and len(self.pending) >= self.max_pending:
+            # Dropped, a Rescan finds it by its stat Data once the pending Files are Hashed.
+            if not self.rescan_needed:
+                logger.warning("More than %s Files changed at once, Rescanning %s", self.max_pending, self.root)
+            self.rescan_needed = True
+            return
+        self.pending[file_path] = (time.monotonic() + (self.debounce if delay is None else delay), stat_key)
+
+    def _rescan(self, delay = None):
+        """
+        Schedule every File whose stat Data disagree with the Manifest, and every known File that is gone.
+        """
+        seen = set()
+        for entry in self._scan(self.root, "", watch = self._inotify is not None):
+            seen.add(entry.path)
+            try:
+                file_stat = entry.stat()
+            except OSError:
+                continue
+            stat_key = (file_stat.st_size, file_stat.st_mtime_ns)
+            known = self.entries.get(entry.path)
+            if known is None or (known.size, known.mtime_ns) != stat_key:
+                self._schedule(entry.path, stat_key, delay)
+        for file_path in self.entries:
+            if file_path not in seen:
+                self._schedule(file_path, MISSING, delay)
+
+    """ HASHING """
+
+    def _hash_due(self):
+        """
+        Hash the Files whose Debounce ran out and Decide them against the Manifest.
+        :return: Generator of Tuples (status, file_path, new_hash_code, old_hash_code).
+        """
+        now = time.monotonic()
+        due = []
+        for file_path, (deadline, _) in self.pending.items():
+            if deadline > now:
+                break
+            due.append(file_path)
+        if not due:
+            return
+
+        file_stats = {}
+        for file_path in due:
+            _, stat_key = self.pending.pop(file_path)
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                old = self.entries.pop(file_path, None)
+                if old is not None:
+                    self.changed = True
+                    yield REMOVED, file_path, None, old.digest
+                continue
+            except OSError as exception:
+                logger.warning("%s", exception)
+                continue
+            if stat_key is not None and stat_key != (file_stat.st_size, file_stat.st_mtime_ns):
+                # A polled File that is still being Written waits for another Debounce.
+                self._schedule(file_path, (file_stat.st_size, file_stat.st_mtime_ns))
+            elif stat.S_ISREG(file_stat.st_mode):
+                file_stats[file_path] = file_stat
+
+        for file_path, hash_value, *file_fingerprint in hash_files(list(file_stats), self.algorithm, self.workers,
+                                                                   mode = "thread", fingerprints = self.fingerprints):
+            old = self.entries.get(file_path)
+            old_hash = None if old is None else old.digest
+            if hash_value is None:
+                yield SKIPPED, file_path, None, old_hash
+                continue
+
+            file_stat = file_stats[file_path]
+            entry = manifest_entry(file_path, hash_value, file_stat.st_size, file_stat.st_mtime_ns,
+                                   next(iter(file_fingerprint), None))
+            self.entries[file_path] = entry
+            self.changed = True
+
+            if old is None:
+                yield ADDED, file_path, hash_value, None
+            elif not same_digest(hash_value, old_hash):
+                yield ALTERED, file_path, hash_value, old_hash
+
+    def save(self):
+        """
+        Write the Manifest if it changed, through a temporary File so a Crash never leaves half a Manifest.
+        """
+        self.saved_at = time.monotonic()
+        if self.manifest_path is None or not self.changed:
+            return
+        temporary_path = self.manifest_path + ".tmp"
+        write_manifest(self.entries.values(), temporary_path, manifest_format(self.manifest_path),
+                       algorithm = algorithm_name(self.algorithm))
+        os.replace(temporary_path, self.manifest_path)
+        self.changed = False
+        logger.debug("Saved %s Files to %s", len(self.entries), self.manifest_path)
@@ -134,6 +134,39 @@ def create_text_edit(text = "", tooltip = ""):
     return text_edit
 
 
+def create_table_view(model = None, tooltip = ""):
+    """
+    Create Table View with fixed Row Heights, so large Models are Laid Out quickly.
+    :param model: Model of the Table View.
+    :param tooltip: Hint about GUI Item
+    :return: QTableView
+    """
+    table_view = QTableView()
+    table_view.setModel(model)
+    table_view.setToolTip(tooltip)
+    table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table_view.setWordWrap(False)
+    table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    table_view.verticalHeader().hide()
+    table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+    table_view.horizontalHeader().setStretchLastSection(True)
+    return table_view
+
+
+def create_progress_bar(maximum = 100, tooltip = ""):
+    """
+    Create Progress Bar
+    :param maximum: Value of a full Progress Bar.
+    :param tooltip: Hint about GUI Item
+    :return: QProgressBar
+    """
+    progress_bar = QProgressBar()
+    progress_bar.setRange(0, maximum)
+    progress_bar.setValue(0)
+    progress_bar.setToolTip(tooltip)
+    return progress_bar
+
+
 def create_font(font = "", size = 8):
     """
     Create Font